@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Article
+from django.db.models import Q
+from .models import Article, FrontierURL, ScrapeFailure, ScrapeJob, domain_key_for
+from .search import search_query, search_supported
 
 
 @admin.register(Article)
@@ -7,3 +9,36 @@ class ArticleAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "source_domain", "published_at")
     search_fields = ("title", "source_url", "source_domain")
     list_filter = ("source_domain",)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term or not search_supported():
+            return super().get_search_results(request, queryset, search_term)
+
+        # Full-text search over the GIN index instead of icontains scans;
+        # URLs and domains go to their own indexes.
+        match = Q(search_vector=search_query(term))
+        if "." in term and not any(c.isspace() for c in term):
+            match |= Q(source_url=term) | Q(domain_key__startswith=domain_key_for(term))
+        return queryset.filter(match), False
+
+
+@admin.register(FrontierURL)
+class FrontierURLAdmin(admin.ModelAdmin):
+    list_display = ("url", "state", "priority", "next_due_at", "source", "attempts")
+    list_filter = ("state", "source", "domain")
+    search_fields = ("=url",)
+
+
+@admin.register(ScrapeFailure)
+class ScrapeFailureAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "url", "kind", "status_code", "attempts")
+    list_filter = ("kind", "domain")
+    search_fields = ("=url",)
+    date_hierarchy = "created_at"
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "priority", "submitted_urls")
+    date_hierarchy = "created_at"
@@ -0,0 +1,78 @@
+"""
+Throughput of `parse_any_date` per input format.
+
+    python -m app.benchmarks.date_parsing [iterations]
+
+For every format three numbers are reported (parses per second):
+- `legacy`: plain `dateparser.parse` as used before the fast path,
+- `cold`: `parse_any_date` with the memo cache cleared before every call,
+- `cached`: `parse_any_date` on repeated input.
+"""
+
+from __future__ import annotations
+import json
+import sys
+import time
+
+import dateparser
+
+from app.utils.date_utils import (
+    WARSAW,
+    _parse_absolute,
+    parse_any_date,
+    warm_up_date_parser,
+)
+
+SAMPLES = {
+    "iso_date": "2024-10-14",
+    "iso_datetime_offset": "2024-10-14T12:30:00+02:00",
+    "dmy_numeric": "14.10.2024",
+    "dmy_numeric_time": "14.10.2024 12:30",
+    "dmy_polish": "14 października 2024",
+    "dmy_polish_time": "14 października 2024, 12:30",
+    "mdy_english": "October 14, 2024",
+    "relative_en": "2 days ago",
+    "relative_pl": "wczoraj",
+    "time_only": "10:11",
+}
+
+LEGACY_SETTINGS = {
+    "TIMEZONE": str(WARSAW),
+    "RETURN_AS_TIMEZONE_AWARE": True,
+    "PREFER_DATES_FROM": "past",
+    "DATE_ORDER": "DMY",
+}
+
+
+def _rate(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return round(iterations / elapsed, 1) if elapsed else float("inf")
+
+
+def _cold(raw: str) -> None:
+    _parse_absolute.cache_clear()
+    parse_any_date(raw)
+
+
+def run(iterations: int = 200) -> dict[str, dict[str, float]]:
+    warm_up_date_parser()
+    dateparser.parse("1 stycznia 2000", settings=LEGACY_SETTINGS)
+
+    results = {}
+    for name, raw in SAMPLES.items():
+        results[name] = {
+            "legacy": _rate(
+                lambda: dateparser.parse(raw, settings=LEGACY_SETTINGS), iterations
+            ),
+            "cold": _rate(lambda: _cold(raw), iterations),
+            "cached": _rate(lambda: parse_any_date(raw), iterations * 50),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(json.dumps(run(n), indent=2))
@@ -0,0 +1,234 @@
+"""
+Local HTTP server replaying the recorded domain pages of `fixtures/`.
+
+    python -m app.benchmarks.fixture_server [--port 8765] [--latency 50] [--bandwidth 512]
+
+The server answers like a forward proxy for plain HTTP: with
+SCRAPER_PROXY=http://127.0.0.1:<port> the scrapers (static fetch and
+Chromium) request http://galicjaexpress.pl/... and get the fixture page
+of that domain, so nothing reaches the live sites. `--latency` (ms) is
+added before every response, `--bandwidth` (KB/s) limits the body rate.
+"""
+
+from __future__ import annotations
+import argparse
+import html
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+ROBOTS_TXT = b"User-agent: *\nAllow: /\n"
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+}
+
+
+@dataclass(frozen=True)
+class Route:
+    """Article pages of `host` under `prefix` are served from `fixture`."""
+
+    host: str
+    prefix: str
+    fixture: str
+    # Rendered client-side: only the browser path can scrape it.
+    js: bool = False
+
+
+ROUTES = (
+    Route(
+        "take-group.github.io",
+        "/example-blog-without-ssr/",
+        "take-group.github.io/spa.html",
+        js=True,
+    ),
+    Route(
+        "take-group.github.io", "/example-blog/", "take-group.github.io/article.html"
+    ),
+    Route("galicjaexpress.pl", "/", "galicjaexpress.pl/article.html"),
+)
+
+# (host, path) → fixture of the scripts the pages load.
+ASSETS = {
+    (
+        "take-group.github.io",
+        "/example-blog-without-ssr/static/js/app.js",
+    ): "take-group.github.io/app.js",
+}
+
+
+def fixture_urls(pages: int, static_only: bool = False) -> list[str]:
+    """`pages` distinct article URLs per route, served by the fixture server."""
+
+    return [
+        f"http://{route.host}{route.prefix}bench-{idx:05d}/"
+        for route in ROUTES
+        if not (static_only and route.js)
+        for idx in range(pages)
+    ]
+
+
+def render_fixture(host: str, path: str) -> Optional[tuple[bytes, str]]:
+    """Body and content type served for `path` of `host`; None → 404."""
+
+    if path == "/robots.txt":
+        return ROBOTS_TXT, "text/plain; charset=utf-8"
+
+    asset = ASSETS.get((host, path))
+    if asset is not None:
+        return _read(asset), CONTENT_TYPES[Path(asset).suffix]
+
+    for route in ROUTES:
+        if host == route.host and path.startswith(route.prefix):
+            # Every URL gets its own title, so the articles are distinct.
+            slug = path.rstrip("/").rsplit("/", 1)[-1] or "index"
+            page = (
+                _read(route.fixture)
+                .decode()
+                .replace("__TITLE__", html.escape(f"Artykuł testowy {slug}"))
+                .replace("__PATH__", html.escape(path))
+            )
+            return page.encode(), CONTENT_TYPES[".html"]
+    return None
+
+
+_cache: dict[str, bytes] = {}
+
+
+def _read(name: str) -> bytes:
+    if name not in _cache:
+        _cache[name] = (FIXTURES_DIR / name).read_bytes()
+    return _cache[name]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def _respond(self, body: bool) -> None:
+        # A proxy gets the absolute URL; a direct request only the path.
+        target = urlsplit(self.path)
+        host = (target.hostname or self.headers.get("Host", "")).split(":")[0]
+        self.server.count()
+        time.sleep(self.server.latency)
+
+        served = render_fixture(host.lower(), target.path or "/")
+        if served is None:
+            payload, content_type, status = b"Not found\n", "text/plain", 404
+        else:
+            (payload, content_type), status = served, 200
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if body:
+            self._write(payload)
+
+    def _write(self, payload: bytes) -> None:
+        bandwidth = self.server.bandwidth
+        if not bandwidth:
+            self.wfile.write(payload)
+            return
+
+        chunk = max(1024, bandwidth // 20)
+        for start in range(0, len(payload), chunk):
+            part = payload[start : start + chunk]
+            self.wfile.write(part)
+            time.sleep(len(part) / bandwidth)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float, bandwidth: int):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+
+class FixtureServer:
+    """
+    Runs the fixture server in a background thread (`with FixtureServer()
+    as server: ... server.url`). `latency` is in seconds, `bandwidth` in
+    bytes per second (0 = unlimited).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self._server = _Server((host, port), latency, bandwidth)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def start(self) -> FixtureServer:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fixture-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> FixtureServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="ms per response")
+    parser.add_argument("--bandwidth", type=int, default=0, help="KB/s, 0 = no limit")
+    args = parser.parse_args()
+
+    server = _Server(
+        ("127.0.0.1", args.port), args.latency / 1000, args.bandwidth * 1024
+    )
+    print(f"SCRAPER_PROXY=http://127.0.0.1:{args.port}")
+    for url in fixture_urls(1):
+        print(url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
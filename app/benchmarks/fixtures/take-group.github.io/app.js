@@ -0,0 +1,46 @@
+// Client-side rendering of the example blog: the post is "fetched" after
+// a short delay and only then put into the DOM, as the real bundle does.
+(function () {
+  var slug = window.location.pathname;
+  var title = "Wpis bez SSR " + slug.split("/").filter(Boolean).pop();
+
+  var paragraphs = [
+    "Ta wersja bloga jest budowana w całości w przeglądarce. Serwer zwraca pusty element #root, a tytuł, data i treść pojawiają się dopiero po pobraniu i wykonaniu skryptu.",
+    "Robot, który nie uruchamia JavaScriptu, zobaczy tylko komunikat z elementu noscript. Dlatego te wpisy są pobierane przez przeglądarkę, a nie zwykłym zapytaniem HTTP.",
+    "Po załadowaniu skrypt pobiera dane wpisu z API, buduje drzewo komponentów i podmienia zawartość strony. Na wolnym łączu użytkownik przez ten czas widzi pustą stronę.",
+    "W kolejnych wpisach opiszemy, jak zmierzyć ten czas i jak skrócić go przez podział paczki, wstępne pobieranie danych oraz renderowanie po stronie serwera."
+  ];
+
+  function el(tag, attrs, children) {
+    var node = document.createElement(tag);
+    Object.keys(attrs || {}).forEach(function (key) {
+      node.setAttribute(key, attrs[key]);
+    });
+    (children || []).forEach(function (child) {
+      node.appendChild(typeof child === "string" ? document.createTextNode(child) : child);
+    });
+    return node;
+  }
+
+  function render(post) {
+    var content = el("div", { "class": "article-content" }, post.paragraphs.map(function (text) {
+      return el("p", {}, [text]);
+    }));
+    var article = el("article", { "class": "post" }, [
+      el("h1", {}, [post.title]),
+      el("time", { "datetime": post.date }, [post.dateText]),
+      content
+    ]);
+    document.getElementById("root").appendChild(article);
+    document.title = post.title + " | Example blog";
+  }
+
+  setTimeout(function () {
+    render({
+      title: title,
+      date: "2024-10-14T12:30:00+02:00",
+      dateText: "14 października 2024, 12:30",
+      paragraphs: paragraphs.concat(["Wpis: " + slug])
+    });
+  }, 50);
+})();
@@ -0,0 +1,113 @@
+"""
+Throughput of `html_to_text` in MB/s of HTML, on the article content of
+the fixture pages (`fixtures/`) and on the whole pages.
+
+    python -m app.benchmarks.html_text [iterations]
+
+`bs4` is the conversion used before (BeautifulSoup `get_text` on the
+parsed HTML), for comparison; the browser's `innerText` is not measured.
+
+The `innerText` Chromium gives for the content of each fixture is kept
+next to it (`article.innertext.txt`), for the parity test of
+`html_to_text`. After a change to a fixture, record it again with
+
+    python -m app.benchmarks.html_text --record-inner-text
+"""
+
+from __future__ import annotations
+import json
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from app.benchmarks.fixture_server import FIXTURES_DIR, render_fixture
+from app.utils.html_text import html_to_text
+
+PAGES = {
+    "galicjaexpress": ("galicjaexpress.pl", "/bench-00001/", ".post-text-two-red"),
+    "take_group": (
+        "take-group.github.io",
+        "/example-blog/bench-00001/",
+        "div.article-content",
+    ),
+}
+
+
+INNER_TEXT_FILE = "article.innertext.txt"
+
+
+def samples() -> dict[str, str]:
+    """Content HTML and full page of every fixture."""
+
+    result = {}
+    for name, (host, path, content) in PAGES.items():
+        page = render_fixture(host, path)[0].decode()
+        soup = BeautifulSoup(page, "html.parser")
+        result[f"{name}_content"] = soup.select_one(content).decode_contents()
+        result[f"{name}_page"] = page
+    return result
+
+
+def inner_text_path(name: str):
+    """Recorded Chromium `innerText` of the content of fixture `name`."""
+
+    return FIXTURES_DIR / PAGES[name][0] / INNER_TEXT_FILE
+
+
+def record_inner_text() -> list[str]:
+    """
+    Loads every fixture page in Chromium and writes the `innerText` of its
+    content element. Network requests are blocked, so author stylesheets
+    are not applied, as with the scraper's default resource blocking.
+    """
+
+    from playwright.sync_api import sync_playwright
+
+    written = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        try:
+            page = browser.new_page()
+            page.route("**/*", lambda route: route.abort())
+            for name, (host, path, content) in PAGES.items():
+                page.set_content(render_fixture(host, path)[0].decode())
+                text = page.inner_text(content)
+                target = inner_text_path(name)
+                target.write_bytes(text.encode())
+                written.append(str(target))
+        finally:
+            browser.close()
+    return written
+
+
+def _bs4_text(html: str) -> str:
+    return BeautifulSoup(html, "html.parser").get_text("\n", strip=True)
+
+
+def _mb_per_second(fn, html: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(html)
+    elapsed = time.perf_counter() - start
+    size = len(html.encode()) * iterations / 1024 / 1024
+    return round(size / elapsed, 2) if elapsed else float("inf")
+
+
+def run(iterations: int = 200) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, html in samples().items():
+        results[name] = {
+            "bytes": len(html.encode()),
+            "html_to_text": _mb_per_second(html_to_text, html, iterations),
+            "bs4": _mb_per_second(_bs4_text, html, max(iterations // 10, 1)),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--record-inner-text"]:
+        print("\n".join(record_inner_text()))
+    else:
+        n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+        print(json.dumps(run(n), indent=2))
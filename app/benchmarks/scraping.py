@@ -0,0 +1,121 @@
+"""
+End-to-end scraping throughput against the local fixture server.
+
+Run through `python manage.py benchmark_scraper`, which gives it a
+throwaway database. `run` queues generated fixture URLs in the frontier
+and runs `scrape_articles` on them with SCRAPER_PROXY pointing at the
+fixture server and politeness disabled. The whole path is measured:
+static fetch or browser, extraction, date parsing and batched writes.
+"""
+
+from __future__ import annotations
+import asyncio
+import io
+import resource
+import sys
+import threading
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+
+from app.benchmarks.fixture_server import FixtureServer, fixture_urls
+from app.models import FrontierURL
+from app.utils.browser_pool import chromium_rss_mb
+from app.utils.metrics import get_metrics
+
+
+def run(
+    pages: int = 50,
+    latency: float = 0.05,
+    bandwidth: int = 0,
+    use_async: bool = True,
+    concurrency: int = 8,
+    static_only: bool = False,
+) -> dict:
+    """
+    Scrapes `pages` fixture URLs per route; `latency` in seconds,
+    `bandwidth` in bytes per second (0 = unlimited).
+    """
+
+    urls = fixture_urls(pages, static_only=static_only)
+    FrontierURL.enqueue(urls)
+
+    args = ["--limit", str(len(urls))]
+    if use_async:
+        args += ["--async", "--concurrency", str(concurrency)]
+
+    with FixtureServer(latency=latency, bandwidth=bandwidth) as server:
+        with override_settings(
+            SCRAPER_PROXY=server.url, SCRAPER_POLITENESS=False
+        ), _peak_browser_rss() as browser_rss:
+            call_command("scrape_articles", *args, stdout=io.StringIO())
+        requests = server.requests
+    if use_async:
+        # The pipeline's queries ran in the sync_to_async thread; close its
+        # connection so the throwaway database can be dropped.
+        asyncio.run(sync_to_async(connections.close_all)())
+
+    summary = get_metrics().summary()
+    saved = summary["pages"].get("saved", 0)
+    db_write = summary["phases"].get("db_write", {})
+    write_seconds = db_write.get("total_s", 0)
+    return {
+        "config": {
+            "urls": len(urls),
+            "latency_ms": round(latency * 1000),
+            "bandwidth_kbps": bandwidth // 1024,
+            "async": use_async,
+            "concurrency": concurrency,
+        },
+        "duration_s": summary["duration_s"],
+        "pages": summary["pages"],
+        "pages_per_sec": summary["pages_per_sec"],
+        "saved_per_sec": summary["saved_per_sec"],
+        "failures": summary["failures"],
+        "requests": requests,
+        "bytes": summary["bytes"],
+        "phases": summary["phases"],
+        "db": {
+            "batches": db_write.get("count", 0),
+            "rows": saved,
+            "rows_per_write_sec": (
+                round(saved / write_seconds, 1) if write_seconds else None
+            ),
+        },
+        "peak_rss_mb": {
+            "process": round(_peak_process_rss_mb(), 1),
+            "browsers": round(browser_rss["peak"], 1),
+        },
+    }
+
+
+def _peak_process_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def _peak_browser_rss(interval: float = 0.25):
+    """Samples the RSS of the Chromium processes while the block runs."""
+
+    result = {"peak": 0.0}
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            rss = chromium_rss_mb()
+            if rss is not None:
+                result["peak"] = max(result["peak"], rss)
+            done.wait(interval)
+
+    sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+    sampler.start()
+    try:
+        yield result
+    finally:
+        done.set()
+        sampler.join()
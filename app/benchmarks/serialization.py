@@ -0,0 +1,84 @@
+"""
+Rows per second of the articles list rendering: ArticleSerializer +
+JSONRenderer (DRF) against the values_list fast path.
+
+    python -m app.benchmarks.serialization [sizes...]
+
+Rows are built in memory, so no database is needed.
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+
+def _setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "article_scrapper.settings")
+    import django
+
+    django.setup()
+
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def _data(n: int) -> list[dict]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "title": f"Przykładowy artykuł {i}",
+            "content_html": "<p>Treść artykułu</p>" * 20,
+            "content_text": "Treść artykułu " * 20,
+            "source_url": f"https://example.com/artykul-{i}",
+            "source_domain": "example.com",
+            "published_at": start + timedelta(minutes=7 * i),
+        }
+        for i in range(n)
+    ]
+
+
+def _rate(n: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return round(n / (time.perf_counter() - start), 1)
+
+
+def run(sizes=SIZES) -> dict[str, dict[str, dict[str, float]]]:
+    _setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from app.models import Article
+    from app.serializers import ArticleSerializer, iter_article_list_json
+    from app.views import ALL_FIELDS, SUMMARY_FIELDS
+
+    Row = namedtuple("Row", ALL_FIELDS)
+    envelope = {"next": None, "previous": None}
+
+    results = {}
+    for label, fields in (("summary", SUMMARY_FIELDS), ("full", ALL_FIELDS)):
+        results[label] = {}
+        for n in sizes:
+            data = _data(n)
+            objects = [Article(**item) for item in data]
+            rows = [Row(**item) for item in data]
+
+            def drf():
+                payload = ArticleSerializer(objects, many=True, fields=fields).data
+                return JSONRenderer().render({**envelope, "results": payload})
+
+            def fast():
+                return b"".join(iter_article_list_json(rows, fields, envelope))
+
+            assert drf() == fast()
+            results[label][str(n)] = {"drf": _rate(n, drf), "fast": _rate(n, fast)}
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(json.dumps(run(sizes), indent=2))
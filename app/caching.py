@@ -0,0 +1,79 @@
+import hashlib
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .models import ArticleChangeMarker
+
+
+CACHE_KEY_PREFIX = "articles-api:"
+
+
+def cached_article_response(
+    request, build: Callable[[], HttpResponse], domain: Optional[str] = None
+) -> HttpResponse:
+    """
+    Serves an articles API response through the change markers.
+
+    The ETag hashes the request (path, query, media type) with the marker
+    version of `domain` (all domains when None). A matching If-None-Match /
+    If-Modified-Since gets a 304 after a single query on the marker table;
+    otherwise the body comes from the cache, or from `build()` on a miss.
+    Writes bump the version, so stale entries are never looked up again.
+    With ARTICLES_CACHE_TIMEOUT = 0 only the validators are added and the
+    built response is returned as is (streaming included).
+    """
+
+    version, changed_at = ArticleChangeMarker.current(domain)
+    variant = "|".join(
+        (
+            request.path,
+            "&".join(sorted(request.GET.urlencode().split("&"))),
+            request.accepted_media_type or "",
+            str(version),
+            changed_at.isoformat() if changed_at else "",
+        )
+    )
+    digest = hashlib.sha256(variant.encode()).hexdigest()
+    etag = quote_etag(digest)
+    last_modified = int(changed_at.timestamp()) if changed_at else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if settings.ARTICLES_CACHE_TIMEOUT:
+            response = _from_cache(CACHE_KEY_PREFIX + digest, build)
+        else:
+            response = build()
+        if response.status_code != 200:
+            return response
+
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def _from_cache(key: str, build: Callable[[], HttpResponse]) -> HttpResponse:
+    cached = cache.get(key)
+    if cached is None:
+        fresh = build()
+        if fresh.status_code != 200:
+            return fresh
+        cached = (fresh["Content-Type"], _body(fresh))
+        cache.set(key, cached, settings.ARTICLES_CACHE_TIMEOUT)
+
+    content_type, body = cached
+    return HttpResponse(body, content_type=content_type)
+
+
+def _body(response) -> bytes:
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    if hasattr(response, "render"):
+        response.render()
+    return response.content
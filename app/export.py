@@ -0,0 +1,270 @@
+"""
+Streaming export of the article corpus as NDJSON or CSV, shared by the
+`export_articles` command and the `/articles/export/` endpoint.
+
+Articles are read in `id` order through a server-side cursor
+(`QuerySet.iterator`) and written chunk by chunk, so memory use does not
+grow with the corpus. An export can be resumed after the last exported
+id: `after_id` in the filters, or `resume_point` on a partial file.
+"""
+
+from __future__ import annotations
+import csv
+import gzip
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Iterable, Iterator, Mapping, Optional
+
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Article, domain_key_for, normalize_domain
+from .serializers import ArticleSerializer, dump_json
+from .utils.body_codec import decode_body
+
+
+NDJSON = "ndjson"
+CSV = "csv"
+FORMATS = (NDJSON, CSV)
+
+CONTENT_TYPES = {
+    NDJSON: "application/x-ndjson; charset=utf-8",
+    CSV: "text/csv; charset=utf-8",
+}
+
+EXPORT_FIELDS = tuple(ArticleSerializer.Meta.fields)
+
+_READ_BLOCK = 64 * 1024
+
+
+class ExportParamError(ValueError):
+    """Invalid export parameter `param`."""
+
+    def __init__(self, param: str, message: str):
+        super().__init__(f"{param}: {message}")
+        self.param = param
+        self.message = message
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    source: Optional[str] = None
+    published_from: Optional[datetime] = None
+    # Exclusive; a date given without time covers that whole day.
+    published_to: Optional[datetime] = None
+    after_id: Optional[int] = None
+
+    @classmethod
+    def from_params(cls, params: Mapping) -> "ExportFilters":
+        """Filters from request / command parameters (ExportParamError)."""
+
+        after_id = params.get("after_id") or None
+        if after_id is not None:
+            try:
+                after_id = int(after_id)
+            except (TypeError, ValueError):
+                raise ExportParamError("after_id", f"Invalid id: {after_id}")
+        return cls(
+            source=normalize_domain(params.get("source") or "") or None,
+            published_from=_parse_bound(params, "published_from", end=False),
+            published_to=_parse_bound(params, "published_to", end=True),
+            after_id=after_id,
+        )
+
+    def apply(self, queryset):
+        if self.source:
+            # The domain itself and its subdomains, as in the articles API.
+            queryset = queryset.filter(
+                domain_key__startswith=domain_key_for(self.source)
+            )
+        if self.published_from:
+            queryset = queryset.filter(published_at__gte=self.published_from)
+        if self.published_to:
+            queryset = queryset.filter(published_at__lt=self.published_to)
+        if self.after_id is not None:
+            queryset = queryset.filter(id__gt=self.after_id)
+        return queryset
+
+
+def _parse_bound(params: Mapping, name: str, end: bool) -> Optional[datetime]:
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        # A plain date is parsed as a datetime too, so it is tried first.
+        day = parse_date(raw)
+        value = None if day else parse_datetime(raw)
+    except ValueError:
+        day = value = None
+    if day is not None:
+        value = datetime.combine(day + timedelta(days=1) if end else day, time())
+    elif value is None:
+        raise ExportParamError(name, f"Invalid date: {raw}")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def parse_fields(raw: Optional[str]) -> tuple[str, ...]:
+    """Exported columns from a comma-separated list; `id` always comes first."""
+
+    if not raw:
+        return EXPORT_FIELDS
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = names - set(EXPORT_FIELDS)
+    if unknown:
+        raise ExportParamError(
+            "fields", f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return tuple(f for f in EXPORT_FIELDS if f in names or f == "id")
+
+
+def export_rows(
+    filters: ExportFilters, fields: Iterable[str], chunk_size: int
+) -> Iterator:
+    """Named rows of the matching articles in `id` order, streamed."""
+
+    columns = dict.fromkeys(("id", *fields))
+    queryset = filters.apply(Article.objects.order_by("id"))
+    if "content_html" in columns:
+        # Compressed body; decoded per row by `_row_values`.
+        queryset = queryset.annotate(
+            content_html=F("body__data"), content_html_codec=F("body__codec")
+        )
+        columns["content_html_codec"] = None
+    return queryset.values_list(*columns, named=True).iterator(chunk_size=chunk_size)
+
+
+def _row_values(row, fields: tuple[str, ...]) -> dict:
+    item = {name: getattr(row, name) for name in fields}
+    if item.get("published_at") is not None:
+        # ISO 8601 (UTC), unlike the display format of the articles API.
+        item["published_at"] = item["published_at"].isoformat()
+    if "content_html" in item:
+        item["content_html"] = decode_body(item["content_html"], row.content_html_codec)
+    return item
+
+
+def iter_export(
+    rows: Iterable,
+    fields: Iterable[str],
+    fmt: str,
+    chunk_size: int,
+    header: bool = True,
+) -> Iterator[bytes]:
+    """
+    Encodes `rows` as NDJSON lines or CSV records, `chunk_size` rows per
+    yielded chunk. The CSV header (when `header`) is a chunk of its own.
+    """
+
+    fields = tuple(fields)
+    if fmt == CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(fields)
+            yield _drain(buffer)
+
+        def write(item):
+            writer.writerow(["" if v is None else v for v in item.values()])
+
+    else:
+        buffer = io.StringIO()
+
+        def write(item):
+            buffer.write(dump_json(item))
+            buffer.write("\n")
+
+    pending = 0
+    for row in rows:
+        write(_row_values(row, fields))
+        pending += 1
+        if pending >= chunk_size:
+            yield _drain(buffer)
+            pending = 0
+    if pending:
+        yield _drain(buffer)
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def gzip_members(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Every chunk as a gzip member of its own. The concatenation is a valid
+    gzip file, and one cut short loses only its last member (see
+    `resume_point`).
+    """
+
+    for chunk in chunks:
+        yield gzip.compress(chunk, mtime=0)
+
+
+def resume_point(path, fmt: str, compressed: bool) -> tuple[Optional[int], int]:
+    """
+    (last exported id, size of the complete part in bytes) of an earlier,
+    possibly interrupted export file. The file is read sequentially.
+    """
+
+    with open(path, "rb") as f:
+        if compressed:
+            return _gzip_resume_point(f, fmt)
+        return _plain_resume_point(f, fmt)
+
+
+def _plain_resume_point(f, fmt: str) -> tuple[Optional[int], int]:
+    last_id, complete, position = None, 0, 0
+    first_line, quotes = None, 0
+    for line in f:
+        position += len(line)
+        if not line.endswith(b"\n"):
+            break  # cut off mid-record
+        first_line = first_line or line
+        if fmt == CSV:
+            quotes += line.count(b'"')
+            if quotes % 2:
+                continue  # newline inside a quoted field
+        record_id = _record_id(first_line, fmt)
+        if record_id is not None:
+            last_id = record_id
+        first_line, quotes = None, 0
+        complete = position
+    return last_id, complete
+
+
+def _gzip_resume_point(f, fmt: str) -> tuple[Optional[int], int]:
+    last_id, complete = None, 0
+    pending = b""
+    while True:
+        member = zlib.decompressobj(wbits=31)
+        data = []
+        while not member.eof:
+            block = pending or f.read(_READ_BLOCK)
+            pending = b""
+            if not block:
+                return last_id, complete
+            try:
+                data.append(member.decompress(block))
+            except zlib.error:
+                return last_id, complete
+        pending = member.unused_data
+        complete = f.tell() - len(pending)
+        member_id, _ = _plain_resume_point(io.BytesIO(b"".join(data)), fmt)
+        if member_id is not None:
+            last_id = member_id
+
+
+def _record_id(first_line: bytes, fmt: str) -> Optional[int]:
+    # `id` is the first column; the CSV header has none.
+    if fmt == CSV:
+        first = first_line.split(b",", 1)[0]
+        return int(first) if first.isdigit() else None
+    return json.loads(first_line)["id"]
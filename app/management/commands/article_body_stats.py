@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from app.models import ArticleBody
+
+
+class Command(BaseCommand):
+    help = "Show dedup and compression stats of stored article bodies."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete bodies that no article points to.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the stats as JSON."
+        )
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            deleted = ArticleBody.prune()
+            self.stdout.write(
+                self.style.NOTICE(f"Usunięto {deleted} nieużywanych treści")
+            )
+
+        stats = ArticleBody.stats()
+        if options["json"]:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        self.stdout.write(f"Artykuły z treścią: {stats['articles']}")
+        self.stdout.write(
+            f"Unikalne treści: {stats['bodies']} "
+            f"(nieużywane: {stats['orphaned_bodies']}), "
+            f"współczynnik deduplikacji: {stats['dedup_ratio']}"
+        )
+        self.stdout.write(
+            f"Rozmiar: {_mb(stats['logical_bytes'])} → "
+            f"{_mb(stats['unique_bytes'])} po deduplikacji → "
+            f"{_mb(stats['stored_bytes'])} po kompresji"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Zaoszczędzono {_mb(stats['saved_bytes'])}")
+        )
+        self.stdout.write(f"Kodeki: {stats['bodies_by_codec']}")
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.2f} MB"
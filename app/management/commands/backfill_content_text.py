@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import Article, ArticleChangeMarker
+from app.utils.html_text import html_to_text
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-derive content_text of stored articles from their HTML with "
+        "html_to_text (the text the scraper stores now)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Articles read and updated per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the articles whose text would change.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        checked = changed = 0
+        html_bytes = 0
+        last_id = 0
+        while True:
+            # One short transaction per batch, so rows are never locked for long.
+            with transaction.atomic():
+                batch = list(
+                    Article.objects.filter(id__gt=last_id)
+                    .select_related("body")
+                    .order_by("id")
+                    .only("id", "source_domain", "content_text", "body")[
+                        : options["batch_size"]
+                    ]
+                )
+                if not batch:
+                    break
+
+                updated = []
+                for article in batch:
+                    html = article.content_html
+                    html_bytes += len(html.encode())
+                    text = html_to_text(html)
+                    if text != article.content_text:
+                        article.content_text = text
+                        updated.append(article)
+
+                if updated and not options["dry_run"]:
+                    Article.objects.bulk_update(updated, ["content_text"])
+                    ArticleChangeMarker.bump(a.source_domain for a in updated)
+            checked += len(batch)
+            changed += len(updated)
+            last_id = batch[-1].id
+
+        elapsed = time.perf_counter() - started
+        mb_per_second = html_bytes / 1024 / 1024 / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Zakończono w {elapsed:.1f} s ({mb_per_second:.1f} MB/s HTML). "
+                f"Sprawdzone: {checked}, zmienione: {changed}"
+                + (" (bez zapisu)" if options["dry_run"] else "")
+            )
+        )
@@ -0,0 +1,134 @@
+import json
+import platform
+import subprocess
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from app.benchmarks import date_parsing, html_text, scraping, serialization
+from app.models import FrontierURL
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark scraping against the local fixture server (in a throwaway "
+        "database) plus date parsing, HTML to text conversion and API "
+        "serialization; prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=50,
+            help="Fixture URLs per route (galicjaexpress, take-group SSR and JS).",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=50,
+            help="Milliseconds the fixture server waits before every response.",
+        )
+        parser.add_argument(
+            "--bandwidth",
+            type=int,
+            default=0,
+            help="Fixture server body rate in KB/s (0 = unlimited).",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Scrape concurrently with the async Playwright API.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.SCRAPER_CONCURRENCY
+        )
+        parser.add_argument(
+            "--static-only",
+            action="store_true",
+            help="Skip the client-rendered pages (no Chromium needed).",
+        )
+        parser.add_argument(
+            "--skip-scrape",
+            action="store_true",
+            help="Run the micro-benchmarks only.",
+        )
+        parser.add_argument(
+            "--date-iterations",
+            type=int,
+            default=200,
+            help="Iterations per format of the date parsing benchmark.",
+        )
+        parser.add_argument(
+            "--html-text-iterations",
+            type=int,
+            default=200,
+            help="Conversions per fixture of the HTML to text benchmark.",
+        )
+        parser.add_argument(
+            "--serialization-sizes",
+            type=int,
+            nargs="+",
+            default=[1_000, 10_000],
+            help="Row counts of the API serialization benchmark.",
+        )
+        parser.add_argument("--output", help="Write the JSON to this file.")
+
+    def handle(self, *args, **options):
+        results = {"commit": _git_head(), "python": platform.python_version()}
+
+        if not options["skip_scrape"]:
+            self.stderr.write("Benchmark scrapowania (serwer z nagraniami stron)...")
+            with _throwaway_database():
+                results["scrape"] = scraping.run(
+                    pages=options["pages"],
+                    latency=options["latency"] / 1000,
+                    bandwidth=options["bandwidth"] * 1024,
+                    use_async=options["use_async"],
+                    concurrency=options["concurrency"],
+                    static_only=options["static_only"],
+                )
+
+        self.stderr.write("Benchmark parsowania dat...")
+        results["date_parsing"] = date_parsing.run(options["date_iterations"])
+        self.stderr.write("Benchmark konwersji HTML na tekst...")
+        results["html_text"] = html_text.run(options["html_text_iterations"])
+        self.stderr.write("Benchmark serializacji API...")
+        results["serialization"] = serialization.run(options["serialization_sizes"])
+
+        output = json.dumps(results, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Zapisano {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+
+@contextmanager
+def _throwaway_database():
+    """A fresh, migrated test database for the run; the real one is not touched."""
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        # Only the benchmark's own URLs in the frontier.
+        FrontierURL.objects.all().delete()
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def _git_head():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
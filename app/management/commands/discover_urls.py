@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from app.models import FrontierURL
+from app.utils.frontier import discover
+
+
+class Command(BaseCommand):
+    help = (
+        "Find new article URLs (sitemaps, feeds, listings) and queue them for scraping."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "urls",
+            nargs="*",
+            help="Queue these URLs instead of running the discovery sources.",
+        )
+        parser.add_argument(
+            "--domain",
+            action="append",
+            dest="domains",
+            help="Only run the sources of this registered domain (repeatable).",
+        )
+        parser.add_argument(
+            "--priority",
+            type=int,
+            default=0,
+            help="Priority of URLs given on the command line.",
+        )
+
+    def handle(self, *args, **options):
+        if options["urls"]:
+            added = FrontierURL.enqueue(
+                options["urls"], source="manual", priority=options["priority"]
+            )
+            self.stdout.write(self.style.SUCCESS(f"Dodano {added} adresów"))
+            return
+
+        for domain, added in discover(options["domains"]).items():
+            self.stdout.write(f"{domain} → {added} nowych adresów")
+
+        pending = FrontierURL.objects.filter(state=FrontierURL.PENDING).count()
+        self.stdout.write(self.style.SUCCESS(f"Zakończono. W kolejce: {pending}"))
@@ -0,0 +1,92 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.article_writer import ArticleBatchWriter
+from app.utils.date_utils import warm_up_date_parser
+from app.utils.reextract import (
+    CHANGED,
+    CREATED,
+    FAILED,
+    UNCHANGED,
+    SnapshotReextractor,
+)
+from app.utils.snapshots import get_snapshot_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run the domain extraction specs over stored page snapshots "
+        "(no network, no browser) and update the articles that changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--domain", help="Only snapshots of this domain (and its subdomains)."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Extraction processes (default: number of CPUs).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Snapshots per task sent to a process.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SCRAPER_WRITE_BATCH_SIZE,
+            help="Articles written to the database per bulk upsert.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would change.",
+        )
+
+    def handle(self, *args, **options):
+        store = get_snapshot_store()
+        if store is None:
+            raise CommandError("Ustaw SCRAPER_SNAPSHOT_DIR, brak zapisanych stron.")
+
+        entries = store.latest(domain=options["domain"])
+        self.stdout.write(
+            self.style.NOTICE(f"Start. Ponowna ekstrakcja {len(entries)} stron")
+        )
+        warm_up_date_parser()
+
+        writer = ArticleBatchWriter(batch_size=options["batch_size"])
+        reextractor = SnapshotReextractor(
+            store,
+            writer,
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+            notify=self._notify,
+        )
+        started = time.perf_counter()
+        with writer:
+            counts = reextractor.run(entries.values())
+        elapsed = time.perf_counter() - started
+
+        per_minute = len(entries) / elapsed * 60 if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Zakończono w {elapsed:.1f} s ({per_minute:.0f} stron/min). "
+                f"Zmienione: {counts[CHANGED]}, nowe: {counts[CREATED]}, "
+                f"bez zmian: {counts[UNCHANGED]}, błędy: {counts[FAILED]}"
+                + (" (bez zapisu)" if options["dry_run"] else "")
+            )
+        )
+
+    def _notify(self, kind, url, detail):
+        if kind == CHANGED:
+            self.stdout.write(f"{url} → Zmieniony.")
+        elif kind == CREATED:
+            self.stdout.write(f"{url} → Nowy artykuł.")
+        elif kind == FAILED:
+            self.stdout.write(self.style.ERROR(f"{url} → Błąd: {detail}"))
@@ -1,56 +1,258 @@
+import asyncio
+import json
 import logging
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 
-from app.models import Article
+from app.models import FrontierURL
+from app.utils.article_writer import ArticleBatchWriter, known_source_urls
+from app.utils.async_pipeline import (
+    AsyncScrapePipeline,
+    DEFERRED,
+    FAILED,
+    SAVED,
+    SKIPPED,
+)
+from app.utils.browser_pool import shutdown_browser_pool
+from app.utils.date_utils import warm_up_date_parser
+from app.utils.frontier import FrontierRecorder, discover
+from app.utils.metrics import get_metrics
+from app.utils.politeness import interleave_by_domain
+from app.utils.refresh import (
+    CHANGED,
+    FAILED as REFRESH_FAILED,
+    UNCHANGED,
+    ArticleRefresher,
+    due_articles,
+)
+from app.utils.resilience import EXTRACTION, CircuitOpen, ScrapeError
 from app.utils.scraper_factory import scrap_article
 
 
 logger = logging.getLogger(__name__)
 
-URLS = [
-    "https://galicjaexpress.pl/ford-c-max-jaki-silnik-benzynowy-wybrac-aby-zaoszczedzic-na-paliwie",
-    "https://galicjaexpress.pl/bmw-e9-30-cs-szczegolowe-informacje-o-osiagach-i-historii-modelu",
-    "https://take-group.github.io/example-blog-without-ssr/jak-kroic-piers-z-kurczaka-aby-uniknac-suchych-kawalkow-miesa",
-    "https://take-group.github.io/example-blog-without-ssr/co-mozna-zrobic-ze-schabu-oprocz-kotletow-5-zaskakujacych-przepisow",
-]
-
 
 class Command(BaseCommand):
-    help = "Scrape predefined articles and store them in the database (unique by source_url)."
+    help = "Scrape the due URLs of the frontier and store the articles (unique by source_url)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Scrape concurrently with the async Playwright API.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.SCRAPER_CONCURRENCY,
+            help="Max pages loaded at once in --async mode.",
+        )
+        parser.add_argument(
+            "--per-domain",
+            type=int,
+            default=settings.SCRAPER_PER_DOMAIN_CONCURRENCY,
+            help="Max pages loaded at once from one domain in --async mode.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SCRAPER_WRITE_BATCH_SIZE,
+            help="Articles written to the database per bulk upsert.",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Revalidate stored articles that are due and update changed ones.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help=(
+                "Max URLs taken from the frontier (default: all due), or max "
+                "articles revalidated in --refresh mode "
+                "(default: SCRAPER_REFRESH_LIMIT)."
+            ),
+        )
+        parser.add_argument(
+            "--discover",
+            action="store_true",
+            help="Run the discovery sources of all scrapers before scraping.",
+        )
+        parser.add_argument(
+            "--flush-interval",
+            type=float,
+            default=settings.SCRAPER_WRITE_FLUSH_INTERVAL,
+            help="Max seconds a scraped article waits for its batch.",
+        )
 
     def handle(self, *args, **options):
-        total = len(URLS)
+        self.frontier = None
+        self.metrics = get_metrics()
+        self.metrics.begin_run()
+        if options["refresh"]:
+            self._refresh(options)
+            self._summary()
+            return
+
+        if options["discover"]:
+            for domain, added in discover().items():
+                self.stdout.write(f"{domain} → {added} nowych adresów")
+
+        now = timezone.now()
+        total = FrontierURL.due(now).count()
+        if options["limit"] is not None:
+            total = min(total, options["limit"])
         self.stdout.write(
             self.style.NOTICE(f"Start. Scrapowanie {total} artykułów")
         )
 
-        for idx, url in enumerate(URLS, start=1):
-            self.stdout.write(f"Scrapuje artykuł {idx}/{total}... {url}")
+        warm_up_date_parser()
 
-            if Article.objects.filter(source_url=url).exists():
-                self.stdout.write(
-                    self.style.WARNING("→ Już w bazie. Pomijam.")
-                )
-                continue
+        self.frontier = FrontierRecorder()
+        chunks = FrontierURL.due_chunks(now, limit=options["limit"])
 
+        if options["use_async"]:
+            pipeline = AsyncScrapePipeline(
+                (url for chunk in chunks for url in chunk),
+                concurrency=options["concurrency"],
+                per_domain=options["per_domain"],
+                notify=self._notify,
+                batch_size=options["batch_size"],
+                flush_interval=options["flush_interval"],
+                checkpoint=self._checkpoint,
+            )
             try:
+                asyncio.run(pipeline.run())
+            finally:
+                self.metrics.flush()
+            self.stdout.write(self.style.SUCCESS("Zakończono."))
+            self._summary()
+            return
+
+        writer = ArticleBatchWriter(
+            batch_size=options["batch_size"],
+            flush_interval=options["flush_interval"],
+            on_saved=lambda article: self._notify(SAVED, article.source_url, article),
+            on_failed=lambda url, e: self._notify(FAILED, url, e),
+        )
+
+        try:
+            with writer:
+                idx = 0
+                for chunk in chunks:
+                    known = known_source_urls(chunk)
+                    for url in interleave_by_domain(chunk):
+                        idx += 1
+                        self.stdout.write(f"Scrapuje artykuł {idx}/{total}... {url}")
+                        self._scrape(url, known, writer)
+                    self.frontier.maybe_flush()
+                    self.metrics.maybe_flush()
+        finally:
+            self.frontier.flush()
+            self.metrics.flush()
+            shutdown_browser_pool()
+
+        self.stdout.write(self.style.SUCCESS("Zakończono."))
+        self._summary()
+
+    def _scrape(self, url, known, writer):
+        if url in known:
+            self.stdout.write(self.style.WARNING("→ Już w bazie. Pomijam."))
+            self._record(SKIPPED, url, None)
+            return
+
+        try:
+            with self.metrics.span("total", url):
                 data = scrap_article(url)
-                if not data:
-                    self.stdout.write(
-                        self.style.ERROR(
-                            "→ Błąd ekstrakcji (pomijam). Szablon strony prawdopodobnie uległ zmianie."
-                        )
+            if not data:
+                self.stdout.write(
+                    self.style.ERROR(
+                        "→ Błąd ekstrakcji (pomijam). Szablon strony prawdopodobnie uległ zmianie."
                     )
-                    continue
+                )
+                self._record(FAILED, url, ScrapeError(EXTRACTION, "błąd ekstrakcji"))
+                return
 
-                article = Article(**data)
-                article.save()
-                self.stdout.write(
-                    self.style.SUCCESS(f"→ Zapisano (id={article.id})")
+            self.stdout.write("→ Pobrano, czeka na zapis.")
+            writer.add(data)
+
+        except CircuitOpen as e:
+            self.stdout.write(self.style.WARNING(f"→ {e}. Odkładam."))
+            self._record(DEFERRED, url, e)
+        except Exception as e:
+            logger.exception("Błąd przy przetwarzaniu %s: %s", url, e)
+            self.stdout.write(self.style.ERROR(f"→ Wyjątek: {e}"))
+            self._record(FAILED, url, e)
+
+    def _checkpoint(self):
+        self.frontier.flush()
+        self.metrics.maybe_flush()
+
+    def _summary(self):
+        self.stdout.write(
+            json.dumps(self.metrics.summary(), ensure_ascii=False, indent=2)
+        )
+
+    def _refresh(self, options):
+        limit = options["limit"] or settings.SCRAPER_REFRESH_LIMIT
+        articles = list(due_articles(limit))
+        self.stdout.write(
+            self.style.NOTICE(f"Start. Odświeżanie {len(articles)} artykułów")
+        )
+
+        warm_up_date_parser()
+
+        writer = ArticleBatchWriter(
+            batch_size=options["batch_size"],
+            flush_interval=options["flush_interval"],
+            on_saved=lambda article: self._notify(SAVED, article.source_url, article),
+            on_failed=lambda url, e: self._notify(FAILED, url, e),
+        )
+        try:
+            with writer:
+                counts = ArticleRefresher(writer, notify=self._notify_refresh).run(
+                    articles
                 )
+        finally:
+            shutdown_browser_pool()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Zakończono. Bez zmian: {counts[UNCHANGED]}, "
+                f"zmienione: {counts[CHANGED]}, błędy: {counts[REFRESH_FAILED]}"
+            )
+        )
 
-            except Exception as e:
-                logger.exception("Błąd przy przetwarzaniu %s: %s", url, e)
-                self.stdout.write(self.style.ERROR(f"→ Wyjątek: {e}"))
+    def _notify_refresh(self, kind, url, detail):
+        if kind == UNCHANGED:
+            self.stdout.write(f"{url} → Bez zmian ({detail}).")
+        elif kind == CHANGED:
+            self.stdout.write(f"{url} → Zmieniony, czeka na zapis.")
+        else:
+            self.stdout.write(self.style.ERROR(f"{url} → Błąd: {detail}"))
 
-        self.stdout.write(self.style.SUCCESS("Zakończono."))
+    def _notify(self, kind, url, detail):
+        if kind == SKIPPED:
+            self.stdout.write(self.style.WARNING(f"{url} → Już w bazie. Pomijam."))
+        elif kind == SAVED:
+            self.stdout.write(
+                self.style.SUCCESS(f"{url} → Zapisano (id={detail.id})")
+            )
+        elif kind == FAILED:
+            self.stdout.write(self.style.ERROR(f"{url} → Wyjątek: {detail}"))
+        elif kind == DEFERRED:
+            self.stdout.write(self.style.WARNING(f"{url} → {detail}. Odkładam."))
+
+        if self.frontier is not None:
+            self._record(kind, url, detail)
+
+    def _record(self, kind, url, detail):
+        self.metrics.outcome(kind, url, detail)
+        if kind == FAILED:
+            self.frontier.failed(url, detail)
+        elif kind == DEFERRED:
+            self.frontier.deferred(url, detail)
+        else:
+            self.frontier.done(url)
@@ -0,0 +1,103 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.utils.async_pipeline import DEFERRED, FAILED, SAVED
+from app.utils.browser_pool import shutdown_browser_pool
+from app.utils.date_utils import warm_up_date_parser
+from app.utils.worker import ScrapeWorker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a scrape worker: claim due frontier URLs under a lease and scrape them. "
+        "Start as many as needed, on any machine using the same database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--worker-id", help="Defaults to host:pid:random.")
+        parser.add_argument(
+            "--claim-size",
+            type=int,
+            default=settings.SCRAPER_WORKER_CLAIM_SIZE,
+            help="URLs claimed per query.",
+        )
+        parser.add_argument(
+            "--lease",
+            type=float,
+            default=settings.SCRAPER_WORKER_LEASE_SECONDS,
+            help="Seconds a claim stays valid without a heartbeat.",
+        )
+        parser.add_argument(
+            "--idle-sleep",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when no URL is due.",
+        )
+        parser.add_argument(
+            "--max-jobs", type=int, help="Exit after claiming this many URLs."
+        )
+        parser.add_argument(
+            "--exit-when-empty",
+            action="store_true",
+            help="Exit when no URL is due instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--report-interval",
+            type=float,
+            default=60.0,
+            help="Seconds between claimed/finished/failed rate reports.",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Scrape concurrently with the async Playwright API.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.SCRAPER_CONCURRENCY
+        )
+        parser.add_argument(
+            "--per-domain", type=int, default=settings.SCRAPER_PER_DOMAIN_CONCURRENCY
+        )
+
+    def handle(self, *args, **options):
+        worker = ScrapeWorker(
+            worker_id=options["worker_id"],
+            claim_size=options["claim_size"],
+            lease_seconds=options["lease"],
+            idle_sleep=options["idle_sleep"],
+            report_interval=options["report_interval"],
+            notify=self._notify,
+            report=lambda text: self.stdout.write(self.style.NOTICE(text)),
+        )
+        # Stop claiming on Ctrl+C / SIGTERM; claimed URLs not started yet
+        # go back to the queue.
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: worker.stop())
+
+        self.stdout.write(self.style.NOTICE(f"Start. Worker {worker.worker_id}"))
+        warm_up_date_parser()
+        try:
+            if options["use_async"]:
+                worker.run_async(
+                    options["max_jobs"],
+                    options["exit_when_empty"],
+                    concurrency=options["concurrency"],
+                    per_domain=options["per_domain"],
+                )
+            else:
+                worker.run(options["max_jobs"], options["exit_when_empty"])
+        finally:
+            shutdown_browser_pool()
+
+    def _notify(self, kind, url, detail):
+        if kind == FAILED:
+            self.stdout.write(self.style.ERROR(f"{url} → Wyjątek: {detail}"))
+        elif kind == SAVED:
+            self.stdout.write(self.style.SUCCESS(f"{url} → Zapisano (id={detail.id})"))
+        elif kind == DEFERRED:
+            self.stdout.write(self.style.WARNING(f"{url} → {detail}. Odkładam."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{url} → Już w bazie. Pomijam."))
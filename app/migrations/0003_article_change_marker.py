@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:00
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_markers(apps, schema_editor):
+    Article = apps.get_model("app", "Article")
+    ArticleChangeMarker = apps.get_model("app", "ArticleChangeMarker")
+    domains = Article.objects.values_list("source_domain", flat=True).distinct()
+    now = timezone.now()
+    ArticleChangeMarker.objects.bulk_create(
+        [ArticleChangeMarker(domain=d.lower(), changed_at=now) for d in domains if d],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0002_article_published_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleChangeMarker",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("domain", models.CharField(max_length=255, unique=True)),
+                ("version", models.BigIntegerField(default=0)),
+                ("changed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(seed_markers, migrations.RunPython.noop),
+    ]
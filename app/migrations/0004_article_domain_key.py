@@ -0,0 +1,93 @@
+from urllib.parse import urlparse
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+BATCH_SIZE = 2000
+
+
+# The key format as of this migration (app.models may change).
+def normalize_domain(host):
+    host = (host or "").strip().lower()
+    if "//" in host:
+        host = urlparse(host).netloc
+    host = host.rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def domain_key_for(domain):
+    domain = normalize_domain(domain)
+    return ".".join(reversed(domain.split("."))) + "." if domain else ""
+
+
+def backfill_domains(apps, schema_editor):
+    Article = apps.get_model("app", "Article")
+    batch = []
+    articles = Article.objects.only("id", "source_domain").order_by("id")
+    for article in articles.iterator(chunk_size=BATCH_SIZE):
+        article.source_domain = normalize_domain(article.source_domain)
+        article.domain_key = domain_key_for(article.source_domain)
+        batch.append(article)
+        if len(batch) >= BATCH_SIZE:
+            Article.objects.bulk_update(batch, ["source_domain", "domain_key"])
+            batch = []
+    if batch:
+        Article.objects.bulk_update(batch, ["source_domain", "domain_key"])
+
+
+def rekey_markers(apps, schema_editor):
+    Article = apps.get_model("app", "Article")
+    ArticleChangeMarker = apps.get_model("app", "ArticleChangeMarker")
+    ArticleChangeMarker.objects.all().delete()
+    keys = Article.objects.values_list("domain_key", flat=True).distinct()
+    now = timezone.now()
+    ArticleChangeMarker.objects.bulk_create(
+        [ArticleChangeMarker(domain_key=k, changed_at=now) for k in keys if k]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0003_article_change_marker"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="domain_key",
+            field=models.CharField(
+                db_collation="C", default="", editable=False, max_length=255
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_domains, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="article",
+            name="source_domain",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                models.F("domain_key"),
+                models.OrderBy(
+                    models.F("published_at"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(models.F("id"), descending=True),
+                name="article_domain_published_idx",
+            ),
+        ),
+        migrations.RenameField(
+            model_name="articlechangemarker",
+            old_name="domain",
+            new_name="domain_key",
+        ),
+        migrations.AlterField(
+            model_name="articlechangemarker",
+            name="domain_key",
+            field=models.CharField(db_collation="C", max_length=255, unique=True),
+        ),
+        migrations.RunPython(rekey_markers, migrations.RunPython.noop),
+    ]
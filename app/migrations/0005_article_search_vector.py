@@ -0,0 +1,122 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+BATCH_SIZE = 5000
+
+CREATE_CONFIG = """
+DO $$
+BEGIN
+    -- Stock Postgres ships no Polish dictionary. Until a stemming
+    -- configuration is installed under this name, fall back to "simple".
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'polish') THEN
+        CREATE TEXT SEARCH CONFIGURATION polish (COPY = pg_catalog.simple);
+    END IF;
+END $$;
+"""
+
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION app_article_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('polish', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('polish', coalesce(NEW.content_text, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(NEW.content_text, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS app_article_search_vector_trigger ON app_article;
+CREATE TRIGGER app_article_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content_text ON app_article
+    FOR EACH ROW EXECUTE FUNCTION app_article_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS app_article_search_vector_trigger ON app_article;
+DROP FUNCTION IF EXISTS app_article_search_vector_update();
+"""
+
+CREATE_INDEX = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS article_search_idx
+    ON app_article USING gin (search_vector);
+"""
+
+DROP_INDEX = "DROP INDEX CONCURRENTLY IF EXISTS article_search_idx;"
+
+
+def _postgres(schema_editor) -> bool:
+    return schema_editor.connection.vendor == "postgresql"
+
+
+def create_trigger(apps, schema_editor):
+    if _postgres(schema_editor):
+        schema_editor.execute(CREATE_CONFIG)
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_trigger(apps, schema_editor):
+    if _postgres(schema_editor):
+        schema_editor.execute(DROP_TRIGGER)
+
+
+def backfill(apps, schema_editor):
+    if not _postgres(schema_editor):
+        return
+
+    # Touching title fires the trigger; one short transaction per batch.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT coalesce(max(id), 0) FROM app_article")
+        (max_id,) = cursor.fetchone()
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            cursor.execute(
+                "UPDATE app_article SET title = title WHERE id >= %s AND id < %s",
+                [start, start + BATCH_SIZE],
+            )
+
+
+def create_index(apps, schema_editor):
+    if _postgres(schema_editor):
+        schema_editor.execute(CREATE_INDEX)
+
+
+def drop_index(apps, schema_editor):
+    if _postgres(schema_editor):
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    # Batched backfill and CREATE INDEX CONCURRENTLY need autocommit.
+    atomic = False
+
+    dependencies = [
+        ("app", "0004_article_domain_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_trigger, drop_trigger),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="article",
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="article_search_idx"
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_index, drop_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,148 @@
+import hashlib
+import zlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, transaction
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+BATCH_SIZE = 1000
+
+# The body format as of this migration (app/utils/body_codec.py may change).
+MIN_COMPRESS_SIZE = 256
+
+
+def body_hash(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+def compress(raw, codec):
+    if codec == "zstd" and zstandard is None:
+        codec = "zlib"
+    if codec == "none" or len(raw) < MIN_COMPRESS_SIZE:
+        return "none", raw
+    if codec == "zstd":
+        data = zstandard.ZstdCompressor(level=3).compress(raw)
+    else:
+        data = zlib.compress(raw, 6)
+    if len(data) >= len(raw):
+        return "none", raw
+    return codec, data
+
+
+def decode_body(data, codec):
+    data = bytes(data)
+    if codec == "zlib":
+        data = zlib.decompress(data)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Treść zapisana w zstd, brak pakietu zstandard")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return data.decode()
+
+
+def move_bodies(apps, schema_editor):
+    Article = apps.get_model("app", "Article")
+    ArticleBody = apps.get_model("app", "ArticleBody")
+    alias = schema_editor.connection.alias
+
+    # One short transaction per batch, so rows are never locked for long.
+    last_id = 0
+    while True:
+        with transaction.atomic(using=alias):
+            batch = list(
+                Article.objects.using(alias)
+                .filter(id__gt=last_id, body__isnull=True)
+                .order_by("id")
+                .only("id", "content_html")[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+
+            bodies = {}
+            for article in batch:
+                raw = article.content_html.encode()
+                article.body_id = body_hash(raw)
+                if article.body_id not in bodies:
+                    codec, data = compress(raw, settings.ARTICLE_BODY_CODEC)
+                    bodies[article.body_id] = ArticleBody(
+                        hash=article.body_id,
+                        codec=codec,
+                        data=data,
+                        raw_size=len(raw),
+                        stored_size=len(data),
+                    )
+
+            ArticleBody.objects.using(alias).bulk_create(
+                bodies.values(), ignore_conflicts=True
+            )
+            Article.objects.using(alias).bulk_update(batch, ["body"])
+            last_id = batch[-1].id
+
+
+def restore_bodies(apps, schema_editor):
+    Article = apps.get_model("app", "Article")
+    alias = schema_editor.connection.alias
+
+    last_id = 0
+    while True:
+        with transaction.atomic(using=alias):
+            batch = list(
+                Article.objects.using(alias)
+                .filter(id__gt=last_id)
+                .select_related("body")
+                .order_by("id")[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+
+            for article in batch:
+                body = article.body
+                article.content_html = (
+                    decode_body(body.data, body.codec) if body else ""
+                )
+            Article.objects.using(alias).bulk_update(batch, ["content_html"])
+            last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    # The body move commits batch by batch.
+    atomic = False
+
+    dependencies = [
+        ("app", "0005_article_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleBody",
+            fields=[
+                (
+                    "hash",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("codec", models.CharField(max_length=8)),
+                ("data", models.BinaryField()),
+                ("raw_size", models.PositiveIntegerField()),
+                ("stored_size", models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="body",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="articles",
+                to="app.articlebody",
+            ),
+        ),
+        migrations.RunPython(move_bodies, restore_bodies),
+    ]
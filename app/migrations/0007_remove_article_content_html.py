@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0006_article_body"),
+    ]
+
+    operations = [
+        # The default lets the reverse migration re-add the column.
+        migrations.AlterField(
+            model_name="article",
+            name="content_html",
+            field=models.TextField(default=""),
+        ),
+        migrations.RemoveField(
+            model_name="article",
+            name="content_html",
+        ),
+    ]
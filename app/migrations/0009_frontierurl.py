@@ -0,0 +1,93 @@
+import django.utils.timezone
+from django.db import migrations, models
+from urllib.parse import urlparse
+
+
+# The articles scraped before discovery existed, so a fresh database still
+# has something to scrape.
+SEED_URLS = [
+    "https://galicjaexpress.pl/ford-c-max-jaki-silnik-benzynowy-wybrac-aby-zaoszczedzic-na-paliwie",
+    "https://galicjaexpress.pl/bmw-e9-30-cs-szczegolowe-informacje-o-osiagach-i-historii-modelu",
+    "https://take-group.github.io/example-blog-without-ssr/jak-kroic-piers-z-kurczaka-aby-uniknac-suchych-kawalkow-miesa",
+    "https://take-group.github.io/example-blog-without-ssr/co-mozna-zrobic-ze-schabu-oprocz-kotletow-5-zaskakujacych-przepisow",
+]
+
+
+def seed(apps, schema_editor):
+    FrontierURL = apps.get_model("app", "FrontierURL")
+    Article = apps.get_model("app", "Article")
+    stored = set(
+        Article.objects.filter(source_url__in=SEED_URLS).values_list(
+            "source_url", flat=True
+        )
+    )
+    FrontierURL.objects.bulk_create(
+        [
+            FrontierURL(
+                url=url,
+                domain=urlparse(url).hostname,
+                source="seed",
+                state="done" if url in stored else "pending",
+            )
+            for url in SEED_URLS
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0008_article_refresh_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FrontierURL",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(unique=True)),
+                ("domain", models.CharField(max_length=255)),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("pending", "pending"),
+                            ("done", "done"),
+                            ("failed", "failed"),
+                        ],
+                        default="pending",
+                        max_length=8,
+                    ),
+                ),
+                ("priority", models.SmallIntegerField(default=0)),
+                (
+                    "next_due_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("source", models.CharField(blank=True, default="", max_length=16)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("discovered_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("state", "pending")),
+                        fields=["-priority", "next_due_at", "id"],
+                        name="frontier_due_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0009_frontierurl"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="frontierurl",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="frontierurl",
+            name="leased_by",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="frontierurl",
+            name="state",
+            field=models.CharField(
+                choices=[
+                    ("pending", "pending"),
+                    ("leased", "leased"),
+                    ("done", "done"),
+                    ("failed", "failed"),
+                ],
+                default="pending",
+                max_length=8,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="frontierurl",
+            index=models.Index(
+                condition=models.Q(("state", "leased")),
+                fields=["lease_expires_at"],
+                name="frontier_lease_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0010_frontierurl_lease"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScrapeFailure",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField()),
+                ("domain", models.CharField(max_length=255)),
+                ("kind", models.CharField(max_length=16)),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=1)),
+                ("error", models.TextField(blank=True, default="")),
+                (
+                    "created_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["domain", "kind", "-created_at"],
+                        name="failure_domain_kind_idx",
+                    ),
+                    models.Index(fields=["-created_at"], name="failure_created_idx"),
+                ],
+            },
+        ),
+    ]
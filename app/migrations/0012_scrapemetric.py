@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0011_scrapefailure"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScrapeMetric",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("series", models.CharField(max_length=512, unique=True)),
+                ("value", models.FloatField(default=0)),
+            ],
+        ),
+    ]
@@ -1,19 +1,604 @@
-from django.db import models
-from urllib.parse import urlparse
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models, transaction
+from django.utils import timezone
+from urllib.parse import urldefrag, urlparse
+
+from .utils.body_codec import body_hash, compress, decode_body
+
+
+def normalize_domain(host: str) -> str:
+    """Lowercase host without scheme, port, trailing dot and leading "www."."""
+
+    host = (host or "").strip().lower()
+    if "//" in host:
+        host = urlparse(host).netloc
+    host = host.rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def domain_from_url(url: str) -> str:
+    return normalize_domain(urlparse(url).netloc)
+
+
+def domain_key_for(domain: str) -> str:
+    """
+    Reversed labels with a trailing dot: "blog.example.com" → "com.example.blog.".
+    A domain and all of its subdomains share the key of the domain as a
+    prefix, so "exact or subdomain" is a single index range scan.
+    """
+
+    domain = normalize_domain(domain)
+    return ".".join(reversed(domain.split("."))) + "." if domain else ""
+
+
+class ArticleBody(models.Model):
+    """
+    Article HTML, stored once per distinct content (syndicated articles
+    share a row) and compressed with the codec from settings.
+    """
+
+    hash = models.CharField(max_length=64, primary_key=True)  # sha256 of the HTML
+    codec = models.CharField(max_length=8)
+    data = models.BinaryField()
+    raw_size = models.PositiveIntegerField()
+    stored_size = models.PositiveIntegerField()
+
+    @classmethod
+    def from_html(cls, html: str) -> "ArticleBody":
+        raw = html.encode()
+        codec, data = compress(raw, settings.ARTICLE_BODY_CODEC)
+        return cls(
+            hash=body_hash(raw),
+            codec=codec,
+            data=data,
+            raw_size=len(raw),
+            stored_size=len(data),
+        )
+
+    @classmethod
+    def store(cls, bodies) -> None:
+        """Inserts the bodies that are not stored yet, in one query."""
+
+        unique = {body.hash: body for body in bodies if body is not None}
+        if unique:
+            cls.objects.bulk_create(unique.values(), ignore_conflicts=True)
+
+    @property
+    def html(self) -> str:
+        return decode_body(self.data, self.codec)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Dedup and compression figures of the body table."""
+
+        Sum = models.Sum
+        referenced = Article.objects.filter(body__isnull=False).aggregate(
+            articles=models.Count("id"), logical_bytes=Sum("body__raw_size")
+        )
+        bodies = cls.objects.aggregate(
+            bodies=models.Count("hash"),
+            raw_bytes=Sum("raw_size"),
+            stored_bytes=Sum("stored_size"),
+        )
+        by_codec = dict(
+            cls.objects.values_list("codec").annotate(n=models.Count("hash"))
+        )
+
+        articles, count = referenced["articles"], bodies["bodies"]
+        logical = referenced["logical_bytes"] or 0
+        stored = bodies["stored_bytes"] or 0
+        return {
+            "articles": articles,
+            "bodies": count,
+            "orphaned_bodies": cls.objects.filter(articles__isnull=True).count(),
+            "dedup_ratio": round(articles / count, 3) if count else None,
+            "logical_bytes": logical,
+            "unique_bytes": bodies["raw_bytes"] or 0,
+            "stored_bytes": stored,
+            "saved_bytes": logical - stored,
+            "bodies_by_codec": by_codec,
+        }
+
+    @classmethod
+    def prune(cls) -> int:
+        """Deletes bodies no article points to; returns how many."""
+
+        deleted, _ = cls.objects.filter(articles__isnull=True).delete()
+        return deleted
+
+    def __str__(self):
+        return f"{self.hash[:12]} ({self.codec}, {self.stored_size} B)"
 
 
 class Article(models.Model):
     title = models.CharField(max_length=500)
-    content_html = models.TextField()
+    # HTML lives in ArticleBody; read and assign it through `content_html`.
+    body = models.ForeignKey(
+        ArticleBody,
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name="articles",
+    )
+    # Kept inline: full-text search indexes it.
     content_text = models.TextField()
     source_url = models.URLField(unique=True)
-    source_domain = models.CharField(max_length=255, db_index=True)
+    source_domain = models.CharField(max_length=255)
+    # Filter key, see domain_key_for(). "C" collation: LIKE 'prefix%' can use
+    # a plain btree index.
+    domain_key = models.CharField(max_length=255, db_collation="C", editable=False)
     published_at = models.DateTimeField(null=True, blank=True)
+    # Maintained by a database trigger (Postgres only), see app/search.py.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Refresh state, see app/utils/refresh.py.
+    http_etag = models.CharField(max_length=255, blank=True, default="")
+    http_last_modified = models.CharField(max_length=64, blank=True, default="")
+    page_hash = models.CharField(max_length=64, blank=True, default="")
+    checked_at = models.DateTimeField(null=True, blank=True)
+    next_check_at = models.DateTimeField(null=True, blank=True)
+    unchanged_checks = models.PositiveIntegerField(default=0)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        indexes = [
+            # Keyset pagination order of the articles API.
+            models.Index(
+                models.F("published_at").desc(nulls_last=True),
+                models.F("id").desc(),
+                name="article_published_id_idx",
+            ),
+            # Latest articles of a domain (and its subdomains).
+            models.Index(
+                models.F("domain_key"),
+                models.F("published_at").desc(nulls_last=True),
+                models.F("id").desc(),
+                name="article_domain_published_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="article_search_idx"),
+            # Articles due for a refresh check.
+            models.Index(
+                models.F("next_check_at").asc(nulls_first=True),
+                name="article_next_check_idx",
+            ),
+        ]
+
+    _content_html = None
+    _new_body = None  # ArticleBody for HTML assigned since the last save
+
+    @property
+    def content_html(self) -> str:
+        if self._content_html is None:
+            self._content_html = self.body.html if self.body_id else ""
+        return self._content_html
+
+    @content_html.setter
+    def content_html(self, value: str) -> None:
+        self._content_html = value
+        self._new_body = ArticleBody.from_html(value or "")
+        self.body = self._new_body
+
+    def prepare_body(self) -> Optional[ArticleBody]:
+        """
+        The not yet stored body of newly assigned HTML (see
+        `ArticleBody.store`); None when the HTML is unchanged.
+        """
+
+        return self._new_body
+
+    def schedule_check(self, changed: bool, now: Optional[datetime] = None) -> None:
+        """
+        Records a refresh check. The interval to the next one doubles with
+        every check that found no change, up to the configured maximum.
+        """
+
+        now = now or timezone.now()
+        self.unchanged_checks = 0 if changed else self.unchanged_checks + 1
+        hours = min(
+            settings.SCRAPER_REFRESH_MIN_INTERVAL_HOURS * 2**self.unchanged_checks,
+            settings.SCRAPER_REFRESH_MAX_INTERVAL_HOURS,
+        )
+        self.checked_at = now
+        self.next_check_at = now + timedelta(hours=hours)
+
+    def fill_domain(self) -> None:
         if self.source_url and not self.source_domain:
-            self.source_domain = urlparse(self.source_url).netloc
+            self.source_domain = domain_from_url(self.source_url)
+        self.source_domain = normalize_domain(self.source_domain)
+        self.domain_key = domain_key_for(self.source_domain)
+
+    def save(self, *args, **kwargs):
+        self.fill_domain()
+        ArticleBody.store([self._new_body])
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "source_domain" in update_fields:
+                update_fields.add("domain_key")
+            if "content_html" in update_fields:
+                update_fields = (update_fields - {"content_html"}) | {"body"}
+            kwargs["update_fields"] = update_fields
         super().save(*args, **kwargs)
+        self._new_body = None
 
     def __str__(self):
         return f"{self.title} ({self.source_domain})"
+
+
+class ArticleChangeMarker(models.Model):
+    """
+    Per-domain counter bumped on every article write. The articles API
+    derives its ETag / Last-Modified from these rows, so conditional
+    requests are answered without reading the article table.
+    """
+
+    domain_key = models.CharField(max_length=255, unique=True, db_collation="C")
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    @classmethod
+    def bump(cls, domains) -> None:
+        # Sorted, so concurrent writers lock the rows in the same order.
+        keys = sorted({domain_key_for(d) for d in domains if d})
+        if not keys:
+            return
+
+        now = timezone.now()
+        rows = cls.objects.filter(domain_key__in=keys)
+        bump = {"version": models.F("version") + 1, "changed_at": now}
+        if rows.update(**bump) < len(keys):
+            # First write of a domain. Bumping the others twice is harmless.
+            cls.objects.bulk_create(
+                [cls(domain_key=k, changed_at=now) for k in keys],
+                ignore_conflicts=True,
+            )
+            rows.update(**bump)
+
+    @classmethod
+    def current(cls, domain=None) -> tuple[int, Optional[datetime]]:
+        """
+        (version, changed_at) of a domain together with its subdomains, or
+        of all domains when `domain` is None.
+        """
+
+        qs = cls.objects.all()
+        if domain is not None:
+            qs = qs.filter(domain_key__startswith=domain_key_for(domain))
+        state = qs.aggregate(
+            version=models.Sum("version"), changed_at=models.Max("changed_at")
+        )
+        return state["version"] or 0, state["changed_at"]
+
+    def __str__(self):
+        return f"{self.domain_key} v{self.version}"
+
+
+class FrontierURL(models.Model):
+    """
+    A URL to scrape. Discovery (see app/utils/frontier.py) enqueues
+    article URLs here; `scrape_articles` drains the due ones in priority
+    order, a chunk at a time.
+    """
+
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+    STATES = [
+        (PENDING, "pending"),
+        (LEASED, "leased"),
+        (DONE, "done"),
+        (FAILED, "failed"),
+    ]
+
+    # Same limit as Article.source_url, so every queued URL can be stored.
+    url = models.URLField(unique=True)
+    domain = models.CharField(max_length=255)
+    state = models.CharField(max_length=8, choices=STATES, default=PENDING)
+    priority = models.SmallIntegerField(default=0)  # higher first
+    next_due_at = models.DateTimeField(default=timezone.now)
+    source = models.CharField(max_length=16, blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    discovered_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set while a scrape worker holds the URL, see app/utils/worker.py.
+    leased_by = models.CharField(max_length=100, blank=True, default="")
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Only pending rows: the drain order stays a small index scan
+            # however many URLs are already done.
+            models.Index(
+                fields=["-priority", "next_due_at", "id"],
+                name="frontier_due_idx",
+                condition=models.Q(state="pending"),
+            ),
+            models.Index(
+                fields=["lease_expires_at"],
+                name="frontier_lease_idx",
+                condition=models.Q(state="leased"),
+            ),
+        ]
+
+    @classmethod
+    def enqueue(
+        cls, urls, source: str = "", priority: int = 0, chunk_size: int = 1000
+    ) -> int:
+        """
+        Adds the new ones of `urls` (any iterable, consumed a chunk at a
+        time) as pending. URLs already queued or already stored as articles
+        are skipped; returns how many were added.
+        """
+
+        added = 0
+        chunk: dict[str, None] = {}
+        for url in urls:
+            url = cls.clean_url(url)
+            if url is not None:
+                chunk[url] = None
+            if len(chunk) >= chunk_size:
+                added += cls._enqueue_chunk(list(chunk), source, priority)
+                chunk = {}
+        if chunk:
+            added += cls._enqueue_chunk(list(chunk), source, priority)
+        return added
+
+    @classmethod
+    def clean_url(cls, url: str) -> Optional[str]:
+        """`url` without its fragment, or None when it cannot be queued."""
+
+        url = urldefrag(url.strip())[0]
+        max_length = cls._meta.get_field("url").max_length
+        if url.startswith(("http://", "https://")) and len(url) <= max_length:
+            return url
+        return None
+
+    @classmethod
+    def _enqueue_chunk(cls, urls: list[str], source: str, priority: int) -> int:
+        known = set(cls.objects.filter(url__in=urls).values_list("url", flat=True))
+        known.update(
+            Article.objects.filter(source_url__in=urls).values_list(
+                "source_url", flat=True
+            )
+        )
+        new = [
+            cls(url=url, domain=domain_from_url(url), source=source, priority=priority)
+            for url in urls
+            if url not in known
+        ]
+        # A concurrent discovery run may have queued some in the meantime.
+        cls.objects.bulk_create(new, ignore_conflicts=True)
+        return len(new)
+
+    @classmethod
+    def due(cls, now: Optional[datetime] = None):
+        return cls.objects.filter(
+            state=cls.PENDING, next_due_at__lte=now or timezone.now()
+        ).order_by("-priority", "next_due_at", "id")
+
+    @classmethod
+    def due_chunks(
+        cls,
+        now: Optional[datetime] = None,
+        chunk_size: int = 500,
+        limit: Optional[int] = None,
+    ):
+        """
+        Yields the URLs due at `now` as lists of at most `chunk_size`, in
+        drain order. Each chunk is one keyset query continuing after the
+        previous one, so rows finished in the meantime do not shift it.
+        """
+
+        qs = cls.due(now or timezone.now())
+        last = None
+        while limit is None or limit > 0:
+            page = qs
+            if last is not None:
+                priority, due_at, pk = last
+                page = page.filter(
+                    models.Q(priority__lt=priority)
+                    | models.Q(priority=priority, next_due_at__gt=due_at)
+                    | models.Q(priority=priority, next_due_at=due_at, id__gt=pk)
+                )
+            size = chunk_size if limit is None else min(chunk_size, limit)
+            rows = list(page.values_list("priority", "next_due_at", "id", "url")[:size])
+            if not rows:
+                return
+            yield [row[3] for row in rows]
+            last = rows[-1][:3]
+            if limit is not None:
+                limit -= len(rows)
+
+    @classmethod
+    def claim(cls, worker: str, limit: int, lease: timedelta) -> list[str]:
+        """
+        Leases up to `limit` due URLs to `worker`. Rows locked by another
+        worker's claim are skipped (FOR UPDATE SKIP LOCKED), so workers
+        never wait for each other or get the same URL.
+        """
+
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                cls.due(now)
+                .select_for_update(skip_locked=True)
+                .values_list("id", "url")[:limit]
+            )
+            cls.objects.filter(id__in=[pk for pk, _ in rows]).update(
+                state=cls.LEASED, leased_by=worker, lease_expires_at=now + lease
+            )
+        return [url for _, url in rows]
+
+    @classmethod
+    def extend_leases(cls, worker: str, lease: timedelta) -> int:
+        return cls.objects.filter(state=cls.LEASED, leased_by=worker).update(
+            lease_expires_at=timezone.now() + lease
+        )
+
+    @classmethod
+    def release(cls, worker: str, urls=None) -> int:
+        """Returns leased URLs (all of `worker`'s by default) to the queue."""
+
+        qs = cls.objects.filter(state=cls.LEASED, leased_by=worker)
+        if urls is not None:
+            qs = qs.filter(url__in=list(urls))
+        return qs.update(state=cls.PENDING, leased_by="", lease_expires_at=None)
+
+    @classmethod
+    def reclaim_expired(cls) -> int:
+        """Requeues URLs whose worker stopped renewing its lease."""
+
+        return cls.objects.filter(
+            state=cls.LEASED, lease_expires_at__lt=timezone.now()
+        ).update(state=cls.PENDING, leased_by="", lease_expires_at=None)
+
+    @classmethod
+    def _finished(cls, worker: Optional[str]):
+        # A worker only finishes URLs it still holds; a reclaimed lease
+        # belongs to whoever claimed the URL next.
+        if worker is None:
+            return cls.objects.all()
+        return cls.objects.filter(state=cls.LEASED, leased_by=worker)
+
+    @classmethod
+    def mark_done(cls, urls, worker: Optional[str] = None) -> None:
+        cls._finished(worker).filter(url__in=list(urls)).update(
+            state=cls.DONE,
+            finished_at=timezone.now(),
+            leased_by="",
+            lease_expires_at=None,
+        )
+
+    @classmethod
+    def mark_failed(cls, url: str, error, worker: Optional[str] = None) -> None:
+        cls._finished(worker).filter(url=url).update(
+            state=cls.FAILED,
+            attempts=models.F("attempts") + 1,
+            last_error=str(error)[:1000],
+            finished_at=timezone.now(),
+            leased_by="",
+            lease_expires_at=None,
+        )
+
+    @classmethod
+    def defer(
+        cls, urls, until: datetime, reason: str = "", worker: Optional[str] = None
+    ) -> None:
+        """Puts `urls` back as pending, due at `until`; not a failed attempt."""
+
+        cls._finished(worker).filter(url__in=list(urls)).update(
+            state=cls.PENDING,
+            next_due_at=until,
+            last_error=reason[:1000],
+            leased_by="",
+            lease_expires_at=None,
+        )
+
+    def __str__(self):
+        return f"{self.url} ({self.state})"
+
+
+class ScrapeFailure(models.Model):
+    """
+    One URL that could not be scraped: the error kind (DNS, connect,
+    timeout, HTTP status, missing selector, ... see app/utils/resilience.py),
+    after how many attempts. Written in bulk with the frontier outcome.
+    """
+
+    url = models.URLField()
+    domain = models.CharField(max_length=255)
+    kind = models.CharField(max_length=16)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=1)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["domain", "kind", "-created_at"], name="failure_domain_kind_idx"
+            ),
+            models.Index(fields=["-created_at"], name="failure_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({self.kind})"
+
+
+class ScrapeMetric(models.Model):
+    """
+    Cumulative value of one Prometheus series (e.g.
+    `scrape_pages_total{domain="a.pl",outcome="saved"}`), summed over all
+    scraper processes; see app/utils/metrics.py.
+    """
+
+    series = models.CharField(max_length=512, unique=True)
+    value = models.FloatField(default=0)
+
+    @classmethod
+    def add(cls, deltas: dict[str, float]) -> None:
+        """Adds `deltas` to the stored series, creating the missing ones."""
+
+        if not deltas:
+            return
+        table = connection.ops.quote_name(cls._meta.db_table)
+        # ON CONFLICT ... DO UPDATE adds to the stored value atomically, so
+        # concurrent processes do not lose each other's increments; sorted,
+        # so they lock the rows in the same order.
+        sql = (
+            f"INSERT INTO {table} (series, value) VALUES (%s, %s) "
+            f"ON CONFLICT (series) DO UPDATE SET value = {table}.value + EXCLUDED.value"
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, sorted(deltas.items()))
+
+    def __str__(self):
+        return f"{self.series} {self.value:g}"
+
+
+class ScrapeJob(models.Model):
+    """
+    URLs submitted together through the scrape jobs API. The URLs are
+    queued in the frontier like discovered ones; the progress of the job
+    is read from their frontier rows (see app/utils/scrape_jobs.py).
+    """
+
+    created_at = models.DateTimeField(default=timezone.now)
+    priority = models.SmallIntegerField(default=0)
+    # As submitted, and repeated URLs among them.
+    submitted_urls = models.PositiveIntegerField(default=0)
+    duplicate_urls = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"#{self.pk} ({self.submitted_urls} URL)"
+
+
+class ScrapeJobItem(models.Model):
+    """
+    One distinct URL of a job with what was decided on submission. Queued
+    items follow the state of the frontier row of the same URL.
+    """
+
+    QUEUED = "queued"
+    EXISTS = "exists"  # already stored as an article
+    INVALID = "invalid"  # not a URL, or no scraper for the domain
+    STATUSES = [(QUEUED, "queued"), (EXISTS, "exists"), (INVALID, "invalid")]
+
+    job = models.ForeignKey(ScrapeJob, on_delete=models.CASCADE, related_name="items")
+    # Invalid input is kept as submitted, so no URL validation or length limit.
+    url = models.TextField()
+    status = models.CharField(max_length=8, choices=STATUSES)
+    reason = models.CharField(max_length=100, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job", "status", "id"], name="job_item_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({self.status})"
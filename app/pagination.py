@@ -0,0 +1,191 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ArticleCursorPagination(BasePagination):
+    """
+    Keyset pagination over (published_at DESC NULLS LAST, id DESC).
+
+    Pages are fetched with `WHERE <position> ... LIMIT page_size + 1`
+    against the matching composite index, so there is no OFFSET and no
+    COUNT(*). Cursors are opaque base64 tokens of the boundary row.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        reverse = bool(position and position[2])
+
+        if position is not None:
+            queryset = queryset.filter(
+                self._before(position) if reverse else self._after(position)
+            )
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def get_ordering(self, reverse: bool) -> tuple:
+        if reverse:
+            return F("published_at").asc(nulls_first=True), F("id").asc()
+        return F("published_at").desc(nulls_last=True), F("id").desc()
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.ARTICLES_PAGE_SIZE
+        return max(1, min(size, settings.ARTICLES_MAX_PAGE_SIZE))
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def decode_cursor(self, request) -> Optional[tuple]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded))
+            position = self.decode_position(data["p"])
+            return position, int(data["i"]), bool(data.get("r"))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def decode_position(self, value):
+        return datetime.fromisoformat(value) if value else None
+
+    def encode_position(self, article):
+        published = article.published_at
+        return published.isoformat() if published else None
+
+    def encode_cursor(self, article, reverse: bool) -> str:
+        data = {
+            "p": self.encode_position(article),
+            "i": article.id,
+            "r": int(reverse),
+        }
+        raw = json.dumps(data, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _link(self, article, reverse: bool) -> str:
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(article, reverse)
+        )
+
+    def _after(self, position) -> Q:
+        published, pk, _ = position
+        if published is None:
+            return Q(published_at__isnull=True, id__lt=pk)
+        # The leading `published_at <= p` bounds the index range scan.
+        return (
+            Q(published_at__lte=published)
+            & (Q(published_at__lt=published) | Q(id__lt=pk))
+        ) | Q(published_at__isnull=True)
+
+    def _before(self, position) -> Q:
+        published, pk, _ = position
+        if published is None:
+            return Q(published_at__isnull=False) | Q(
+                published_at__isnull=True, id__gt=pk
+            )
+        return Q(published_at__gte=published) & (
+            Q(published_at__gt=published) | Q(id__gt=pk)
+        )
+
+
+class ArticleSearchPagination(ArticleCursorPagination):
+    """
+    Keyset pagination of search results over (rank DESC, id DESC); the
+    queryset must be annotated with `rank`.
+    """
+
+    def get_ordering(self, reverse: bool) -> tuple:
+        if reverse:
+            return F("rank").asc(), F("id").asc()
+        return F("rank").desc(), F("id").desc()
+
+    def decode_position(self, value) -> float:
+        return float(value)
+
+    def encode_position(self, article) -> float:
+        return article.rank
+
+    def _after(self, position) -> Q:
+        rank, pk, _ = position
+        return Q(rank__lt=rank) | Q(rank=rank, id__lt=pk)
+
+    def _before(self, position) -> Q:
+        rank, pk, _ = position
+        return Q(rank__gt=rank) | Q(rank=rank, id__gt=pk)
+
+
+class ScrapeJobItemPagination(ArticleCursorPagination):
+    """Keyset pagination of the items of a scrape job in submission (id) order."""
+
+    def get_ordering(self, reverse: bool) -> tuple:
+        return ("-id",) if reverse else ("id",)
+
+    def encode_position(self, item) -> None:
+        return None
+
+    def _after(self, position) -> Q:
+        return Q(id__gt=position[1])
+
+    def _before(self, position) -> Q:
+        return Q(id__lt=position[1])
@@ -0,0 +1,46 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+)
+from django.db import connection
+from django.db.models import F
+
+
+# Text search configurations of Article.search_vector (see migration 0005).
+# "polish" stems words; "simple" keeps names and numbers as written.
+SEARCH_CONFIGS = ("polish", "simple")
+
+HEADLINE_OPTIONS = {
+    "start_sel": "<mark>",
+    "stop_sel": "</mark>",
+    "max_words": 35,
+    "min_words": 15,
+    "max_fragments": 2,
+}
+
+
+def search_supported() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def search_query(text: str) -> SearchQuery:
+    """`websearch_to_tsquery` in every configuration, OR-ed together."""
+
+    return reduce(
+        or_,
+        (SearchQuery(text, config=c, search_type="websearch") for c in SEARCH_CONFIGS),
+    )
+
+
+def search_rank(query: SearchQuery) -> SearchRank:
+    return SearchRank(F("search_vector"), query, cover_density=True)
+
+
+def search_headline(query: SearchQuery) -> SearchHeadline:
+    return SearchHeadline(
+        "content_text", query, config=SEARCH_CONFIGS[0], **HEADLINE_OPTIONS
+    )
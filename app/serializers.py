@@ -1,12 +1,21 @@
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
 from rest_framework import serializers
 from django.utils import timezone
 from zoneinfo import ZoneInfo
 from .models import Article
+from .utils.body_codec import decode_body
 
 WARSAW_TZ = ZoneInfo("Europe/Warsaw")
 
 
 class ArticleSerializer(serializers.ModelSerializer):
+    """Pass `fields=[...]` to render only a subset of the fields."""
+
     published_at = serializers.SerializerMethodField()
 
     class Meta:
@@ -21,6 +30,12 @@ class ArticleSerializer(serializers.ModelSerializer):
             "published_at",
         ]
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def get_published_at(self, obj):
 
         if not obj.published_at:
@@ -29,3 +44,103 @@ class ArticleSerializer(serializers.ModelSerializer):
         dt = obj.published_at.astimezone(WARSAW_TZ)
 
         return dt.strftime("%d.%m.%Y %H:%M:%S")
+
+
+# --- Fast read-only rendering ---
+# Produces the same bytes as ArticleSerializer + DRF's JSONRenderer, but
+# works on `values_list(named=True)` rows and skips per-field serializer
+# dispatch.
+
+
+def format_published_at(value: Optional[datetime]) -> Optional[str]:
+    """Same output as `ArticleSerializer.get_published_at`."""
+
+    if not value:
+        return None
+
+    if value.tzinfo is not dt_timezone.utc:
+        value = value.astimezone(dt_timezone.utc)
+
+    # Warsaw's UTC offset only changes on whole UTC hours, so one
+    # zoneinfo lookup per hour is enough.
+    hour = value.replace(minute=0, second=0, microsecond=0)
+    local = value + _warsaw_offset(hour)
+
+    return (
+        f"{local.day:02d}.{local.month:02d}.{local.year:04d} "
+        f"{local.hour:02d}:{local.minute:02d}:{local.second:02d}"
+    )
+
+
+@lru_cache(maxsize=8192)
+def _warsaw_offset(utc_hour: datetime) -> timedelta:
+    return utc_hour.astimezone(WARSAW_TZ).utcoffset()
+
+
+def article_row_to_dict(row, fields: Iterable[str]) -> dict:
+    item = {name: getattr(row, name) for name in fields}
+    if "published_at" in item:
+        item["published_at"] = format_published_at(item["published_at"])
+    if hasattr(row, "content_html_codec"):
+        data, codec = item["content_html"], row.content_html_codec
+        item["content_html"] = decode_body(data, codec)
+    return item
+
+
+def dump_json(data) -> str:
+    """`json.dumps` with the settings of DRF's default JSONRenderer."""
+
+    ret = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+
+def iter_article_list_json(
+    rows: Iterable, fields: Iterable[str], envelope: dict, chunk_size: int = 200
+) -> Iterator[bytes]:
+    """
+    Streams `{**envelope, "results": [...]}` as JSON, `chunk_size` rows
+    per chunk.
+    """
+
+    fields = tuple(fields)
+    head = dump_json({**envelope, "results": []})
+    # Everything up to and including the opening bracket of "results".
+    yield head[:-2].encode()
+
+    chunk = []
+    first = True
+    for row in rows:
+        chunk.append(article_row_to_dict(row, fields))
+        if len(chunk) >= chunk_size:
+            yield _list_items(chunk, first)
+            chunk = []
+            first = False
+
+    if chunk:
+        yield _list_items(chunk, first)
+
+    yield b"]}"
+
+
+def _list_items(items: list, first: bool) -> bytes:
+    # Dumps the chunk as one list and drops its brackets.
+    body = dump_json(items)[1:-1]
+    return (body if first else "," + body).encode()
+
+
+class ScrapeJobSubmitSerializer(serializers.Serializer):
+    """Input of `POST /scrape-jobs/`; the URLs themselves are checked per URL."""
+
+    urls = serializers.ListField(
+        child=serializers.CharField(allow_blank=True, trim_whitespace=False),
+        allow_empty=False,
+    )
+    priority = serializers.IntegerField(
+        required=False, min_value=-32768, max_value=32767
+    )
+
+    def validate_urls(self, value):
+        limit = settings.SCRAPE_JOB_MAX_URLS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} URLs per job.")
+        return value
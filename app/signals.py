@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Article, ArticleChangeMarker
+
+
+# Covers save() and delete() (admin included). bulk_create / update() send
+# no signals; bulk writers call ArticleChangeMarker.bump themselves.
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def bump_change_marker(sender, instance, **kwargs):
+    ArticleChangeMarker.bump([instance.source_domain])
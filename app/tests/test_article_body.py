@@ -0,0 +1,117 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from app.models import Article, ArticleBody
+from app.utils import body_codec
+from app.utils.article_writer import ArticleBatchWriter
+
+HTML = "<p>Treść artykułu, powtarzana w wielu serwisach.</p>" * 40
+
+
+def _article(url, html=HTML):
+    return Article.objects.create(
+        title="T", content_html=html, content_text="x", source_url=url
+    )
+
+
+class TestBodyCodec(SimpleTestCase):
+
+    def test_round_trip(self):
+        raw = HTML.encode()
+        for codec in (body_codec.NONE, body_codec.ZLIB):
+            used, data = body_codec.compress(raw, codec)
+            self.assertEqual(used, codec)
+            self.assertEqual(body_codec.decompress(data, used), raw)
+
+        self.assertLess(len(body_codec.compress(raw, body_codec.ZLIB)[1]), len(raw))
+
+    def test_small_bodies_are_stored_as_is(self):
+        self.assertEqual(
+            body_codec.compress(b"<p>x</p>", body_codec.ZLIB),
+            (body_codec.NONE, b"<p>x</p>"),
+        )
+
+    def test_zstd_falls_back_to_zlib_without_the_package(self):
+        with patch.object(body_codec, "zstandard", None):
+            used, data = body_codec.compress(HTML.encode(), body_codec.ZSTD)
+        self.assertEqual(used, body_codec.ZLIB)
+        self.assertEqual(body_codec.decode_body(data, used), HTML)
+
+    def test_unknown_codec_raises(self):
+        with self.assertRaises(ValueError):
+            body_codec.compress(b"x", "lz4")
+
+
+class TestArticleBody(TestCase):
+
+    def test_identical_bodies_are_stored_once(self):
+        _article("https://a.pl/1")
+        _article("https://b.pl/1")
+        _article("https://b.pl/2", html="<p>inna</p>")
+
+        self.assertEqual(ArticleBody.objects.count(), 2)
+        body = ArticleBody.objects.get(hash=Article.objects.first().body_id)
+        self.assertEqual(body.codec, "zlib")
+        self.assertLess(body.stored_size, body.raw_size)
+
+    def test_html_is_loaded_lazily(self):
+        article_id = _article("https://a.pl/1").id
+
+        article = Article.objects.get(id=article_id)
+        with self.assertNumQueries(1):
+            self.assertEqual(article.content_html, HTML)
+            self.assertEqual(article.content_html, HTML)
+
+    def test_update_fields_content_html_saves_body(self):
+        article = _article("https://a.pl/1")
+        article.content_html = "<p>nowa</p>"
+        article.save(update_fields=["content_html"])
+
+        stored = Article.objects.get(id=article.id)
+        self.assertEqual(stored.content_html, "<p>nowa</p>")
+
+    @override_settings(ARTICLE_BODY_CODEC="none")
+    def test_codec_comes_from_settings(self):
+        self.assertEqual(_article("https://a.pl/1").body.codec, "none")
+
+    def test_batch_writer_stores_shared_bodies_once(self):
+        with ArticleBatchWriter(batch_size=10) as writer:
+            for idx in range(3):
+                writer.add(
+                    {
+                        "title": "T",
+                        "content_html": HTML,
+                        "content_text": "x",
+                        "source_url": f"https://a.pl/{idx}",
+                        "published_at": None,
+                    }
+                )
+
+        self.assertEqual(Article.objects.count(), 3)
+        self.assertEqual(ArticleBody.objects.count(), 1)
+        self.assertEqual(Article.objects.last().content_html, HTML)
+
+    def test_stats_and_prune(self):
+        _article("https://a.pl/1")
+        _article("https://b.pl/1")
+        orphan = _article("https://b.pl/2", html="<p>inna</p>")
+        orphan.delete()
+
+        stats = ArticleBody.stats()
+        self.assertEqual(stats["articles"], 2)
+        self.assertEqual(stats["bodies"], 2)
+        self.assertEqual(stats["orphaned_bodies"], 1)
+        self.assertEqual(stats["dedup_ratio"], 1.0)
+        self.assertEqual(stats["logical_bytes"], 2 * len(HTML.encode()))
+        self.assertGreater(stats["saved_bytes"], len(HTML.encode()))
+
+        out = StringIO()
+        call_command("article_body_stats", "--prune", "--json", stdout=out)
+        stats = json.loads(out.getvalue().split("\n", 1)[1])
+        self.assertEqual(stats["bodies"], 1)
+        self.assertEqual(stats["orphaned_bodies"], 0)
+        self.assertEqual(stats["dedup_ratio"], 2.0)
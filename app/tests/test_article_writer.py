@@ -0,0 +1,92 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.models import Article, ArticleChangeMarker
+from app.utils.article_writer import ArticleBatchWriter, known_source_urls
+
+
+def _data(url, title="T"):
+    return {
+        "title": title,
+        "content_html": "<p>x</p>",
+        "content_text": "x",
+        "source_url": url,
+        "published_at": timezone.now(),
+    }
+
+
+class TestKnownSourceUrls(TestCase):
+
+    def test_returns_stored_urls_in_chunked_queries(self):
+        Article.objects.create(**_data("https://a.pl/1"))
+        Article.objects.create(**_data("https://a.pl/3"))
+        urls = [f"https://a.pl/{i}" for i in range(5)]
+
+        with self.assertNumQueries(3):
+            known = known_source_urls(urls, chunk_size=2)
+
+        self.assertSetEqual(known, {"https://a.pl/1", "https://a.pl/3"})
+
+
+class TestArticleBatchWriter(TestCase):
+
+    def test_flushes_when_batch_is_full(self):
+        saved = []
+        writer = ArticleBatchWriter(
+            batch_size=2, flush_interval=60, on_saved=saved.append
+        )
+
+        writer.add(_data("https://a.pl/1"))
+        self.assertEqual(Article.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            writer.add(_data("https://www.a.pl/2"))
+
+        inserts = [
+            q
+            for q in ctx.captured_queries
+            if q["sql"].startswith('INSERT INTO "app_article"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+        self.assertEqual(Article.objects.count(), 2)
+        self.assertEqual(
+            Article.objects.get(source_url="https://www.a.pl/2").source_domain,
+            "a.pl",
+        )
+        self.assertTrue(all(article.pk for article in saved))
+        self.assertEqual(ArticleChangeMarker.current("a.pl")[0], 1)
+
+    def test_upserts_existing_rows(self):
+        Article.objects.create(**_data("https://a.pl/1", title="Old"))
+
+        with ArticleBatchWriter(batch_size=10, flush_interval=60) as writer:
+            writer.add(_data("https://a.pl/1", title="New"))
+            writer.add(_data("https://a.pl/2"))
+
+        self.assertEqual(Article.objects.count(), 2)
+        self.assertEqual(Article.objects.get(source_url="https://a.pl/1").title, "New")
+
+    def test_flushes_after_interval(self):
+        writer = ArticleBatchWriter(batch_size=100, flush_interval=0)
+
+        writer.add(_data("https://a.pl/1"))
+
+        self.assertEqual(Article.objects.count(), 1)
+
+    def test_broken_row_does_not_lose_the_batch(self):
+        failed = []
+        writer = ArticleBatchWriter(
+            batch_size=10,
+            flush_interval=60,
+            on_failed=lambda url, e: failed.append(url),
+        )
+        writer.add(_data("https://a.pl/1"))
+        writer.add({**_data("https://a.pl/2"), "title": None})
+
+        saved = writer.flush()
+
+        self.assertEqual([a.source_url for a in saved], ["https://a.pl/1"])
+        self.assertEqual(failed, ["https://a.pl/2"])
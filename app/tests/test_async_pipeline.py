@@ -0,0 +1,175 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import patch, MagicMock
+
+from django.test import TestCase, override_settings
+
+from app.models import Article
+from app.utils.async_pipeline import (
+    AsyncScrapePipeline,
+    DEFERRED,
+    FAILED,
+    SAVED,
+    SKIPPED,
+)
+from app.utils.main_scraper import MainScraper
+from app.utils.resilience import CircuitBreakers
+
+
+class _FakePool:
+    @asynccontextmanager
+    async def page(self):
+        yield MagicMock()
+
+
+class _SlowScraper(MainScraper):
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    async def extract_raw_async(self, url, page):
+        self.tracker.enter(url)
+        await asyncio.sleep(0.01)
+        self.tracker.leave(url)
+        if url.endswith("/broken"):
+            raise RuntimeError("boom")
+        if url.startswith("https://down.pl/"):
+            raise ConnectionError("refused")
+        if url.endswith("/flaky") and url not in self.tracker.failed_once:
+            self.tracker.failed_once.add(url)
+            raise ConnectionError("reset")
+        return {
+            "title": url.rsplit("/", 1)[-1],
+            "content_html": "<p>x</p>",
+            "content_text": "x",
+            "datetime_raw": "14.10.2024",
+        }
+
+
+class _Tracker:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.active_by_host = {}
+        self.max_by_host = {}
+        self.attempts = []
+        self.failed_once = set()
+
+    def enter(self, url):
+        self.attempts.append(url)
+        host = url.split("/")[2]
+        self.active += 1
+        self.active_by_host[host] = self.active_by_host.get(host, 0) + 1
+        self.max_active = max(self.max_active, self.active)
+        self.max_by_host[host] = max(
+            self.max_by_host.get(host, 0), self.active_by_host[host]
+        )
+
+    def leave(self, url):
+        host = url.split("/")[2]
+        self.active -= 1
+        self.active_by_host[host] -= 1
+
+
+@override_settings(SCRAPER_STATIC_FAST_PATH=False, SCRAPER_RETRY_BASE_DELAY=0)
+class TestAsyncScrapePipeline(TestCase):
+
+    def setUp(self):
+        self.tracker = _Tracker()
+        patcher = patch(
+            "app.utils.async_pipeline.get_scraper_for_domain",
+            side_effect=lambda url: _SlowScraper(self.tracker),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        breakers = patch("app.utils.resilience._breakers", CircuitBreakers())
+        self.breakers = breakers.start()
+        self.addCleanup(breakers.stop)
+
+    def _run(self, urls, **kwargs):
+        events = []
+        pipeline = AsyncScrapePipeline(
+            urls,
+            pool=_FakePool(),
+            notify=lambda kind, url, detail: events.append((kind, url)),
+            **kwargs,
+        )
+        return pipeline, events
+
+    async def test_saves_articles_and_respects_limits(self):
+        urls = [f"https://a.pl/{i}" for i in range(6)] + [
+            f"https://b.pl/{i}" for i in range(6)
+        ]
+        pipeline, events = self._run(urls, concurrency=4, per_domain=2)
+
+        await pipeline.run()
+
+        self.assertEqual(await Article.objects.acount(), 12)
+        self.assertEqual({kind for kind, _ in events}, {SAVED})
+        self.assertLessEqual(self.tracker.max_active, 4)
+        self.assertLessEqual(max(self.tracker.max_by_host.values()), 2)
+
+    async def test_skips_stored_urls_and_keeps_going_after_failure(self):
+        await Article.objects.acreate(
+            title="Old",
+            content_html="<p>old</p>",
+            content_text="old",
+            source_url="https://a.pl/old",
+        )
+        urls = ["https://a.pl/old", "https://a.pl/broken", "https://a.pl/new"]
+        pipeline, events = self._run(urls)
+
+        await pipeline.run()
+
+        self.assertIn((SKIPPED, "https://a.pl/old"), events)
+        self.assertIn((FAILED, "https://a.pl/broken"), events)
+        self.assertIn((SAVED, "https://a.pl/new"), events)
+        self.assertTrue(
+            await Article.objects.filter(source_url="https://a.pl/new").aexists()
+        )
+
+    async def test_reads_input_in_chunks(self):
+        consumed = []
+
+        def urls():
+            for i in range(5):
+                consumed.append(i)
+                yield f"https://a.pl/{i}"
+
+        checkpoints = []
+        pipeline, events = self._run(
+            urls(),
+            checkpoint=lambda: checkpoints.append(len(consumed)),
+            input_chunk_size=2,
+        )
+
+        await pipeline.run()
+
+        self.assertEqual(await Article.objects.acount(), 5)
+        # After each input chunk (2 + 2 + 1 URLs) and once more at the end.
+        self.assertEqual(checkpoints, [2, 4, 5, 5])
+
+    async def test_retries_transient_failures(self):
+        pipeline, events = self._run(["https://a.pl/flaky"])
+
+        await pipeline.run()
+
+        self.assertEqual(events, [(SAVED, "https://a.pl/flaky")])
+        self.assertEqual(self.tracker.attempts, ["https://a.pl/flaky"] * 2)
+
+    @override_settings(SCRAPER_RETRY_ATTEMPTS=1)
+    async def test_defers_urls_of_a_host_whose_breaker_opened(self):
+        self.breakers.threshold = 1
+        urls = [f"https://down.pl/{i}" for i in range(3)] + ["https://a.pl/1"]
+        pipeline, events = self._run(urls, per_domain=1)
+
+        await pipeline.run()
+
+        self.assertEqual(
+            [(kind, url) for kind, url in events if "down" in url],
+            [
+                (FAILED, "https://down.pl/0"),
+                (DEFERRED, "https://down.pl/1"),
+                (DEFERRED, "https://down.pl/2"),
+            ],
+        )
+        self.assertIn((SAVED, "https://a.pl/1"), events)
@@ -0,0 +1,77 @@
+import time
+
+import requests
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from app.benchmarks import scraping
+from app.benchmarks.fixture_server import FixtureServer, fixture_urls, render_fixture
+from app.models import Article, FrontierURL
+from app.utils.domain_scrapers import GalicjaExpressScraper, TakeGroupScraper
+
+
+class TestFixtureServer(SimpleTestCase):
+
+    def test_urls_cover_every_route(self):
+        self.assertEqual(len(fixture_urls(3)), 9)
+        static = fixture_urls(3, static_only=True)
+        self.assertEqual(len(static), 6)
+        self.assertFalse(any(TakeGroupScraper().needs_browser(url) for url in static))
+
+    def test_every_url_gets_its_own_article(self):
+        first, _ = render_fixture("galicjaexpress.pl", "/bench-00001/")
+        second, _ = render_fixture("galicjaexpress.pl", "/bench-00002/")
+
+        self.assertIn("Artykuł testowy bench-00001".encode(), first)
+        self.assertNotEqual(first, second)
+        self.assertIsNone(render_fixture("example.com", "/a/"))
+
+    def test_serves_as_http_proxy_with_latency_and_bandwidth(self):
+        with FixtureServer(latency=0.05, bandwidth=20_000) as server:
+            started = time.perf_counter()
+            response = requests.get(
+                "http://galicjaexpress.pl/bench-00001/",
+                proxies={"http": server.url},
+                timeout=10,
+            )
+            elapsed = time.perf_counter() - started
+            robots = requests.get(
+                "http://galicjaexpress.pl/robots.txt",
+                proxies={"http": server.url},
+                timeout=10,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.content), 5_000)
+        self.assertGreaterEqual(elapsed, 0.05 + len(response.content) / 20_000 * 0.9)
+        self.assertIn("Allow: /", robots.text)
+        self.assertEqual(server.requests, 2)
+
+    @override_settings(SCRAPER_POLITENESS=False, SCRAPER_STATIC_FAST_PATH=True)
+    def test_scrapers_fetch_fixtures_through_scraper_proxy(self):
+        with FixtureServer() as server, override_settings(SCRAPER_PROXY=server.url):
+            article = GalicjaExpressScraper().extract_article(
+                "http://galicjaexpress.pl/bench-00007/"
+            )
+
+        self.assertEqual(article["title"], "Artykuł testowy bench-00007")
+        self.assertEqual(article["published_at"].year, 2024)
+
+
+@override_settings(SCRAPER_RETRY_BASE_DELAY=0)
+class TestScrapingBenchmark(TestCase):
+
+    def setUp(self):
+        FrontierURL.objects.all().delete()
+
+    def test_reports_throughput_phases_and_db_writes(self):
+        result = scraping.run(pages=2, latency=0, use_async=False, static_only=True)
+
+        self.assertEqual(result["pages"], {"saved": 4})
+        self.assertEqual(Article.objects.count(), 4)
+        self.assertEqual(result["db"]["rows"], 4)
+        self.assertGreater(result["bytes"]["http"], 0)
+        self.assertTrue(
+            {"static_fetch", "extract", "parse_date", "total", "db_write"}
+            <= set(result["phases"])
+        )
+        self.assertGreater(result["peak_rss_mb"]["process"], 0)
@@ -0,0 +1,111 @@
+from django.test import SimpleTestCase
+from unittest.mock import patch, MagicMock
+
+from playwright.sync_api import Error as PlaywrightError
+
+from app.utils.browser_pool import BrowserPool
+
+
+class TestBrowserPool(SimpleTestCase):
+
+    def setUp(self):
+        patcher = patch("app.utils.browser_pool.sync_playwright")
+        self.mock_sync_playwright = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.mock_p = MagicMock()
+        self.mock_sync_playwright.return_value.start.return_value = self.mock_p
+        self.mock_p.chromium.launch.side_effect = lambda **kw: MagicMock()
+
+    def test_reuses_browser_between_pages(self):
+        pool = BrowserPool(size=1, max_pages_per_context=10)
+
+        with pool.page() as first:
+            pass
+        with pool.page() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(self.mock_p.chromium.launch.call_count, 1)
+        first.goto.assert_called_with("about:blank")
+
+    def test_round_robin_over_browsers(self):
+        pool = BrowserPool(size=2)
+
+        with pool.page() as first:
+            pass
+        with pool.page() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        self.assertEqual(self.mock_p.chromium.launch.call_count, 2)
+
+    def test_recycles_context_after_max_pages(self):
+        pool = BrowserPool(size=1, max_pages_per_context=2)
+
+        with pool.page():
+            pass
+        context = pool._slots[0].context
+        with pool.page():
+            pass
+
+        context.close.assert_called_once()
+        self.assertIsNone(pool._slots[0].context)
+
+        with pool.page():
+            pass
+        self.assertEqual(self.mock_p.chromium.launch.call_count, 1)
+
+    @patch("app.utils.browser_pool.chromium_rss_mb", return_value=900.0)
+    def test_recycles_context_when_rss_limit_exceeded(self, _mock_rss):
+        pool = BrowserPool(size=1, max_pages_per_context=100, max_rss_mb=500)
+
+        with pool.page():
+            pass
+
+        self.assertIsNone(pool._slots[0].context)
+
+    def test_replaces_crashed_browser(self):
+        pool = BrowserPool(size=1)
+
+        with pool.page():
+            pass
+        crashed = pool._slots[0].browser
+        crashed.is_connected.return_value = False
+
+        with pool.page():
+            pass
+
+        self.assertIsNot(pool._slots[0].browser, crashed)
+        self.assertEqual(self.mock_p.chromium.launch.call_count, 2)
+
+    def test_playwright_error_propagates_and_context_is_rebuilt(self):
+        pool = BrowserPool(size=1, max_pages_per_context=10)
+        pool.start()
+        pool._slots[0].browser = browser = MagicMock()
+        browser.new_context.side_effect = lambda: MagicMock()
+
+        with self.assertRaises(PlaywrightError):
+            with pool.page():
+                raise PlaywrightError("net::ERR_NAME_NOT_RESOLVED")
+
+        slot = pool._slots[0]
+        self.assertIsNone(slot.context)
+        self.assertFalse(slot.in_use)
+
+        with pool.page():
+            fresh = slot.context
+        self.assertIsNotNone(fresh)
+        self.assertEqual(browser.new_context.call_count, 2)
+
+    def test_close_shuts_down_browsers_and_playwright(self):
+        pool = BrowserPool(size=2)
+        with pool.page():
+            pass
+        browser = pool._slots[0].browser
+
+        pool.close()
+
+        browser.close.assert_called_once()
+        self.mock_p.stop.assert_called_once()
+        self.assertIsNone(pool._slots[0].browser)
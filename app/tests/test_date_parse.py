@@ -1,9 +1,15 @@
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from freezegun import freeze_time
 
-from app.utils.date_utils import parse_any_date, WARSAW
+from app.utils.date_utils import (
+    parse_any_date,
+    parse_fast,
+    _parse_absolute,
+    _parse_with_dateparser,
+    WARSAW,
+)
 
 
 @pytest.mark.parametrize(
@@ -66,3 +72,71 @@ def test_parse_any_date_parametrized(frozen_iso, raw, expected):
     assert got.tzinfo is not None
     assert isinstance(got.tzinfo, ZoneInfo)
     assert got.tzinfo.key == "Europe/Warsaw"
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "14.10.2024 12:30",
+        "1.2.2024",
+        "14/10/2024",
+        "14 października 2024",
+        "14 Października 2024, 12:30",
+        "14 pazdziernika 2024 r.",
+        "12 stycznia 2025 08:05:07",
+        "October 14, 2024",
+        "Oct 14, 2024 12:30",
+        "14 Oct 2024",
+    ],
+)
+def test_fast_path_matches_dateparser(raw):
+    fast = parse_fast(raw)
+
+    assert fast is not None
+    assert fast == _parse_with_dateparser(raw, str(WARSAW))
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("2024-10-14", datetime(2024, 10, 14, 0, 0, 0, tzinfo=WARSAW)),
+        ("2024-10-14 12:30", datetime(2024, 10, 14, 12, 30, 0, tzinfo=WARSAW)),
+        (
+            "2024-10-14T10:30:00Z",
+            datetime(2024, 10, 14, 12, 30, 0, tzinfo=WARSAW),
+        ),
+        (
+            "2024-10-14T12:30:00.123+02:00",
+            datetime(2024, 10, 14, 12, 30, 0, 123000, tzinfo=WARSAW),
+        ),
+    ],
+)
+def test_iso_8601(raw, expected):
+    got = parse_any_date(raw)
+
+    assert got == expected
+    assert got.tzinfo.key == "Europe/Warsaw"
+
+
+def test_invalid_date_falls_back_to_dateparser():
+    assert parse_fast("31.02.2024") is None
+    assert parse_any_date("31.02.2024") is None
+
+
+def test_absolute_dates_are_memoized():
+    _parse_absolute.cache_clear()
+
+    parse_any_date("3 marca 2024")
+    parse_any_date("3 marca 2024")
+
+    info = _parse_absolute.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_relative_dates_are_not_memoized():
+    with freeze_time("2024-11-05 15:45:10+01:00"):
+        first = parse_any_date("2 days ago")
+    with freeze_time("2024-11-06 15:45:10+01:00"):
+        second = parse_any_date("2 days ago")
+
+    assert second - first == timedelta(days=1)
@@ -1,15 +1,47 @@
-from django.test import TestCase, SimpleTestCase
+import json
+from unittest import skipIf, skipUnless
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib import admin
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
 
-from app.models import Article
+from app.admin import ArticleAdmin
+from app.models import (
+    Article,
+    ArticleChangeMarker,
+    domain_key_for,
+    normalize_domain,
+)
+from app.utils.article_writer import ArticleBatchWriter
+from app.search import search_query
+from app.serializers import ArticleSerializer, format_published_at
+from app.utils.extraction import article_spec
 from app.utils.main_scraper import MainScraper
+from app.utils.resilience import ScrapeError
 from app.utils.scraper_factory import SCRAPER_REGISTRY, get_scraper_for_domain
 
 
+def _json(response):
+    """Decoded body of a (possibly streaming) API response."""
+
+    if not hasattr(response, "_decoded"):
+        if response.streaming:
+            response._decoded = json.loads(b"".join(response.streaming_content))
+        elif hasattr(response, "data"):
+            response._decoded = response.data
+        else:
+            response._decoded = json.loads(response.content)
+    return response._decoded
+
+
 # ---MODELS---
 class TestArticleModel(TestCase):
 
@@ -17,8 +49,9 @@ class TestArticleModel(TestCase):
         test_cases = [
             ("https://example.com/some/path?x=1", "example.com"),
             ("http://example.com", "example.com"),
-            ("https://www.example.com/articles/123", "www.example.com"),
-            ("https://example.com:8443/docs", "example.com:8443"),
+            ("https://www.example.com/articles/123", "example.com"),
+            ("https://example.com:8443/docs", "example.com"),
+            ("https://News.Example.COM./x", "news.example.com"),
         ]
 
         for url, expected_domain in test_cases:
@@ -33,6 +66,13 @@ class TestArticleModel(TestCase):
 
             article.save()
             self.assertEqual(article.source_domain, expected_domain)
+            self.assertEqual(article.domain_key, domain_key_for(expected_domain))
+
+    def test_domain_key_is_reversed_and_normalized(self):
+        self.assertEqual(domain_key_for("blog.example.com"), "com.example.blog.")
+        self.assertEqual(domain_key_for("WWW.Example.com:443"), "com.example.")
+        self.assertEqual(domain_key_for(""), "")
+        self.assertEqual(normalize_domain("https://www.a.pl:8080/x"), "a.pl")
 
 
 # ---VIEWS---
@@ -69,37 +109,449 @@ class TestArticleViewSet(APITestCase):
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
-        returned_ids = {item["id"] for item in resp.data}
+        returned_ids = {item["id"] for item in _json(resp)["results"]}
         self.assertSetEqual(returned_ids, {self.a1.id, self.a2.id, self.a3.id})
 
     def test_retrieve_returns_single_article(self):
         url = reverse("article-detail", args=[self.a2.id])
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertEqual(resp.data["id"], self.a2.id)
-        self.assertEqual(resp.data["title"], "Two")
-        self.assertEqual(resp.data["source_domain"], "blog.example.com")
+        self.assertEqual(_json(resp)["id"], self.a2.id)
+        self.assertEqual(_json(resp)["title"], "Two")
+        self.assertEqual(_json(resp)["source_domain"], "blog.example.com")
 
     def test_list_filters_by_source_domain(self):
         url = reverse("article-list")
-        resp = self.client.get(url, {"source": " example.COM "})
+        resp = self.client.get(url, {"source": " www.example.COM:443 "})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        ids = [item["id"] for item in resp.data]
-        self.assertEqual(ids, [self.a1.id])
+        ids = {item["id"] for item in _json(resp)["results"]}
+        self.assertSetEqual(ids, {self.a1.id, self.a2.id})
 
         resp2 = self.client.get(url, {"source": "blog.example.com"})
         self.assertEqual(resp2.status_code, status.HTTP_200_OK)
-        ids2 = [item["id"] for item in resp2.data]
+        ids2 = [item["id"] for item in _json(resp2)["results"]]
         self.assertEqual(ids2, [self.a2.id])
 
+    def test_source_filter_does_not_match_lookalike_domains(self):
+        Article.objects.create(
+            title="Four",
+            content_html="<p>four</p>",
+            content_text="four",
+            source_url="https://notexample.com/a4",
+            published_at=timezone.now(),
+        )
+        resp = self.client.get(reverse("article-list"), {"source": "example.com"})
+        ids = {item["id"] for item in _json(resp)["results"]}
+        self.assertSetEqual(ids, {self.a1.id, self.a2.id})
+
+    def test_source_filter_is_a_prefix_range_on_domain_key(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("article-list"), {"source": "example.com"})
+
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertRegex(sql, r'"domain_key"(::text)? LIKE')
+        self.assertNotIn("UPPER", sql)
+
+    @skipUnless(connection.vendor == "postgresql", "EXPLAIN is Postgres-specific")
+    def test_source_filter_uses_domain_index(self):
+        key = domain_key_for("example.com")
+        qs = Article.objects.filter(domain_key__startswith=key).order_by(
+            F("published_at").desc(nulls_last=True), F("id").desc()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = qs.explain()
+        self.assertIn("article_domain_published_idx", plan)
+        self.assertIn("Index Cond", plan)
+
     def test_list_no_filter_when_source_empty(self):
         url = reverse("article-list")
         resp = self.client.get(url, {"source": ""})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        returned_ids = {item["id"] for item in resp.data}
+        returned_ids = {item["id"] for item in _json(resp)["results"]}
         self.assertSetEqual(returned_ids, {self.a1.id, self.a2.id, self.a3.id})
 
 
+class TestArticleSparseFields(APITestCase):
+    def setUp(self):
+        self.article = Article.objects.create(
+            title="One",
+            content_html="<p>one</p>",
+            content_text="one",
+            source_url="https://example.com/a1",
+            source_domain="example.com",
+            published_at=timezone.now(),
+        )
+
+    def test_list_defaults_to_summary_without_bodies(self):
+        url = reverse("article-list")
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        item = _json(resp)["results"][0]
+        self.assertSetEqual(
+            set(item),
+            {"id", "title", "source_url", "source_domain", "published_at"},
+        )
+        select = [q["sql"] for q in ctx.captured_queries if "app_article" in q["sql"]]
+        self.assertTrue(select)
+        for sql in select:
+            self.assertNotIn("content_html", sql)
+            self.assertNotIn("content_text", sql)
+
+    def test_retrieve_defaults_to_full_article(self):
+        url = reverse("article-detail", args=[self.article.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(_json(resp)["content_html"], "<p>one</p>")
+        self.assertEqual(_json(resp)["content_text"], "one")
+
+    def test_fields_parameter_selects_columns(self):
+        url = reverse("article-list")
+        resp = self.client.get(url, {"fields": "title,content_text"})
+
+        self.assertEqual(
+            _json(resp)["results"][0], {"title": "One", "content_text": "one"}
+        )
+
+    def test_omit_parameter_drops_fields(self):
+        url = reverse("article-detail", args=[self.article.id])
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url, {"omit": "content_html"})
+
+        self.assertNotIn("content_html", _json(resp))
+        self.assertIn("content_text", _json(resp))
+        self.assertNotIn("content_html", ctx.captured_queries[-1]["sql"])
+
+    def test_unknown_field_returns_400(self):
+        url = reverse("article-list")
+        resp = self.client.get(url, {"fields": "title,password"})
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestArticlePagination(APITestCase):
+    def setUp(self):
+        now = timezone.now()
+        published = [
+            now,
+            now,
+            now - timedelta(days=1),
+            None,
+            now - timedelta(days=2),
+            None,
+            now,
+        ]
+        self.articles = [
+            Article.objects.create(
+                title=f"A{idx}",
+                content_html="<p>x</p>",
+                content_text="x",
+                source_url=f"https://example.com/a{idx}",
+                source_domain="example.com" if idx % 2 else "another.net",
+                published_at=published_at,
+            )
+            for idx, published_at in enumerate(published)
+        ]
+        self.expected = [
+            a.id
+            for a in sorted(
+                self.articles,
+                key=lambda a: (
+                    a.published_at is not None,
+                    a.published_at or now,
+                    a.id,
+                ),
+                reverse=True,
+            )
+        ]
+
+    def _walk(self, params):
+        url = reverse("article-list")
+        pages = []
+        resp = self.client.get(url, params)
+        while True:
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            pages.append(_json(resp))
+            if not _json(resp)["next"]:
+                return pages
+            resp = self.client.get(_json(resp)["next"])
+
+    def test_walks_all_pages_in_order_with_ties_and_nulls(self):
+        pages = self._walk({"page_size": 2})
+
+        ids = [item["id"] for page in pages for item in page["results"]]
+        self.assertEqual(ids, self.expected)
+        self.assertIsNone(pages[0]["previous"])
+        self.assertEqual(len(pages), 4)
+
+    def test_previous_link_returns_previous_page(self):
+        pages = self._walk({"page_size": 2})
+
+        for earlier, later in zip(pages, pages[1:]):
+            resp = self.client.get(later["previous"])
+            self.assertEqual(
+                [item["id"] for item in _json(resp)["results"]],
+                [item["id"] for item in earlier["results"]],
+            )
+
+    def test_works_with_source_filter(self):
+        pages = self._walk({"page_size": 1, "source": "example.com"})
+
+        ids = [item["id"] for page in pages for item in page["results"]]
+        expected = [
+            pk
+            for pk in self.expected
+            if Article.objects.get(pk=pk).source_domain == "example.com"
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_no_count_or_offset_queries(self):
+        url = reverse("article-list")
+        first = self.client.get(url, {"page_size": 2})
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(_json(first)["next"])
+
+        for query in ctx.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"].upper())
+            self.assertNotIn("OFFSET", query["sql"].upper())
+
+    def test_invalid_cursor_returns_404(self):
+        url = reverse("article-list")
+        resp = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(ARTICLES_CACHE_TIMEOUT=0)
+class TestFastRendering(APITestCase):
+    def setUp(self):
+        base = datetime(2024, 3, 31, 0, 30, tzinfo=dt_timezone.utc)
+        for idx in range(6):
+            Article.objects.create(
+                title=f"Zażółć \"gęślą\" jaźń {idx} \u2028 <b>&</b>",
+                content_html="<p>Treść\n\u2029 artykułu</p>",
+                content_text="Treść\tartykułu",
+                source_url=f"https://example.com/a{idx}",
+                source_domain="example.com",
+                published_at=None if idx == 3 else base + timedelta(minutes=25 * idx),
+            )
+
+    def _body(self, response):
+        if response.streaming:
+            return b"".join(response.streaming_content)
+        return response.content
+
+    def _assert_same_bytes(self, url, params=None):
+        fast = self.client.get(url, params)
+        self.assertTrue(fast.streaming)
+        with override_settings(ARTICLES_FAST_RENDERING=False):
+            slow = self.client.get(url, params)
+        self.assertFalse(slow.streaming)
+
+        self.assertEqual(fast.status_code, slow.status_code)
+        self.assertEqual(fast["Content-Type"], slow["Content-Type"])
+        self.assertEqual(self._body(fast), self._body(slow))
+
+    def test_list_output_is_identical_to_serializer(self):
+        url = reverse("article-list")
+        self._assert_same_bytes(url)
+        self._assert_same_bytes(url, {"page_size": 2})
+        self._assert_same_bytes(url, {"fields": "title,content_html,published_at"})
+
+        next_url = _json(self.client.get(url, {"page_size": 2}))["next"]
+        self._assert_same_bytes(next_url)
+
+    def test_retrieve_output_is_identical_to_serializer(self):
+        for article in Article.objects.all():
+            url = reverse("article-detail", args=[article.id])
+            self._assert_same_bytes(url)
+            self._assert_same_bytes(url, {"omit": "content_text"})
+
+    def test_retrieve_missing_article_returns_404(self):
+        resp = self.client.get(reverse("article-detail", args=[999999]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_published_at_formatting_across_dst(self):
+        serializer = ArticleSerializer()
+        start = datetime(2024, 3, 30, 22, 0, tzinfo=dt_timezone.utc)
+        for minutes in range(0, 60 * 24 * 220, 17):
+            value = start + timedelta(minutes=minutes, seconds=minutes % 60)
+            article = Article(published_at=value)
+            self.assertEqual(
+                format_published_at(value), serializer.get_published_at(article)
+            )
+
+
+class TestArticleResponseCaching(APITestCase):
+    def setUp(self):
+        self.url = reverse("article-list")
+        for idx, domain in enumerate(["a.pl", "b.pl"]):
+            Article.objects.create(
+                title=f"T{idx}",
+                content_html="<p>x</p>",
+                content_text="x",
+                source_url=f"https://{domain}/{idx}",
+                source_domain=domain,
+                published_at=timezone.now(),
+            )
+
+    def test_save_and_delete_bump_domain_marker(self):
+        version, _ = ArticleChangeMarker.current("a.pl")
+        article = Article.objects.get(source_domain="a.pl")
+        article.save()
+        self.assertEqual(ArticleChangeMarker.current("a.pl")[0], version + 1)
+        article.delete()
+        self.assertEqual(ArticleChangeMarker.current("a.pl")[0], version + 2)
+
+    def test_response_has_validators(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", resp)
+        self.assertIn("Accept", resp["Vary"])
+
+    def test_if_none_match_returns_304_without_article_queries(self):
+        etag = self.client.get(self.url, {"source": "a.pl"})["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(
+                self.url, {"source": "a.pl"}, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn('"app_article"', ctx.captured_queries[0]["sql"])
+
+    def test_cached_body_is_served_until_domain_changes(self):
+        first = self.client.get(self.url, {"source": "a.pl"})
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(self.url, {"source": "a.pl"})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(first.content, second.content)
+
+        Article.objects.filter(source_domain="a.pl").update(title="Nowy")
+        ArticleChangeMarker.bump(["a.pl"])
+        third = self.client.get(self.url, {"source": "a.pl"})
+        self.assertNotEqual(third["ETag"], first["ETag"])
+        self.assertEqual(_json(third)["results"][0]["title"], "Nowy")
+
+    def test_other_domain_writes_keep_etag(self):
+        etag = self.client.get(self.url, {"source": "a.pl"})["ETag"]
+        all_etag = self.client.get(self.url)["ETag"]
+
+        with ArticleBatchWriter(batch_size=10) as writer:
+            writer.add(
+                {
+                    "title": "Nowy",
+                    "content_html": "<p>y</p>",
+                    "content_text": "y",
+                    "source_url": "https://b.pl/new",
+                    "published_at": None,
+                }
+            )
+
+        self.assertEqual(self.client.get(self.url, {"source": "a.pl"})["ETag"], etag)
+        self.assertNotEqual(self.client.get(self.url)["ETag"], all_etag)
+
+    def test_etag_depends_on_query(self):
+        a = self.client.get(self.url, {"fields": "title"})["ETag"]
+        b = self.client.get(self.url, {"fields": "id"})["ETag"]
+        self.assertNotEqual(a, b)
+
+    def test_errors_are_not_cached(self):
+        resp = self.client.get(self.url, {"fields": "nope"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("ETag", resp)
+
+
+@skipUnless(connection.vendor == "postgresql", "full-text search needs Postgres")
+@override_settings(ARTICLES_CACHE_TIMEOUT=0)
+class TestArticleSearch(APITestCase):
+    def setUp(self):
+        self.url = reverse("article-list")
+        texts = [
+            ("Kot na dachu", "Kot siedział na dachu. Kot miauczał."),
+            ("Pies w ogrodzie", "Pies biegał, a kot patrzył z okna."),
+            ("Pogoda", "Jutro słońce i 25 stopni."),
+        ]
+        self.articles = [
+            Article.objects.create(
+                title=title,
+                content_html=f"<p>{text}</p>",
+                content_text=text,
+                source_url=f"https://example.com/{idx}",
+                published_at=timezone.now(),
+            )
+            for idx, (title, text) in enumerate(texts)
+        ]
+
+    def test_q_returns_ranked_matches_with_headlines(self):
+        results = _json(self.client.get(self.url, {"q": "kot"}))["results"]
+
+        self.assertEqual(
+            [r["id"] for r in results], [self.articles[0].id, self.articles[1].id]
+        )
+        self.assertGreater(results[0]["rank"], results[1]["rank"])
+        self.assertIn("<mark>", results[0]["headline"])
+        self.assertNotIn("content_html", results[0])
+
+    def test_websearch_syntax_and_simple_config(self):
+        results = _json(self.client.get(self.url, {"q": '"25 stopni" -kot'}))
+        self.assertEqual([r["id"] for r in results["results"]], [self.articles[2].id])
+
+    def test_pagination_walks_all_matches(self):
+        seen = []
+        url, params = self.url, {"q": "kot", "page_size": 1}
+        while url:
+            data = _json(self.client.get(url, params))
+            seen.extend(r["id"] for r in data["results"])
+            url, params = data["next"], None
+        self.assertEqual(seen, [self.articles[0].id, self.articles[1].id])
+
+    def test_vector_follows_bulk_upserts(self):
+        with ArticleBatchWriter(batch_size=10) as writer:
+            writer.add(
+                {
+                    "title": "Pogoda",
+                    "content_html": "<p>Burza</p>",
+                    "content_text": "Nadciąga burza.",
+                    "source_url": "https://example.com/2",
+                    "published_at": None,
+                }
+            )
+
+        found = _json(self.client.get(self.url, {"q": "burza"}))["results"]
+        self.assertEqual([r["id"] for r in found], [self.articles[2].id])
+        self.assertEqual(_json(self.client.get(self.url, {"q": "stopni"}))["results"], [])
+
+    def test_search_uses_gin_index(self):
+        qs = Article.objects.filter(search_vector=search_query("kot"))
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = qs.explain()
+        self.assertIn("article_search_idx", plan)
+
+    def test_admin_search_uses_full_text_and_domains(self):
+        model_admin = ArticleAdmin(Article, admin.site)
+        qs, _ = model_admin.get_search_results(None, Article.objects.all(), "pies")
+        self.assertEqual(list(qs), [self.articles[1]])
+        qs, _ = model_admin.get_search_results(
+            None, Article.objects.all(), "www.example.com"
+        )
+        self.assertEqual(qs.count(), 3)
+
+
+class TestArticleSearchUnsupported(APITestCase):
+    @skipIf(connection.vendor == "postgresql", "search is supported on Postgres")
+    def test_q_returns_400_without_postgres(self):
+        resp = self.client.get(reverse("article-list"), {"q": "kot"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 # ---SCRAPER_FACTORY---
 class ExampleScraper:
     pass
@@ -134,89 +586,52 @@ class TestGetScraperForDomain(SimpleTestCase):
 
 
 class _DummyScraper(MainScraper):
-    def _extract_title(self, page):
-        return None
-
-    def _extract_content_html(self, page):
-        return None
-
-    def _extract_content_plain_text(self, page):
-        return None
-
-    def _extract_published(self, page):
-        return None
+    spec = article_spec(title="h1", content="div", published="time")
 
 
+@override_settings(SCRAPER_POLITENESS=False)
 class TestFetchPageLogs(SimpleTestCase):
 
     @patch("app.utils.main_scraper.logger")
-    @patch("app.utils.main_scraper.sync_playwright")
-    def test_logs_error_when_http_status_is_400_plus(
-        self, mock_sync_playwright, mock_logger
-    ):
+    def test_logs_error_when_http_status_is_400_plus(self, mock_logger):
 
-        mock_p = MagicMock()
-        mock_browser = MagicMock()
         mock_page = MagicMock()
         mock_response = MagicMock()
         mock_response.status = 404
-
-        mock_sync_playwright.return_value.start.return_value = mock_p
-        mock_p.chromium.launch.return_value = mock_browser
-        mock_browser.new_page.return_value = mock_page
         mock_page.goto.return_value = mock_response
 
         scraper = _DummyScraper()
         url = "https://example.com/whatever"
-        p, page = scraper.fetch_page(url)
+        with self.assertRaises(ScrapeError):
+            scraper.fetch_page(url, mock_page)
 
         mock_logger.error.assert_called_with(f"{url} → BŁĄD HTTP 404")
-        self.assertIsNotNone(p)
-        self.assertIs(page, mock_page)
+        mock_page.wait_for_selector.assert_not_called()
 
     @patch("app.utils.main_scraper.logger")
-    @patch("app.utils.main_scraper.sync_playwright")
-    def test_does_not_log_error_when_status_ok(
-        self, mock_sync_playwright, mock_logger
-    ):
+    def test_does_not_log_error_when_status_ok(self, mock_logger):
 
-        mock_p = MagicMock()
-        mock_browser = MagicMock()
         mock_page = MagicMock()
         mock_response = MagicMock()
         mock_response.status = 200
-
-        mock_sync_playwright.return_value.start.return_value = mock_p
-        mock_p.chromium.launch.return_value = mock_browser
-        mock_browser.new_page.return_value = mock_page
         mock_page.goto.return_value = mock_response
 
         scraper = _DummyScraper()
         url = "https://example.com/ok"
-        p, page = scraper.fetch_page(url)
+        page = scraper.fetch_page(url, mock_page)
 
         mock_logger.error.assert_not_called()
-        self.assertIsNotNone(p)
         self.assertIs(page, mock_page)
 
     @patch("app.utils.main_scraper.logger")
-    @patch("app.utils.main_scraper.sync_playwright")
-    def test_logs_error_when_response_is_none(
-        self, mock_sync_playwright, mock_logger
-    ):
+    def test_logs_error_when_response_is_none(self, mock_logger):
 
-        mock_p = MagicMock()
-        mock_browser = MagicMock()
         mock_page = MagicMock()
-
-        mock_sync_playwright.return_value.start.return_value = mock_p
-        mock_p.chromium.launch.return_value = mock_browser
-        mock_browser.new_page.return_value = mock_page
         mock_page.goto.return_value = None
 
         scraper = _DummyScraper()
         url = "https://example.com/no-response"
-        scraper.fetch_page(url)
+        scraper.fetch_page(url, mock_page)
 
         mock_logger.error.assert_called_with(
             f"{url} → brak odpowiedzi od serwera"
@@ -0,0 +1,168 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app.export import CSV, NDJSON, resume_point
+from app.models import Article
+
+
+def _lines(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+class _ArticlesMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.articles = [
+            Article.objects.create(
+                title=f"Artykuł {idx}",
+                content_html=f'<p>Akapit "{idx}"</p>\n<p>drugi</p>',
+                content_text=f'Akapit "{idx}"\n\ndrugi',
+                source_url=f"https://{domain}/{idx}",
+                published_at=datetime(2024, 10, day, 12, tzinfo=dt_timezone.utc),
+            )
+            for idx, (domain, day) in enumerate(
+                [
+                    ("galicjaexpress.pl", 1),
+                    ("a.galicjaexpress.pl", 10),
+                    ("example.com", 10),
+                    ("galicjaexpress.pl", 20),
+                    ("galicjaexpress.pl", 31),
+                ]
+            )
+        ]
+        self.ids = [a.id for a in self.articles]
+
+
+@override_settings(ARTICLES_EXPORT_CHUNK_SIZE=2)
+class TestExportEndpoint(_ArticlesMixin, TestCase):
+
+    def _get(self, **params):
+        response = self.client.get(reverse("article-export"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_streams_ndjson_in_id_order(self):
+        response, body = self._get()
+
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        rows = _lines(body)
+        self.assertEqual([row["id"] for row in rows], self.ids)
+        self.assertEqual(rows[0]["content_html"], self.articles[0].content_html)
+        self.assertEqual(rows[0]["content_text"], 'Akapit "0"\n\ndrugi')
+        self.assertEqual(rows[0]["published_at"], "2024-10-01T12:00:00+00:00")
+        self.assertEqual(rows[0]["source_domain"], "galicjaexpress.pl")
+
+    def test_articles_are_read_only_while_streaming(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("article-export"))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(_lines(b"".join(response.streaming_content))), 5)
+
+    def test_filters_and_resumption(self):
+        _, body = self._get(
+            source="galicjaexpress.pl",
+            published_from="2024-10-10",
+            published_to="2024-10-20",
+            fields="title",
+        )
+        self.assertEqual(
+            _lines(body),
+            [
+                {"id": self.ids[1], "title": "Artykuł 1"},
+                {"id": self.ids[3], "title": "Artykuł 3"},
+            ],
+        )
+
+        _, body = self._get(after_id=self.ids[2], fields="id")
+        self.assertEqual(_lines(body), [{"id": self.ids[3]}, {"id": self.ids[4]}])
+
+    def test_csv_with_gzip(self):
+        response, body = self._get(format="csv", gzip="1", fields="title,content_text")
+
+        self.assertIn('filename="articles.csv.gz"', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(gzip.decompress(body).decode())))
+        self.assertEqual(rows[0], ["id", "title", "content_text"])
+        self.assertEqual(
+            rows[1], [str(self.ids[0]), "Artykuł 0", 'Akapit "0"\n\ndrugi']
+        )
+        self.assertEqual(len(rows), 6)
+
+    def test_invalid_parameters_return_400(self):
+        url = reverse("article-export")
+        for params in ({"format": "xml"}, {"published_from": "wczoraj"}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {"fields": "body"}).json(),
+            {"fields": "Unknown fields: body"},
+        )
+
+
+class TestExportCommand(_ArticlesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def _export(self, *args):
+        call_command("export_articles", "--chunk-size", "2", *args, stderr=StringIO())
+
+    def test_writes_file_with_filters(self):
+        path = self.dir / "a.ndjson"
+
+        self._export("--output", str(path), "--source", "galicjaexpress.pl")
+
+        rows = _lines(path.read_bytes())
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [self.ids[0], self.ids[1], self.ids[3], self.ids[4]],
+        )
+
+    def test_resume_after_a_record_cut_off(self):
+        for fmt, name in ((NDJSON, "a.ndjson"), (CSV, "a.csv")):
+            with self.subTest(fmt):
+                path = self.dir / name
+                self._export("--format", fmt, "--output", str(path))
+                complete = path.read_bytes()
+                # Interrupted inside the quoted multi-line text of article 3.
+                path.write_bytes(
+                    complete[: complete.index(b"drugi", complete.index(b'"3'))]
+                )
+
+                self._export("--format", fmt, "--output", str(path), "--resume")
+
+                self.assertEqual(path.read_bytes(), complete)
+
+    def test_resume_gzip_after_a_member_cut_off(self):
+        path = self.dir / "a.ndjson.gz"
+        self._export("--output", str(path))
+        complete = path.read_bytes()
+        path.write_bytes(complete[:-10])
+
+        self.assertEqual(resume_point(path, NDJSON, compressed=True)[0], self.ids[3])
+        self._export("--output", str(path), "--resume")
+
+        rows = _lines(gzip.decompress(path.read_bytes()))
+        self.assertEqual([row["id"] for row in rows], self.ids)
+
+    def test_resume_needs_output(self):
+        with self.assertRaises(CommandError):
+            self._export("--resume")
+        with self.assertRaises(CommandError):
+            self._export("--after-id", "x")
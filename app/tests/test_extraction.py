@@ -0,0 +1,72 @@
+from django.test import SimpleTestCase
+from unittest.mock import patch, MagicMock
+
+from app.utils.domain_scrapers import GalicjaExpressScraper, TakeGroupScraper
+from app.utils.extraction import INNER_TEXT, ExtractionSpec, FieldSpec, article_spec
+
+TAKE_GROUP_HTML = """
+<html><body>
+<article>
+  <h1>Jak kroić pierś z kurczaka</h1>
+  <time datetime="2024-10-14">14 października 2024</time>
+  <div class="article-content prose"><p>Pierwszy</p><p>Drugi</p></div>
+</article>
+</body></html>
+"""
+
+
+class TestExtractionSpec(SimpleTestCase):
+
+    def test_script_queries_each_selector_once(self):
+        script = article_spec(
+            title="article h1", content="div.body", published="time"
+        ).script
+
+        self.assertEqual(script.count('q("div.body")'), 1)
+        self.assertIn('"content_html": e1 ? e1.innerHTML : null', script)
+        # Derived from content_html instead of a layout-forcing innerText.
+        self.assertNotIn("content_text", script)
+        self.assertNotIn("innerText", script)
+        self.assertIn('"datetime_raw": e2 ? e2.textContent : null', script)
+
+    def test_text_without_html_field_reads_the_html(self):
+        spec = ExtractionSpec(fields=(("text", FieldSpec("div", INNER_TEXT)),))
+
+        self.assertIn('"text": e0 ? e0.innerHTML : null', spec.script)
+        self.assertEqual(
+            spec.derive_text({"text": "<p>a</p><p>b</p>"}), {"text": "a\n\nb"}
+        )
+
+    def test_extract_from_html_uses_same_fields(self):
+        raw = TakeGroupScraper.spec.extract_from_html(TAKE_GROUP_HTML)
+
+        self.assertEqual(raw["title"], "Jak kroić pierś z kurczaka")
+        self.assertEqual(raw["content_html"], "<p>Pierwszy</p><p>Drugi</p>")
+        self.assertEqual(raw["content_text"], "Pierwszy\n\nDrugi")
+        self.assertEqual(raw["datetime_raw"], "14 października 2024")
+
+    def test_missing_selector_gives_none(self):
+        raw = GalicjaExpressScraper.spec.extract_from_html(TAKE_GROUP_HTML)
+
+        self.assertIsNone(raw["content_html"])
+        self.assertIsNone(raw["content_text"])
+
+
+class TestExtractFields(SimpleTestCase):
+
+    @patch("app.utils.main_scraper.logger")
+    def test_single_evaluate_call_and_missing_field_warning(self, mock_logger):
+        page = MagicMock()
+        page.evaluate.return_value = {
+            "title": "T",
+            "content_html": "<p>x</p> <p>y</p>",
+            "datetime_raw": None,
+        }
+
+        raw = GalicjaExpressScraper().extract_fields(page)
+
+        page.evaluate.assert_called_once_with(GalicjaExpressScraper.spec.script)
+        page.locator.assert_not_called()
+        self.assertEqual(raw["title"], "T")
+        self.assertEqual(raw["content_text"], "x\n\ny")
+        mock_logger.warning.assert_called_once_with("Błąd przy pobieraniu daty")
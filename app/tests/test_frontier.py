@@ -0,0 +1,239 @@
+import gzip
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from app.models import Article, FrontierURL
+from app.utils.discovery import Feed, Listing, Sitemap
+from app.utils.frontier import discover
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://a.pl/posts.xml.gz</loc></sitemap>
+  <sitemap><loc>https://a.pl/sitemap.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+POSTS_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://a.pl/pierwszy</loc><lastmod>2024-10-14</lastmod></url>
+  <url><loc> https://a.pl/drugi </loc></url>
+</urlset>
+"""
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <link>https://a.pl/</link>
+  <item><title>T</title><link>https://a.pl/z-kanalu</link></item>
+</channel></rss>
+"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link rel="self" href="https://a.pl/atom.xml"/>
+  <entry><link rel="alternate" href="https://a.pl/z-atom"/></entry>
+</feed>
+"""
+
+LISTING = b"""
+<html><body>
+<nav><a href="/kontakt">Kontakt</a></nav>
+<article><a href="/z-listy">T</a></article>
+<article><a href="https://a.pl/z-listy-2">T</a></article>
+</body></html>
+"""
+
+
+def _pages(pages):
+    """`http_session.get` double serving `pages` (url → bytes), 404 otherwise."""
+
+    def get(url, **kwargs):
+        response = MagicMock()
+        response.status_code = 200 if url in pages else 404
+        response.content = pages.get(url, b"")
+        return response
+
+    return get
+
+
+@override_settings(SCRAPER_POLITENESS=False)
+@patch("app.utils.discovery.http_session")
+class TestDiscoverySources(SimpleTestCase):
+
+    def test_sitemap_index_is_followed(self, session):
+        session.get.side_effect = _pages(
+            {
+                "https://a.pl/sitemap.xml": SITEMAP_INDEX,
+                "https://a.pl/posts.xml.gz": gzip.compress(POSTS_SITEMAP),
+            }
+        )
+
+        urls = list(Sitemap("https://a.pl/sitemap.xml").discover())
+
+        self.assertEqual(urls, ["https://a.pl/pierwszy", "https://a.pl/drugi"])
+        self.assertEqual(session.get.call_count, 2)
+
+    def test_rss_and_atom_items(self, session):
+        session.get.side_effect = _pages(
+            {"https://a.pl/feed/": RSS, "https://a.pl/atom.xml": ATOM}
+        )
+
+        self.assertEqual(
+            list(Feed("https://a.pl/feed/").discover()), ["https://a.pl/z-kanalu"]
+        )
+        self.assertEqual(
+            list(Feed("https://a.pl/atom.xml").discover()), ["https://a.pl/z-atom"]
+        )
+
+    def test_listing_links_are_absolute(self, session):
+        session.get.side_effect = _pages({"https://a.pl/kategoria/": LISTING})
+
+        urls = list(Listing("https://a.pl/kategoria/").discover())
+
+        self.assertEqual(urls, ["https://a.pl/z-listy", "https://a.pl/z-listy-2"])
+
+    def test_broken_source_yields_nothing(self, session):
+        session.get.side_effect = _pages({"https://a.pl/feed/": b"<rss"})
+
+        self.assertEqual(list(Feed("https://a.pl/feed/").discover()), [])
+        self.assertEqual(list(Sitemap("https://a.pl/brak.xml").discover()), [])
+
+
+@override_settings(SCRAPER_POLITENESS=False)
+class TestFrontierURL(TestCase):
+
+    def setUp(self):
+        # Drop the URLs seeded by the migration.
+        FrontierURL.objects.all().delete()
+
+    def test_enqueue_skips_known_urls(self):
+        Article.objects.create(
+            title="T",
+            content_html="<p>x</p>",
+            content_text="x",
+            source_url="https://a.pl/zapisany",
+        )
+        FrontierURL.enqueue(["https://a.pl/1"])
+
+        added = FrontierURL.enqueue(
+            (
+                url
+                for url in [
+                    "https://a.pl/1",
+                    "https://a.pl/zapisany",
+                    "https://a.pl/2#komentarze",
+                    "https://a.pl/2",
+                    "mailto:redakcja@a.pl",
+                    "https://a.pl/" + "x" * 300,
+                    "https://www.a.pl/3",
+                ]
+            ),
+            source="sitemap",
+            chunk_size=2,
+        )
+
+        self.assertEqual(added, 2)
+        self.assertEqual(
+            sorted(FrontierURL.objects.values_list("url", flat=True)),
+            ["https://a.pl/1", "https://a.pl/2", "https://www.a.pl/3"],
+        )
+        self.assertEqual(
+            FrontierURL.objects.get(url="https://www.a.pl/3").domain, "a.pl"
+        )
+
+    def test_due_chunks_follow_priority_order(self):
+        now = timezone.now()
+        rows = [
+            ("https://a.pl/stary", 0, now - timedelta(days=1)),
+            ("https://a.pl/pilny", 10, now),
+            ("https://a.pl/nowy", 0, now - timedelta(hours=1)),
+            ("https://a.pl/pozniej", 10, now + timedelta(hours=1)),
+            ("https://a.pl/remis", 0, now - timedelta(hours=1)),
+        ]
+        for url, priority, due_at in rows:
+            FrontierURL.objects.create(
+                url=url, domain="a.pl", priority=priority, next_due_at=due_at
+            )
+        FrontierURL.objects.create(
+            url="https://a.pl/gotowy", domain="a.pl", state=FrontierURL.DONE
+        )
+
+        chunks = FrontierURL.due_chunks(now, chunk_size=2)
+        first = next(chunks)
+        # Finishing a chunk does not shift the following ones.
+        FrontierURL.mark_done(first)
+
+        self.assertEqual(first, ["https://a.pl/pilny", "https://a.pl/stary"])
+        self.assertEqual(list(chunks), [["https://a.pl/nowy", "https://a.pl/remis"]])
+        self.assertEqual(
+            list(FrontierURL.due_chunks(now, chunk_size=2, limit=1)),
+            [["https://a.pl/nowy"]],
+        )
+
+    @patch("app.utils.discovery.http_session")
+    def test_discover_keeps_article_urls_of_the_domain(self, session):
+        session.get.side_effect = _pages(
+            {
+                "https://galicjaexpress.pl/feed/": RSS.replace(
+                    b"https://a.pl/z-kanalu", b"https://galicjaexpress.pl/z-kanalu"
+                ),
+                "https://galicjaexpress.pl/sitemap.xml": POSTS_SITEMAP.replace(
+                    b"https://a.pl/pierwszy",
+                    b"https://galicjaexpress.pl/kategoria/motoryzacja",
+                ),
+            }
+        )
+
+        added = discover(["galicjaexpress.pl"])
+
+        self.assertEqual(added, {"galicjaexpress.pl": 1})
+        entry = FrontierURL.objects.get()
+        self.assertEqual(entry.url, "https://galicjaexpress.pl/z-kanalu")
+        self.assertEqual((entry.source, entry.priority), ("feed", 10))
+
+
+class TestScrapeArticlesDrain(TestCase):
+
+    @patch("app.management.commands.scrape_articles.shutdown_browser_pool")
+    @patch("app.management.commands.scrape_articles.scrap_article")
+    def test_drains_frontier_and_records_outcome(self, mock_scrap, _shutdown):
+        # Drop the URLs seeded by the migration.
+        FrontierURL.objects.all().delete()
+        FrontierURL.enqueue(["https://a.pl/1", "https://a.pl/pusty"], priority=1)
+        FrontierURL.enqueue(["https://a.pl/2"])
+
+        def scrap(url):
+            if url.endswith("pusty"):
+                return None
+            return {
+                "title": "T",
+                "content_html": "<p>x</p>",
+                "content_text": "x",
+                "source_url": url,
+                "published_at": None,
+            }
+
+        mock_scrap.side_effect = scrap
+
+        out = StringIO()
+        call_command("scrape_articles", "--limit", "2", stdout=out)
+
+        self.assertEqual(
+            [c.args[0] for c in mock_scrap.call_args_list],
+            ["https://a.pl/1", "https://a.pl/pusty"],
+        )
+        states = dict(FrontierURL.objects.values_list("url", "state"))
+        self.assertEqual(
+            states,
+            {
+                "https://a.pl/1": FrontierURL.DONE,
+                "https://a.pl/pusty": FrontierURL.FAILED,
+                "https://a.pl/2": FrontierURL.PENDING,
+            },
+        )
+        self.assertIn("Scrapuje artykuł 2/2", out.getvalue())
+        self.assertTrue(Article.objects.filter(source_url="https://a.pl/1").exists())
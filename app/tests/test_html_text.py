@@ -0,0 +1,134 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from app.benchmarks import html_text as html_text_benchmark
+from app.benchmarks.html_text import PAGES, inner_text_path, samples
+from app.models import Article, ArticleChangeMarker
+from app.utils.html_text import html_to_text
+
+
+class TestHtmlToText(SimpleTestCase):
+
+    def test_paragraphs_blocks_and_line_breaks(self):
+        html = "<h2>Tytuł</h2><p>Pierwszy</p><p>Drugi<br>wiersz</p><div>Blok</div>"
+
+        self.assertEqual(
+            html_to_text(html), "Tytuł\n\nPierwszy\n\nDrugi\nwiersz\n\nBlok"
+        )
+
+    def test_whitespace_collapses_across_inline_elements(self):
+        html = "\n  <p>  Ala   <b> ma </b>\n kota&nbsp;i&amp;psa  </p>\n"
+
+        self.assertEqual(html_to_text(html), "Ala ma kota\xa0i&psa")
+
+    def test_lists_and_tables(self):
+        html = (
+            "<ul>\n  <li>jeden</li>\n  <li> dwa </li>\n</ul>"
+            "<table><tr><th>A</th> <th> B </th></tr><tr><td>1</td><td>2</td></tr>"
+            "</table>po"
+        )
+
+        self.assertEqual(html_to_text(html), "jeden\ndwa\nA\tB\n1\t2\npo")
+
+    def test_preformatted_text_keeps_whitespace(self):
+        html = "<p>kod:</p><pre>\nif x:\n    y  = 1</pre>"
+
+        self.assertEqual(html_to_text(html), "kod:\n\nif x:\n    y  = 1")
+
+    def test_elements_that_are_not_rendered(self):
+        html = (
+            "<script>if (a < b) document.write('<p>x</p>')</script>"
+            "<style>p { color: red }</style><!-- <p>komentarz</p> -->"
+            "<div hidden><p>ukryty</p></div>"
+            "<span style='color: red; display: none'>ukryty</span>"
+            '<template><p>szablon</p></template><img src="a.jpg" alt="obrazek">'
+            '<p class="hidden">widoczny</p>'
+        )
+
+        self.assertEqual(html_to_text(html), "widoczny")
+
+    def test_nested_hidden_elements_are_skipped_whole(self):
+        html = "<div hidden><div>a</div><div>b</div></div><div>c</div>"
+
+        self.assertEqual(html_to_text(html), "c")
+
+    def test_fixture_articles_match_inner_text(self):
+        pages = samples()
+        for name in PAGES:
+            with self.subTest(name):
+                recorded = inner_text_path(name)
+                self.assertTrue(
+                    recorded.exists(),
+                    f"{recorded} not recorded; run "
+                    "python -m app.benchmarks.html_text --record-inner-text",
+                )
+                self.assertEqual(
+                    html_to_text(pages[f"{name}_content"]),
+                    recorded.read_bytes().decode(),
+                )
+
+    def test_fixture_articles_text(self):
+        pages = samples()
+
+        take_group = html_to_text(pages["take_group_content"])
+        self.assertIn(
+            "i tej samej treści.\n\nCo zyskujemy?\nSzybsze pierwsze "
+            "wyświetlenie treści (FCP) na wolnych urządzeniach.\nTreść",
+            take_group,
+        )
+        self.assertIn(
+            "opis.\nCo tracimy?\n\nSerwer musi",
+            take_group,
+        )
+        self.assertIn("{\n  const post = await loadPost(params.slug);\n", take_group)
+        self.assertTrue(take_group.endswith("\n\nWpis: /example-blog/bench-00001/"))
+
+        galicja = html_to_text(pages["galicjaexpress_content"])
+        self.assertTrue(galicja.startswith("Kompaktowy van z Kolonii"))
+        self.assertIn("akcje naprawcze.\n\nDiesle 1.6 TDCi", galicja)
+        self.assertIn("w naprawie.\n\n– Najwięcej pytań", galicja)
+        self.assertIn("Gorlic.\n\nWnętrze i wyposażenie\n\nKabina", galicja)
+        self.assertNotIn("  ", galicja)
+
+    def test_benchmark_reports_throughput(self):
+        result = html_text_benchmark.run(iterations=2)
+
+        self.assertEqual(set(result), set(samples()))
+        for numbers in result.values():
+            self.assertGreater(numbers["bytes"], 0)
+            self.assertGreater(numbers["html_to_text"], 0)
+
+
+class TestBackfillContentText(TestCase):
+
+    def setUp(self):
+        for idx, text in enumerate(("Pierwszy\nDrugi", "Pierwszy\n\nDrugi")):
+            Article.objects.create(
+                title=f"A{idx}",
+                content_html="<p>Pierwszy</p><p>Drugi</p>",
+                content_text=text,
+                source_url=f"https://a.pl/{idx}",
+            )
+
+    def _backfill(self, *args):
+        out = StringIO()
+        call_command("backfill_content_text", "--batch-size", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def test_updates_text_derived_from_html(self):
+        version = ArticleChangeMarker.current("a.pl")[0]
+
+        output = self._backfill()
+
+        self.assertIn("Sprawdzone: 2, zmienione: 1", output)
+        self.assertEqual(
+            set(Article.objects.values_list("content_text", flat=True)),
+            {"Pierwszy\n\nDrugi"},
+        )
+        self.assertGreater(ArticleChangeMarker.current("a.pl")[0], version)
+
+    def test_dry_run_writes_nothing(self):
+        self.assertIn("(bez zapisu)", self._backfill("--dry-run"))
+        self.assertTrue(Article.objects.filter(content_text="Pierwszy\nDrugi").exists())
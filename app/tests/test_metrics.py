@@ -0,0 +1,159 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from app.models import ScrapeMetric
+from app.tests.test_static_fetch import GALICJA_HTML
+from app.utils.domain_scrapers import GalicjaExpressScraper
+from app.utils.metrics import (
+    BLOCKED,
+    BLOCKED_BYTES,
+    BYTES,
+    DB_WRITE_SECONDS,
+    ScrapeMetrics,
+    render_prometheus,
+)
+from app.utils.resilience import http_error
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _timed(metrics, clock, phase, url, seconds):
+    with metrics.span(phase, url):
+        clock.now += seconds
+
+
+class TestScrapeMetrics(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.metrics = ScrapeMetrics(clock=self.clock)
+
+    def test_spans_fill_histograms_per_phase_and_domain(self):
+        _timed(self.metrics, self.clock, "goto", "https://a.pl/1", 0.3)
+        _timed(self.metrics, self.clock, "goto", "https://a.pl/2", 3)
+        _timed(self.metrics, self.clock, "goto", "https://b.pl/1", 0.3)
+
+        series = self.metrics.series()
+
+        labels = 'domain="a.pl",phase="goto"'
+        self.assertEqual(
+            series[f'scrape_phase_seconds_bucket{{{labels},le="0.25"}}'], 0
+        )
+        self.assertEqual(series[f'scrape_phase_seconds_bucket{{{labels},le="0.5"}}'], 1)
+        self.assertEqual(
+            series[f'scrape_phase_seconds_bucket{{{labels},le="+Inf"}}'], 2
+        )
+        self.assertEqual(series[f"scrape_phase_seconds_count{{{labels}}}"], 2)
+        self.assertAlmostEqual(series[f"scrape_phase_seconds_sum{{{labels}}}"], 3.3)
+
+    def test_summary(self):
+        for idx in range(10):
+            _timed(self.metrics, self.clock, "goto", f"https://a.pl/{idx}", 0.2)
+            self.metrics.outcome("saved", f"https://a.pl/{idx}")
+        self.metrics.outcome("failed", "https://b.pl/1", http_error(503))
+        self.metrics.outcome("failed", "https://b.pl/2", "błąd ekstrakcji")
+        self.metrics.count(BYTES, 5000, url="https://a.pl/1", source="http")
+        self.metrics.count(BLOCKED, 3, url="https://a.pl/1", resource_type="image")
+        self.metrics.count(
+            BLOCKED_BYTES, 60000, url="https://a.pl/1", resource_type="image"
+        )
+        self.metrics.observe(DB_WRITE_SECONDS, 0.02)
+
+        summary = self.metrics.summary()
+
+        self.assertEqual(summary["duration_s"], 2)
+        self.assertEqual(summary["pages"], {"saved": 10, "failed": 2})
+        self.assertEqual(summary["pages_per_sec"], 6)
+        self.assertEqual(summary["saved_per_sec"], 5)
+        self.assertEqual(summary["failures"], {"http_5xx": 1, "other": 1})
+        self.assertEqual(summary["bytes"], {"http": 5000})
+        self.assertEqual(summary["blocked_requests"], {"image": 3})
+        self.assertEqual(summary["blocked_bytes"], {"image": 60000})
+        self.assertEqual(summary["domains"]["b.pl"], {"failed": 2})
+        goto = summary["phases"]["goto"]
+        self.assertEqual((goto["count"], goto["mean_ms"]), (10, 200))
+        # Interpolated within the 0.1-0.25 s bucket.
+        self.assertEqual(goto["p50_ms"], 175)
+        self.assertEqual(summary["phases"]["db_write"]["count"], 1)
+
+    def test_prometheus_exposition(self):
+        self.metrics.outcome("saved", "https://a.pl/1")
+        _timed(self.metrics, self.clock, "goto", "https://a.pl/1", 0.3)
+        self.metrics.count(
+            BLOCKED_BYTES, 20000, url="https://a.pl/1", resource_type="image"
+        )
+
+        text = render_prometheus(self.metrics.series())
+
+        self.assertIn("# TYPE scrape_phase_seconds histogram\n", text)
+        self.assertIn("# TYPE scrape_pages_total counter\n", text)
+        self.assertIn('scrape_pages_total{domain="a.pl",outcome="saved"} 1\n', text)
+        self.assertIn("# TYPE scrape_blocked_bytes_total counter\n", text)
+        self.assertIn(
+            'scrape_blocked_bytes_total{domain="a.pl",resource_type="image"} 20000\n',
+            text,
+        )
+        self.assertLess(
+            text.index("scrape_phase_seconds_bucket"),
+            text.index("scrape_phase_seconds_count"),
+        )
+
+
+class TestPersistedMetrics(TestCase):
+
+    def test_flush_adds_deltas_of_every_process(self):
+        first, second = ScrapeMetrics(), ScrapeMetrics()
+        first.outcome("saved", "https://a.pl/1")
+        first.flush()
+        first.outcome("saved", "https://a.pl/2")
+        first.flush()
+        first.flush()
+        second.outcome("saved", "https://a.pl/3")
+        second.flush()
+
+        stored = ScrapeMetric.objects.get(
+            series='scrape_pages_total{domain="a.pl",outcome="saved"}'
+        )
+        self.assertEqual(stored.value, 3)
+
+    def test_metrics_endpoint(self):
+        metrics = ScrapeMetrics()
+        metrics.outcome("failed", "https://a.pl/1", http_error(404))
+        metrics.flush()
+
+        resp = self.client.get(reverse("metrics"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            'scrape_failures_total{domain="a.pl",kind="http_4xx"} 1',
+            resp.content.decode(),
+        )
+
+
+@override_settings(SCRAPER_STATIC_FAST_PATH=True, SCRAPER_POLITENESS=False)
+class TestScraperPhases(SimpleTestCase):
+
+    @patch("app.utils.main_scraper.http_session")
+    def test_static_path_is_timed_per_phase(self, session):
+        response = MagicMock(status_code=200, text=GALICJA_HTML)
+        response.content = GALICJA_HTML.encode()
+        session.get.return_value = response
+        metrics = ScrapeMetrics()
+
+        with patch("app.utils.main_scraper.get_metrics", return_value=metrics):
+            GalicjaExpressScraper().extract_article("https://galicjaexpress.pl/a")
+
+        summary = metrics.summary()
+        self.assertEqual(
+            set(summary["phases"]), {"static_fetch", "extract", "parse_date"}
+        )
+        self.assertEqual(summary["bytes"], {"http": len(response.content)})
@@ -0,0 +1,194 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from app.utils.politeness import (
+    PolitenessScheduler,
+    TokenBucket,
+    interleave_by_domain,
+)
+
+ROBOTS = """
+User-agent: *
+Crawl-delay: 4
+Disallow: /admin/
+"""
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(clock, **kwargs):
+    options = {"rate": 2, "burst": 1, "max_concurrency": 4, "respect_robots": False}
+    return PolitenessScheduler(clock=clock, **{**options, **kwargs})
+
+
+def _request(scheduler, clock, url, status=200, latency=0.1, headers=None):
+    with scheduler.request(url) as request:
+        clock.now += latency
+        request.observe(status, headers)
+
+
+class TestTokenBucket(SimpleTestCase):
+
+    def test_refills_at_rate_up_to_burst(self):
+        bucket = TokenBucket(rate=2, burst=2, now=0)
+        bucket.take()
+        bucket.take()
+
+        self.assertEqual(bucket.wait_time(0), 0.5)
+        self.assertEqual(bucket.wait_time(10), 0)
+        self.assertEqual(bucket.tokens, 2)
+
+
+class TestPolitenessScheduler(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+
+    def test_rate_is_per_host(self):
+        scheduler = _scheduler(self.clock)
+        _request(scheduler, self.clock, "https://a.pl/1", latency=0)
+
+        self.assertEqual(scheduler.wait_time("https://a.pl/2"), 0.5)
+        self.assertEqual(scheduler.wait_time("https://b.pl/1"), 0)
+
+    @patch("app.utils.politeness.http_session")
+    def test_crawl_delay_slows_the_host_down(self, session):
+        session.get.return_value = MagicMock(status_code=200, text=ROBOTS)
+        scheduler = _scheduler(self.clock, respect_robots=True, burst=3)
+
+        _request(scheduler, self.clock, "https://a.pl/1", latency=0)
+
+        stats = scheduler.stats()["a.pl"]
+        self.assertEqual((stats["crawl_delay"], stats["rate"]), (4.0, 0.25))
+        self.assertEqual(scheduler.wait_time("https://a.pl/2"), 4.0)
+
+        self.clock.now += 4
+        _request(scheduler, self.clock, "https://a.pl/2", latency=0)
+        session.get.assert_called_once()
+        self.assertEqual(session.get.call_args.args[0], "https://a.pl/robots.txt")
+
+    def test_fast_responses_raise_the_limit_up_to_max(self):
+        scheduler = _scheduler(self.clock, rate=100, max_concurrency=3)
+
+        for idx in range(10):
+            _request(scheduler, self.clock, f"https://a.pl/{idx}")
+
+        self.assertEqual(scheduler.stats()["a.pl"]["limit"], 3)
+
+    def test_throttling_halves_the_limit_and_pauses(self):
+        scheduler = _scheduler(self.clock, rate=100, burst=4, max_concurrency=4)
+        for idx in range(20):
+            _request(scheduler, self.clock, f"https://a.pl/{idx}")
+
+        with scheduler.request("https://a.pl/x") as first:
+            with scheduler.request("https://a.pl/y") as second:
+                self.clock.now += 0.1
+                first.observe(429, {"retry-after": "30"})
+                # Same congestion window: no second decrease.
+                second.observe(503)
+
+        stats = scheduler.stats()["a.pl"]
+        self.assertEqual(stats["limit"], 2)
+        self.assertEqual(stats["throttled"], 2)
+        self.assertAlmostEqual(scheduler.wait_time("https://a.pl/z"), 30, places=3)
+
+    def test_slow_and_failed_requests_count_as_congestion(self):
+        scheduler = _scheduler(self.clock, rate=100, target_latency=1)
+        for idx in range(20):
+            _request(scheduler, self.clock, f"https://a.pl/{idx}")
+
+        _request(scheduler, self.clock, "https://a.pl/slow", latency=2)
+        self.assertEqual(scheduler.stats()["a.pl"]["limit"], 2)
+
+        with self.assertRaises(TimeoutError):
+            with scheduler.request("https://a.pl/timeout"):
+                self.clock.now += 3
+                raise TimeoutError
+        stats = scheduler.stats()["a.pl"]
+        self.assertEqual((stats["limit"], stats["errors"], stats["active"]), (1, 1, 0))
+
+    def test_requests_wait_for_a_free_slot(self):
+        scheduler = PolitenessScheduler(
+            rate=1000, burst=10, max_concurrency=1, respect_robots=False
+        )
+        started, release = threading.Event(), threading.Event()
+        order = []
+
+        def first():
+            with scheduler.request("https://a.pl/1") as request:
+                started.set()
+                release.wait(5)
+                order.append(1)
+                request.observe(200)
+
+        def second():
+            started.wait(5)
+            with scheduler.request("https://a.pl/2") as request:
+                order.append(2)
+                request.observe(200)
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        threading.Timer(0.1, release.set).start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order, [1, 2])
+
+    def test_async_requests_share_the_limits(self):
+        scheduler = PolitenessScheduler(
+            rate=1000, burst=1, max_concurrency=1, respect_robots=False
+        )
+        active, peak = 0, 0
+
+        async def fetch(url):
+            nonlocal active, peak
+            async with scheduler.request_async(url) as request:
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                request.observe(200)
+
+        async def run():
+            await asyncio.gather(*(fetch(f"https://a.pl/{i}") for i in range(4)))
+
+        asyncio.run(run())
+
+        self.assertEqual(peak, 1)
+        self.assertEqual(scheduler.stats()["a.pl"]["requests"], 4)
+
+
+class TestInterleaveByDomain(SimpleTestCase):
+
+    def test_round_robin_keeps_order_within_host(self):
+        urls = [
+            "https://a.pl/1",
+            "https://a.pl/2",
+            "https://a.pl/3",
+            "https://b.pl/1",
+            "https://c.pl/1",
+            "https://b.pl/2",
+        ]
+
+        self.assertEqual(
+            interleave_by_domain(urls),
+            [
+                "https://a.pl/1",
+                "https://b.pl/1",
+                "https://c.pl/1",
+                "https://a.pl/2",
+                "https://b.pl/2",
+                "https://a.pl/3",
+            ],
+        )
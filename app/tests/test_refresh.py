@@ -0,0 +1,208 @@
+import hashlib
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from app.models import Article
+from app.utils.article_writer import ArticleBatchWriter
+from app.utils.date_utils import parse_any_date
+from app.utils.domain_scrapers import GalicjaExpressScraper
+from app.utils.main_scraper import MainScraper
+from app.utils.refresh import (
+    CHANGED,
+    FAILED,
+    UNCHANGED,
+    ArticleRefresher,
+    due_articles,
+)
+
+URL = "https://galicjaexpress.pl/ford-c-max"
+
+PAGE = """
+<html><body>
+<article>
+  <h1>{title}</h1>
+  <p>14.10.2024 12:30</p>
+  <div class="post-text-two-red"><p>Pierwszy akapit.</p></div>
+</article>
+<footer>{footer}</footer>
+</body></html>
+"""
+
+
+def _page(title="Ford C-Max", footer="2024"):
+    return PAGE.format(title=title, footer=footer)
+
+
+def _response(html="", status=200, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.text = html
+    response.content = html.encode()
+    response.headers = headers or {}
+    return response
+
+
+def _stored(html=None, **fields):
+    """The article as the initial scrape of `html` stored it."""
+
+    raw = GalicjaExpressScraper().extract_static_fields(html or _page())
+    data = GalicjaExpressScraper().build_article(URL, **raw)
+    return Article.objects.create(**{**data, **fields})
+
+
+@override_settings(
+    SCRAPER_REFRESH_MIN_INTERVAL_HOURS=6,
+    SCRAPER_REFRESH_MAX_INTERVAL_HOURS=48,
+    SCRAPER_POLITENESS=False,
+)
+class TestArticleRefresher(TestCase):
+
+    def setUp(self):
+        patcher = patch("app.utils.refresh.http_session")
+        self.session = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _refresh(self, article):
+        with ArticleBatchWriter(batch_size=10, flush_interval=60) as writer:
+            refresher = ArticleRefresher(writer)
+            kind = refresher.refresh(Article.objects.get(id=article.id))
+            refresher.flush()
+        return kind, Article.objects.get(id=article.id)
+
+    def test_not_modified_backs_off(self):
+        article = _stored(http_etag='"v1"', unchanged_checks=2)
+        self.session.get.return_value = _response(status=304)
+
+        kind, article = self._refresh(article)
+
+        self.assertEqual(kind, UNCHANGED)
+        headers = self.session.get.call_args.kwargs["headers"]
+        self.assertEqual(headers, {"If-None-Match": '"v1"'})
+        self.assertEqual(article.unchanged_checks, 3)
+        self.assertEqual(
+            article.next_check_at - article.checked_at, timedelta(hours=48)
+        )
+
+    def test_same_page_hash_skips_extraction(self):
+        html = _page()
+        article = _stored(html)
+        self.session.get.return_value = _response(html, headers={"ETag": '"v2"'})
+        self._refresh(article)
+
+        with patch.object(MainScraper, "extract_static_fields") as mock_extract:
+            kind, article = self._refresh(article)
+
+        mock_extract.assert_not_called()
+        self.assertEqual(kind, UNCHANGED)
+        self.assertEqual(article.http_etag, '"v2"')
+        self.assertEqual(article.unchanged_checks, 2)
+
+    def test_page_change_without_content_change_is_not_rewritten(self):
+        article = _stored()
+        body_id = article.body_id
+        self.session.get.return_value = _response(_page(footer="2025"))
+
+        with patch.object(ArticleBatchWriter, "add") as mock_add:
+            kind, article = self._refresh(article)
+
+        mock_add.assert_not_called()
+        self.assertEqual(kind, UNCHANGED)
+        self.assertEqual(article.body_id, body_id)
+        self.assertNotEqual(article.page_hash, "")
+        self.assertEqual(article.unchanged_checks, 1)
+
+    def test_changed_content_is_written(self):
+        article = _stored(unchanged_checks=4)
+        self.session.get.return_value = _response(_page(title="Ford Focus"))
+
+        kind, article = self._refresh(article)
+
+        self.assertEqual(kind, CHANGED)
+        self.assertEqual(Article.objects.count(), 1)
+        self.assertEqual(article.title, "Ford Focus")
+        self.assertEqual(article.unchanged_checks, 0)
+        self.assertEqual(article.next_check_at - article.checked_at, timedelta(hours=6))
+        self.assertEqual(article.published_at, parse_any_date("14.10.2024 12:30"))
+
+    def test_browser_is_used_when_static_html_is_incomplete(self):
+        article = _stored()
+        self.session.get.return_value = _response("<div id='root'></div>")
+        raw = {
+            "title": "Ford C-Max",
+            "content_html": "<p>Nowy akapit.</p>",
+            "content_text": "Nowy akapit.",
+            "datetime_raw": "14.10.2024 12:30",
+        }
+
+        with patch.object(
+            MainScraper, "extract_raw_with_browser", return_value=raw
+        ) as mock_browser:
+            kind, article = self._refresh(article)
+
+        mock_browser.assert_called_once_with(URL)
+        self.assertEqual(kind, CHANGED)
+        self.assertEqual(article.content_html, "<p>Nowy akapit.</p>")
+
+    @patch.object(GalicjaExpressScraper, "js_only_paths", ("/",))
+    def test_js_only_page_is_rendered_even_if_the_shell_is_unchanged(self):
+        shell = "<div id='root'></div>"
+        article = _stored(http_etag='"shell"')
+        article.page_hash = hashlib.sha256(shell.encode()).hexdigest()
+        article.save()
+        self.session.get.return_value = _response(shell, headers={"ETag": '"shell"'})
+        raw = {
+            "title": "Ford C-Max",
+            "content_html": "<p>Nowy akapit.</p>",
+            "content_text": "Nowy akapit.",
+            "datetime_raw": "14.10.2024 12:30",
+        }
+
+        with patch.object(MainScraper, "extract_raw_with_browser", return_value=raw):
+            kind, article = self._refresh(article)
+            self.assertEqual(kind, CHANGED)
+            self.assertEqual(article.content_html, "<p>Nowy akapit.</p>")
+
+            kind, article = self._refresh(article)
+            self.assertEqual(kind, UNCHANGED)
+            self.assertEqual(article.unchanged_checks, 1)
+
+        self.session.get.assert_not_called()
+
+    def test_http_error_retries_after_min_interval(self):
+        article = _stored(unchanged_checks=3)
+        self.session.get.return_value = _response(status=503)
+
+        kind, article = self._refresh(article)
+
+        self.assertEqual(kind, FAILED)
+        self.assertEqual(article.unchanged_checks, 3)
+        self.assertEqual(article.next_check_at - article.checked_at, timedelta(hours=6))
+
+
+class TestDueArticles(TestCase):
+
+    def test_never_checked_first_then_most_overdue(self):
+        now = timezone.now()
+        for idx, next_check_at in enumerate(
+            [
+                now - timedelta(hours=1),
+                None,
+                now + timedelta(hours=1),
+                now - timedelta(days=1),
+            ]
+        ):
+            Article.objects.create(
+                title="T",
+                content_html="<p>x</p>",
+                content_text="x",
+                source_url=f"https://a.pl/{idx}",
+                next_check_at=next_check_at,
+            )
+
+        urls = [a.source_url for a in due_articles(limit=10, now=now)]
+
+        self.assertEqual(urls, ["https://a.pl/1", "https://a.pl/3", "https://a.pl/0"])
+        self.assertEqual(len(due_articles(limit=1, now=now)), 1)
@@ -0,0 +1,351 @@
+import random
+import socket
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from app.models import FrontierURL, ScrapeFailure
+from app.utils.browser_pool import BrowserPool
+from app.utils.domain_scrapers import GalicjaExpressScraper
+from app.utils.frontier import FrontierRecorder
+from app.utils.resilience import (
+    CONNECT,
+    DNS,
+    HTTP_CLIENT,
+    HTTP_SERVER,
+    SELECTOR_TIMEOUT,
+    THROTTLED,
+    TIMEOUT,
+    CircuitBreakers,
+    CircuitOpen,
+    RetryPolicy,
+    ScrapeError,
+    call_with_retries,
+    classify,
+    http_error,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _policy(**kwargs):
+    options = {"max_attempts": 3, "base_delay": 1, "max_delay": 10}
+    return RetryPolicy(rng=random.Random(1), **{**options, **kwargs})
+
+
+class _Flaky:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class TestClassify(SimpleTestCase):
+
+    def test_browser_errors(self):
+        self.assertEqual(
+            classify(PlaywrightError("page.goto: net::ERR_NAME_NOT_RESOLVED at x")),
+            DNS,
+        )
+        self.assertEqual(
+            classify(PlaywrightError("page.goto: net::ERR_CONNECTION_REFUSED")),
+            CONNECT,
+        )
+        self.assertEqual(classify(PlaywrightTimeoutError("Timeout 20000ms")), TIMEOUT)
+
+    def test_http_client_errors(self):
+        dns = requests.ConnectionError(
+            "Failed to resolve 'x.pl' ([Errno -2] Name or service not known)"
+        )
+        self.assertEqual(classify(dns), DNS)
+        self.assertEqual(classify(requests.ConnectionError("refused")), CONNECT)
+        self.assertEqual(classify(requests.ConnectTimeout()), CONNECT)
+        self.assertEqual(classify(requests.ReadTimeout()), TIMEOUT)
+        self.assertEqual(classify(socket.gaierror()), DNS)
+
+    def test_http_statuses(self):
+        self.assertEqual(http_error(404).kind, HTTP_CLIENT)
+        self.assertEqual(http_error(429).kind, THROTTLED)
+        self.assertEqual(http_error(503).kind, HTTP_SERVER)
+        self.assertFalse(http_error(404).retryable)
+        self.assertTrue(http_error(503).retryable)
+
+
+class TestRetryPolicy(SimpleTestCase):
+
+    def test_full_jitter_within_capped_exponential_bound(self):
+        policy = _policy(base_delay=2, max_delay=5)
+
+        for attempt, cap in ((1, 2), (2, 4), (3, 5), (8, 5)):
+            delays = [policy.delay(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= d <= cap for d in delays))
+            self.assertGreater(max(delays), cap / 2)
+
+    def test_retries_transient_errors_then_succeeds(self):
+        sleeps = []
+        attempt = _Flaky(requests.ConnectionError("refused"), http_error(503))
+
+        result = call_with_retries(
+            "https://a.pl/1",
+            attempt,
+            policy=_policy(),
+            breakers=CircuitBreakers(),
+            sleep=sleeps.append,
+        )
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(attempt.calls, 3)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_permanent_errors_fail_at_once(self):
+        for error in (http_error(404), PlaywrightError("net::ERR_NAME_NOT_RESOLVED")):
+            attempt = _Flaky(error)
+            with self.assertRaises(ScrapeError) as ctx:
+                call_with_retries(
+                    "https://a.pl/1",
+                    attempt,
+                    policy=_policy(),
+                    breakers=CircuitBreakers(),
+                    sleep=self.fail,
+                )
+            self.assertEqual((attempt.calls, ctx.exception.attempts), (1, 1))
+
+    def test_gives_up_after_max_attempts(self):
+        attempt = _Flaky(*[requests.ReadTimeout("slow")] * 5)
+
+        with self.assertRaises(ScrapeError) as ctx:
+            call_with_retries(
+                "https://a.pl/1",
+                attempt,
+                policy=_policy(max_attempts=3),
+                breakers=CircuitBreakers(),
+                sleep=lambda s: None,
+            )
+
+        self.assertEqual(ctx.exception.kind, TIMEOUT)
+        self.assertEqual(ctx.exception.attempts, 3)
+        self.assertIsInstance(ctx.exception.__cause__, requests.ReadTimeout)
+
+
+class TestCircuitBreakers(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.breakers = CircuitBreakers(
+            threshold=3, reset_timeout=60, max_reset_timeout=200, clock=self.clock
+        )
+
+    def _fail(self, url="https://a.pl/1", kind=CONNECT):
+        self.breakers.record(url, ScrapeError(kind, "x"))
+
+    def test_opens_after_threshold_host_failures(self):
+        for _ in range(3):
+            self.breakers.before("https://a.pl/1")
+            self._fail()
+
+        with self.assertRaises(CircuitOpen) as ctx:
+            self.breakers.before("https://a.pl/2")
+        self.assertEqual(ctx.exception.retry_in, 60)
+        # Other hosts are not affected.
+        self.breakers.before("https://b.pl/1")
+
+    def test_page_errors_do_not_count(self):
+        for _ in range(2):
+            self._fail()
+        self._fail(kind=HTTP_CLIENT)
+        self._fail()
+        self._fail(kind=SELECTOR_TIMEOUT)
+
+        self.assertEqual(self.breakers.state("https://a.pl/"), "closed")
+
+    def test_single_probe_after_reset_timeout(self):
+        for _ in range(3):
+            self._fail()
+        self.clock.now += 61
+
+        self.breakers.before("https://a.pl/probe")
+        with self.assertRaises(CircuitOpen):
+            self.breakers.before("https://a.pl/other")
+
+        self.breakers.record("https://a.pl/probe", None)
+        self.assertEqual(self.breakers.state("https://a.pl/"), "closed")
+        self.breakers.before("https://a.pl/other")
+
+    def test_failed_probe_reopens_for_longer(self):
+        for _ in range(3):
+            self._fail()
+
+        for open_for in (120, 200):
+            self.clock.now += 1000
+            self.breakers.before("https://a.pl/probe")
+            self._fail("https://a.pl/probe")
+            with self.assertRaises(CircuitOpen) as ctx:
+                self.breakers.before("https://a.pl/x")
+            self.assertEqual(ctx.exception.retry_in, open_for)
+
+    def test_open_breaker_stops_retries(self):
+        breakers = CircuitBreakers(threshold=2, clock=self.clock)
+        attempt = _Flaky(*[requests.ConnectionError("refused")] * 5)
+
+        with self.assertRaises(CircuitOpen):
+            call_with_retries(
+                "https://a.pl/1",
+                attempt,
+                policy=_policy(max_attempts=5),
+                breakers=breakers,
+                sleep=lambda s: None,
+            )
+        self.assertEqual(attempt.calls, 2)
+
+
+@override_settings(SCRAPER_POLITENESS=False, SCRAPER_STATIC_FAST_PATH=True)
+class TestFailFastFetch(SimpleTestCase):
+
+    def test_error_status_skips_waiting_for_selectors(self):
+        page = MagicMock()
+        page.goto.return_value = MagicMock(status=503, headers={})
+
+        with self.assertRaises(ScrapeError) as ctx:
+            GalicjaExpressScraper().fetch_page("https://galicjaexpress.pl/a", page)
+
+        self.assertEqual((ctx.exception.kind, ctx.exception.status), (HTTP_SERVER, 503))
+        page.wait_for_selector.assert_not_called()
+
+    def test_selector_timeout_is_classified(self):
+        page = MagicMock()
+        page.goto.return_value = MagicMock(status=200, headers={})
+        page.wait_for_selector.side_effect = PlaywrightTimeoutError("Timeout")
+
+        with self.assertRaises(ScrapeError) as ctx:
+            GalicjaExpressScraper().fetch_page("https://galicjaexpress.pl/a", page)
+
+        self.assertEqual(ctx.exception.kind, SELECTOR_TIMEOUT)
+
+    @patch("app.utils.main_scraper.get_browser_pool")
+    @patch("app.utils.main_scraper.http_session")
+    def test_unresolvable_host_does_not_fall_back_to_browser(self, session, pool):
+        session.get.side_effect = requests.ConnectionError(
+            "Failed to resolve 'galicjaexpress.pl' (Name or service not known)"
+        )
+
+        with self.assertRaises(requests.ConnectionError):
+            GalicjaExpressScraper().extract_article("https://galicjaexpress.pl/a")
+        pool.assert_not_called()
+
+
+@override_settings(SCRAPER_POLITENESS=False)
+class TestBrowserNavigationErrors(SimpleTestCase):
+    """Navigation errors through a real BrowserPool (Playwright mocked)."""
+
+    url = "https://galicjaexpress.pl/a"
+
+    def setUp(self):
+        patcher = patch("app.utils.browser_pool.sync_playwright")
+        playwright = patcher.start().return_value.start.return_value
+        self.addCleanup(patcher.stop)
+        browser = playwright.chromium.launch.return_value
+        self.page = browser.new_context.return_value.new_page.return_value
+        self.page.is_closed.return_value = False
+
+        self.pool = BrowserPool(size=1)
+        patcher = patch(
+            "app.utils.main_scraper.get_browser_pool", return_value=self.pool
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breakers = CircuitBreakers(threshold=5)
+
+    def _scrape(self):
+        scraper = GalicjaExpressScraper()
+        with self.assertRaises(ScrapeError) as ctx:
+            call_with_retries(
+                self.url,
+                lambda: scraper.extract_raw_with_browser(self.url),
+                policy=_policy(),
+                breakers=self.breakers,
+                sleep=lambda s: None,
+            )
+        return ctx.exception
+
+    def test_unresolvable_host_is_a_dns_failure_of_the_host(self):
+        self.page.goto.side_effect = PlaywrightError(
+            "net::ERR_NAME_NOT_RESOLVED at https://galicjaexpress.pl/a"
+        )
+
+        error = self._scrape()
+
+        self.assertEqual((error.kind, error.attempts), (DNS, 1))
+        self.assertIsInstance(error.__cause__, PlaywrightError)
+        self.assertEqual(self.breakers.stats()["galicjaexpress.pl"]["failures"], 1)
+        self.assertFalse(self.pool._slots[0].in_use)
+
+    def test_refused_connection_is_retried_in_a_fresh_context(self):
+        self.page.goto.side_effect = PlaywrightError(
+            "net::ERR_CONNECTION_REFUSED at https://galicjaexpress.pl/a"
+        )
+
+        error = self._scrape()
+
+        self.assertEqual((error.kind, error.attempts), (CONNECT, 3))
+        self.assertEqual(self.page.goto.call_count, 3)
+        self.assertEqual(self.breakers.stats()["galicjaexpress.pl"]["failures"], 3)
+
+
+class TestRecordedOutcomes(TestCase):
+
+    def setUp(self):
+        FrontierURL.objects.all().delete()
+        FrontierURL.enqueue(["https://a.pl/1", "https://a.pl/2", "https://b.pl/1"])
+
+    def test_failures_are_stored_with_their_kind(self):
+        recorder = FrontierRecorder()
+        error = http_error(503)
+        error.attempts = 3
+        recorder.failed("https://a.pl/1", error)
+        recorder.failed("https://b.pl/1", "błąd ekstrakcji")
+
+        recorder.flush()
+
+        failure = ScrapeFailure.objects.get(url="https://a.pl/1")
+        self.assertEqual(
+            (failure.domain, failure.kind, failure.status_code, failure.attempts),
+            ("a.pl", HTTP_SERVER, 503, 3),
+        )
+        self.assertEqual(ScrapeFailure.objects.count(), 2)
+        self.assertEqual(
+            FrontierURL.objects.get(url="https://a.pl/1").state, FrontierURL.FAILED
+        )
+
+    def test_deferred_urls_stay_pending_until_the_breaker_retries(self):
+        recorder = FrontierRecorder()
+        recorder.deferred("https://a.pl/1", CircuitOpen("a.pl", 120))
+        recorder.deferred("https://a.pl/2", CircuitOpen("a.pl", 119.5))
+
+        recorder.flush()
+
+        entries = FrontierURL.objects.filter(domain="a.pl")
+        soon = timezone.now() + timedelta(seconds=100)
+        self.assertEqual(
+            {(e.state, e.attempts, e.next_due_at > soon) for e in entries},
+            {(FrontierURL.PENDING, 0, True)},
+        )
+        self.assertFalse(ScrapeFailure.objects.exists())
+        self.assertEqual(FrontierURL.due().count(), 1)
@@ -0,0 +1,127 @@
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import MagicMock, patch
+
+from app.utils.main_scraper import MainScraper
+from app.utils.metrics import ScrapeMetrics
+from app.utils.resource_blocking import (
+    TYPICAL_RESPONSE_BYTES,
+    ResourceBlocker,
+    ResponseSizes,
+)
+
+
+def _route(resource_type, url):
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    return route
+
+
+def _response(resource_type, length):
+    response = MagicMock()
+    response.request.resource_type = resource_type
+    response.headers = {"content-length": str(length)}
+    return response
+
+
+class TestResourceBlocker(SimpleTestCase):
+
+    def setUp(self):
+        patcher = patch("app.utils.resource_blocking.response_sizes", ResponseSizes())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_default_rules(self):
+        blocker = ResourceBlocker()
+
+        self.assertFalse(blocker.should_block("document", "https://a.pl/"))
+        self.assertFalse(blocker.should_block("script", "https://a.pl/app.js"))
+        self.assertTrue(blocker.should_block("image", "https://a.pl/x.png"))
+        self.assertTrue(blocker.should_block("font", "https://a.pl/x.woff2"))
+        self.assertTrue(
+            blocker.should_block("script", "https://www.googletagmanager.com/gtm.js")
+        )
+
+    def test_allow_lists_override_deny_rules(self):
+        blocker = ResourceBlocker(
+            allowed_types={"stylesheet"}, allowed_hosts={"cdn.a.pl"}
+        )
+
+        self.assertFalse(blocker.should_block("stylesheet", "https://a.pl/x.css"))
+        self.assertFalse(blocker.should_block("image", "https://cdn.a.pl/x.png"))
+        self.assertTrue(blocker.should_block("image", "https://a.pl/x.png"))
+
+    def test_install_routes_requests_and_counts(self):
+        page = MagicMock()
+        session = ResourceBlocker().install(page)
+        handler = page.route.call_args.args[1]
+
+        blocked = _route("image", "https://a.pl/x.png")
+        allowed = _route("script", "https://a.pl/app.js")
+        handler(blocked)
+        handler(allowed)
+
+        session.on_response(_response("script", 1200))
+
+        blocked.abort.assert_called_once()
+        allowed.continue_.assert_called_once()
+        self.assertEqual(session.stats.blocked_requests, 1)
+        self.assertEqual(session.stats.blocked_by_type["image"], 1)
+        self.assertEqual(session.stats.allowed_requests, 1)
+        self.assertEqual(session.stats.loaded_bytes, 1200)
+        self.assertEqual(session.stats.saved_bytes, TYPICAL_RESPONSE_BYTES["image"])
+
+    def test_saved_bytes_are_estimated_from_loaded_responses(self):
+        page = MagicMock()
+        session = ResourceBlocker(allowed_hosts={"cdn.a.pl"}).install(page)
+        handler = page.route.call_args.args[1]
+
+        # Images of an allowed host teach the size of the blocked ones.
+        handler(_route("image", "https://cdn.a.pl/1.png"))
+        session.on_response(_response("image", 4000))
+        session.on_response(_response("image", 6000))
+        handler(_route("image", "https://a.pl/x.png"))
+        handler(_route("image", "https://a.pl/y.png"))
+        handler(_route("font", "https://a.pl/x.woff2"))
+
+        self.assertEqual(
+            session.stats.saved_bytes_by_type,
+            {"image": 10000, "font": TYPICAL_RESPONSE_BYTES["font"]},
+        )
+
+
+class _StylesScraper(MainScraper):
+    allowed_resource_types = frozenset({"stylesheet"})
+
+
+class TestScraperResourceBlocker(SimpleTestCase):
+
+    @override_settings(SCRAPER_BLOCK_RESOURCES=True)
+    def test_scraper_allow_list_is_applied(self):
+        blocker = _StylesScraper().resource_blocker()
+
+        self.assertFalse(blocker.should_block("stylesheet", "https://a.pl/x.css"))
+        self.assertTrue(blocker.should_block("image", "https://a.pl/x.png"))
+
+    @override_settings(SCRAPER_BLOCK_RESOURCES=False)
+    def test_blocking_can_be_disabled(self):
+        self.assertIsNone(_StylesScraper().resource_blocker())
+
+    @override_settings(SCRAPER_BLOCK_RESOURCES=True)
+    def test_page_counters_reach_the_metrics(self):
+        scraper = _StylesScraper()
+        page = MagicMock()
+        session = scraper.resource_blocker().install(page)
+        handler = page.route.call_args.args[1]
+        handler(_route("image", "https://a.pl/x.png"))
+        handler(_route("image", "https://a.pl/y.png"))
+        handler(_route("stylesheet", "https://a.pl/x.css"))
+
+        metrics = ScrapeMetrics()
+        with patch("app.utils.main_scraper.get_metrics", return_value=metrics):
+            scraper._finish_blocking("https://a.pl/artykul", session)
+
+        summary = metrics.summary()
+        self.assertEqual(summary["blocked_requests"], {"image": 2})
+        self.assertEqual(summary["blocked_bytes"], {"image": session.stats.saved_bytes})
+        self.assertIs(scraper.last_blocking_stats, session.stats)
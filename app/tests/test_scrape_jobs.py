@@ -0,0 +1,214 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from app.models import Article, FrontierURL, ScrapeJob
+from app.utils.scrape_jobs import submit_scrape_job
+
+SITE = "https://galicjaexpress.pl"
+
+
+class TestScrapeJobsAPI(APITestCase):
+
+    def setUp(self):
+        # Migration 0009 seeds the frontier.
+        FrontierURL.objects.all().delete()
+        # Throttle history lives in the cache.
+        cache.clear()
+        self.user = User.objects.create_user("zlecajacy")
+        self.client.force_authenticate(self.user)
+        self.stored = Article.objects.create(
+            title="Zapisany",
+            content_html="<p>x</p>",
+            content_text="x",
+            source_url=f"{SITE}/zapisany",
+        )
+
+    def _submit(self, urls, **data):
+        return self.client.post(
+            reverse("scrape-job-list"), {"urls": urls, **data}, format="json"
+        )
+
+    def _items(self, job_id, **params):
+        url = reverse("scrape-job-items", args=[job_id])
+        return self.client.get(url, params).json()["results"]
+
+    def test_submission_sorts_the_urls(self):
+        response = self._submit(
+            [
+                f"{SITE}/nowy",
+                f"{SITE}/nowy#komentarze",
+                f"{SITE}/zapisany",
+                "https://example.com/obcy",
+                "nie-url",
+            ]
+        )
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(
+            {k: data[k] for k in ("submitted", "duplicates", "queued", "exists")},
+            {"submitted": 5, "duplicates": 1, "queued": 1, "exists": 1},
+        )
+        self.assertEqual(data["invalid"], 2)
+        self.assertTrue(data["status_url"].endswith(f"/scrape-jobs/{data['id']}/"))
+
+        queued = FrontierURL.objects.get()
+        self.assertEqual(queued.url, f"{SITE}/nowy")
+        self.assertEqual((queued.source, queued.priority), ("job", 20))
+
+        items = self._items(data["id"])
+        self.assertEqual(
+            [(i["url"], i["status"], i["article_id"]) for i in items],
+            [
+                (f"{SITE}/nowy", "pending", None),
+                (f"{SITE}/zapisany", "exists", self.stored.id),
+                ("https://example.com/obcy", "invalid", None),
+                ("nie-url", "invalid", None),
+            ],
+        )
+        self.assertEqual(items[2]["error"], "no scraper for domain")
+
+    def test_status_follows_the_frontier(self):
+        urls = [f"{SITE}/{i}" for i in range(4)]
+        job_id = self._submit(urls + [f"{SITE}/zapisany"]).json()["id"]
+        status_url = reverse("scrape-job-detail", args=[job_id])
+
+        self.assertFalse(self.client.get(status_url).json()["finished"])
+
+        FrontierURL.objects.filter(url=urls[0]).update(state=FrontierURL.LEASED)
+        FrontierURL.mark_done([urls[1]])
+        FrontierURL.mark_failed(urls[2], "HTTP 404")
+        Article.objects.create(title="T", content_html="", source_url=urls[1])
+
+        data = self.client.get(status_url).json()
+        self.assertEqual(
+            data["progress"],
+            {
+                "pending": 1,
+                "in_progress": 1,
+                "done": 1,
+                "failed": 1,
+                "exists": 1,
+                "invalid": 0,
+            },
+        )
+        self.assertEqual(data["total"], 5)
+
+        (done,) = self._items(job_id, status="done")
+        self.assertEqual(done["url"], urls[1])
+        self.assertIsNotNone(done["article_id"])
+        (failed,) = self._items(job_id, status="failed")
+        self.assertEqual((failed["error"], failed["attempts"]), ("HTTP 404", 1))
+        self.assertEqual(
+            [i["url"] for i in self._items(job_id, status="pending")], [urls[3]]
+        )
+
+        FrontierURL.mark_done([urls[0], urls[2], urls[3]])
+        self.assertTrue(self.client.get(status_url).json()["finished"])
+
+    def test_items_are_paginated_by_cursor(self):
+        job_id = self._submit([f"{SITE}/{i}" for i in range(5)]).json()["id"]
+        url = reverse("scrape-job-items", args=[job_id])
+
+        seen = []
+        page = self.client.get(url, {"page_size": 2}).json()
+        while True:
+            seen += [item["url"] for item in page["results"]]
+            if not page["next"]:
+                break
+            page = self.client.get(page["next"]).json()
+
+        self.assertEqual(seen, [f"{SITE}/{i}" for i in range(5)])
+
+    def test_resubmission_requeues_and_raises_priority(self):
+        self.user.is_staff = True
+        FrontierURL.enqueue([f"{SITE}/a", f"{SITE}/b"], priority=5)
+        FrontierURL.mark_failed(f"{SITE}/a", "timeout")
+
+        self._submit([f"{SITE}/a", f"{SITE}/b"], priority=30)
+
+        rows = {f.url: f for f in FrontierURL.objects.all()}
+        self.assertEqual(rows[f"{SITE}/a"].state, FrontierURL.PENDING)
+        self.assertEqual(rows[f"{SITE}/a"].attempts, 0)
+        self.assertEqual([f.priority for f in rows.values()], [30, 30])
+        # Kept by the discovery source that queued them first.
+        self.assertEqual({f.source for f in rows.values()}, {""})
+
+    def test_only_staff_can_raise_the_priority(self):
+        self._submit([f"{SITE}/a"], priority=1000)
+        self._submit([f"{SITE}/b"], priority=5)
+
+        self.assertEqual(
+            dict(FrontierURL.objects.values_list("url", "priority")),
+            {f"{SITE}/a": 20, f"{SITE}/b": 5},
+        )
+
+    def test_anonymous_requests_are_rejected(self):
+        job_id = self._submit([f"{SITE}/a"]).json()["id"]
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self._submit([f"{SITE}/b"]).status_code, 403)
+        response = self.client.get(reverse("scrape-job-detail", args=[job_id]))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(ScrapeJob.objects.count(), 1)
+
+    @override_settings(SCRAPE_JOB_THROTTLE_RATE="2/hour")
+    def test_submissions_are_throttled_per_user(self):
+        statuses = [self._submit([f"{SITE}/{i}"]).status_code for i in range(3)]
+
+        self.assertEqual(statuses, [201, 201, 429])
+        # Reading the status is not throttled.
+        job_id = ScrapeJob.objects.first().id
+        response = self.client.get(reverse("scrape-job-detail", args=[job_id]))
+        self.assertEqual(response.status_code, 200)
+
+        self.client.force_authenticate(User.objects.create_user("drugi"))
+        self.assertEqual(self._submit([f"{SITE}/x"]).status_code, 201)
+
+    @override_settings(SCRAPE_JOB_MAX_URLS=2)
+    def test_invalid_requests(self):
+        for data in ({"urls": []}, {"urls": ["a", "b", "c"]}, {}):
+            response = self.client.post(reverse("scrape-job-list"), data, format="json")
+            self.assertEqual(response.status_code, 400, data)
+        self.assertFalse(ScrapeJob.objects.exists())
+
+        job_id = self._submit(["a"]).json()["id"]
+        response = self.client.get(
+            reverse("scrape-job-items", args=[job_id]), {"status": "x"}
+        )
+        self.assertEqual(response.json(), {"status": "Unknown status: x"})
+        self.assertEqual(
+            self.client.get(
+                reverse("scrape-job-detail", args=[job_id + 1])
+            ).status_code,
+            404,
+        )
+
+
+class TestSubmitScrapeJob(APITestCase):
+
+    def setUp(self):
+        FrontierURL.objects.all().delete()
+
+    def _statements(self, count: int) -> tuple[list[str], int]:
+        urls = [f"{SITE}/{count}/{i}" for i in range(count)]
+        with CaptureQueriesContext(connection) as queries:
+            submitted = submit_scrape_job(urls)
+        self.assertEqual(submitted.queued, count)
+        statements = [q["sql"].split(None, 1)[0] for q in queries]
+        inserts = statements.count("INSERT")
+        return [s for s in statements if s != "INSERT"], inserts
+
+    def test_statements_do_not_grow_with_the_job(self):
+        small, _ = self._statements(10)
+        large, inserts = self._statements(10_000)
+
+        self.assertEqual(large, small)
+        # Multi-row inserts (batches bounded by the bind parameter limit).
+        self.assertLess(inserts, 10_000 / 50)
+        self.assertEqual(FrontierURL.objects.count(), 10_010)
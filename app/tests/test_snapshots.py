@@ -0,0 +1,148 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from app.models import Article
+from app.tests.test_static_fetch import GALICJA_HTML
+from app.utils.article_writer import ArticleBatchWriter
+from app.utils.domain_scrapers import GalicjaExpressScraper
+from app.utils.reextract import (
+    CHANGED,
+    CREATED,
+    FAILED,
+    UNCHANGED,
+    SnapshotReextractor,
+)
+from app.utils.snapshots import SnapshotStore
+
+CHANGED_TEMPLATE_HTML = GALICJA_HTML.replace("post-text-two-red", "entry-content")
+
+
+class _TempDirTestMixin:
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.store = SnapshotStore(self.root, "zlib")
+
+
+class TestSnapshotStore(_TempDirTestMixin, SimpleTestCase):
+
+    def test_pages_are_stored_once_per_content(self):
+        first = self.store.save("https://a.pl/1", GALICJA_HTML)
+        second = self.store.save("https://b.pl/1", GALICJA_HTML)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(list(self.root.glob("objects/*/*"))), 1)
+        self.assertEqual(len(list(self.store.entries())), 2)
+
+    def test_pages_are_compressed(self):
+        html = GALICJA_HTML * 20
+        self.store.save("https://a.pl/1", html)
+
+        entry = self.store.latest()["https://a.pl/1"]
+        self.assertEqual((entry["codec"], entry["size"]), ("zlib", len(html.encode())))
+        self.assertLess(next(self.root.glob("objects/*/*")).stat().st_size, 1000)
+
+    def test_latest_snapshot_per_url(self):
+        self.store.save("https://a.pl/1", "<p>stara</p>")
+        self.store.save("https://a.pl/1", GALICJA_HTML)
+        self.store.save("https://sub.b.pl/1", "<p>b</p>")
+
+        latest = self.store.latest()
+
+        self.assertEqual(set(latest), {"https://a.pl/1", "https://sub.b.pl/1"})
+        self.assertEqual(self.store.load(latest["https://a.pl/1"]), GALICJA_HTML)
+        self.assertEqual(set(self.store.latest(domain="b.pl")), {"https://sub.b.pl/1"})
+
+    def test_torn_index_line_is_skipped(self):
+        self.store.save("https://a.pl/1", GALICJA_HTML)
+        with open(self.store.index_path, "ab") as index:
+            index.write(b'{"url": "https://a.pl/2", "ha')
+
+        self.assertEqual(set(self.store.latest()), {"https://a.pl/1"})
+
+    @override_settings(SCRAPER_STATIC_FAST_PATH=True, SCRAPER_POLITENESS=False)
+    @patch("app.utils.main_scraper.http_session")
+    def test_scraper_stores_fetched_page(self, session):
+        session.get.return_value = MagicMock(status_code=200, text=GALICJA_HTML)
+
+        with override_settings(SCRAPER_SNAPSHOT_DIR=str(self.root)):
+            GalicjaExpressScraper().extract_article("https://galicjaexpress.pl/a")
+
+        entry = self.store.latest()["https://galicjaexpress.pl/a"]
+        self.assertEqual(self.store.load(entry), GALICJA_HTML)
+
+
+class TestReextraction(_TempDirTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        scraper = GalicjaExpressScraper()
+        stored = scraper.build_article(
+            "https://galicjaexpress.pl/same",
+            **scraper.extract_static_fields(GALICJA_HTML),
+        )
+        with ArticleBatchWriter() as writer:
+            writer.add(stored)
+            writer.add(
+                {
+                    **stored,
+                    "source_url": "https://galicjaexpress.pl/changed",
+                    "title": "Stary tytuł",
+                    "http_etag": '"v1"',
+                }
+            )
+
+        for path in ("same", "changed", "new"):
+            self.store.save(f"https://galicjaexpress.pl/{path}", GALICJA_HTML)
+        self.store.save("https://galicjaexpress.pl/broken", CHANGED_TEMPLATE_HTML)
+
+    def _run(self, workers, dry_run=False):
+        with ArticleBatchWriter() as writer:
+            return SnapshotReextractor(
+                self.store, writer, workers=workers, chunk_size=2, dry_run=dry_run
+            ).run(self.store.latest().values())
+
+    def test_updates_changed_and_inserts_new_articles(self):
+        counts = self._run(workers=1)
+
+        self.assertEqual(counts, {CHANGED: 1, CREATED: 1, UNCHANGED: 1, FAILED: 1})
+        changed = Article.objects.get(source_url="https://galicjaexpress.pl/changed")
+        self.assertEqual(changed.title, "Ford C-Max")
+        # Re-extraction keeps the refresh state of the article.
+        self.assertEqual(changed.http_etag, '"v1"')
+        self.assertTrue(
+            Article.objects.filter(source_url="https://galicjaexpress.pl/new").exists()
+        )
+
+    def test_process_pool_gives_the_same_result(self):
+        counts = self._run(workers=2)
+
+        self.assertEqual(counts, {CHANGED: 1, CREATED: 1, UNCHANGED: 1, FAILED: 1})
+        self.assertEqual(Article.objects.count(), 3)
+
+    def test_dry_run_writes_nothing(self):
+        self._run(workers=1, dry_run=True)
+
+        self.assertEqual(
+            Article.objects.get(source_url="https://galicjaexpress.pl/changed").title,
+            "Stary tytuł",
+        )
+        self.assertEqual(Article.objects.count(), 2)
+
+    def test_command(self):
+        out = StringIO()
+        with override_settings(SCRAPER_SNAPSHOT_DIR=str(self.root)):
+            call_command("reextract_articles", "--workers", "1", stdout=out)
+
+        self.assertIn("Zmienione: 1, nowe: 1, bez zmian: 1, błędy: 1", out.getvalue())
+        with override_settings(SCRAPER_SNAPSHOT_DIR=""):
+            with self.assertRaises(CommandError):
+                call_command("reextract_articles", stdout=StringIO())
@@ -0,0 +1,107 @@
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch, MagicMock
+
+from app.utils.domain_scrapers import GalicjaExpressScraper, TakeGroupScraper
+from app.utils.static_fetch import StaticFetchStats
+
+GALICJA_HTML = """
+<html><body>
+<article>
+  <h1>Ford C-Max</h1>
+  <p>14.10.2024 12:30</p>
+  <div class="post-text-two-red"><p>Pierwszy akapit.</p><p>Drugi akapit.</p></div>
+</article>
+</body></html>
+"""
+
+SPA_SHELL_HTML = '<html><body><div id="root"></div></body></html>'
+
+
+def _response(html, status=200):
+    response = MagicMock()
+    response.status_code = status
+    response.text = html
+    return response
+
+
+class TestStaticFetchStats(SimpleTestCase):
+
+    def test_prefers_static_until_enough_misses(self):
+        stats = StaticFetchStats(min_samples=3, min_hit_rate=0.5, probe_every=100)
+        for _ in range(2):
+            stats.record("a.pl", hit=False)
+        self.assertTrue(stats.prefer_static("a.pl"))
+
+        stats.record("a.pl", hit=False)
+        self.assertFalse(stats.prefer_static("a.pl"))
+        self.assertTrue(stats.prefer_static("b.pl"))
+
+    def test_probes_static_periodically_when_browser_first(self):
+        stats = StaticFetchStats(min_samples=1, min_hit_rate=0.5, probe_every=3)
+        stats.record("a.pl", hit=False)
+
+        decisions = [stats.prefer_static("a.pl") for _ in range(6)]
+
+        self.assertEqual(decisions, [False, False, True, False, False, True])
+
+
+@override_settings(SCRAPER_STATIC_FAST_PATH=True, SCRAPER_POLITENESS=False)
+class TestStaticFastPath(SimpleTestCase):
+
+    def setUp(self):
+        stats = StaticFetchStats()
+        patcher = patch("app.utils.main_scraper.static_fetch_stats", stats)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stats = stats
+
+    @patch("app.utils.main_scraper.get_browser_pool")
+    @patch("app.utils.main_scraper.http_session")
+    def test_uses_static_html_when_selectors_match(self, mock_session, mock_pool):
+        mock_session.get.return_value = _response(GALICJA_HTML)
+        url = "https://galicjaexpress.pl/ford-c-max"
+
+        data = GalicjaExpressScraper().extract_article(url)
+
+        mock_pool.assert_not_called()
+        self.assertEqual(data["title"], "Ford C-Max")
+        self.assertIn("<p>Drugi akapit.</p>", data["content_html"])
+        self.assertEqual(data["published_at"].hour, 12)
+        self.assertEqual(self.stats.snapshot()["galicjaexpress.pl"]["hits"], 1)
+
+    @patch("app.utils.main_scraper.http_session")
+    def test_falls_back_to_browser_when_selectors_miss(self, mock_session):
+        mock_session.get.return_value = _response(SPA_SHELL_HTML)
+        scraper = GalicjaExpressScraper()
+        url = "https://galicjaexpress.pl/spa"
+
+        mock_fetch = MagicMock()
+        raw = {
+            "title": "T",
+            "content_html": "<p>x</p>",
+            "content_text": "x",
+            "datetime_raw": None,
+        }
+        with patch("app.utils.main_scraper.get_browser_pool"), patch.multiple(
+            scraper,
+            fetch_page=mock_fetch,
+            extract_fields=MagicMock(return_value=raw),
+        ):
+            data = scraper.extract_article(url)
+
+        mock_fetch.assert_called_once()
+        self.assertEqual(data["title"], "T")
+        self.assertEqual(self.stats.snapshot()["galicjaexpress.pl"]["misses"], 1)
+
+    @patch("app.utils.main_scraper.http_session")
+    def test_js_only_paths_skip_static_fetch(self, mock_session):
+        scraper = TakeGroupScraper()
+        url = "https://take-group.github.io/example-blog-without-ssr/artykul"
+
+        self.assertFalse(scraper.use_static_first(url))
+        self.assertTrue(
+            scraper.use_static_first(
+                "https://take-group.github.io/example-blog/artykul"
+            )
+        )
+        mock_session.get.assert_not_called()
@@ -0,0 +1,224 @@
+import threading
+import time
+import unittest
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+
+from app.models import Article, FrontierURL
+from app.utils.domain_scrapers import GalicjaExpressScraper
+from app.utils.worker import ScrapeWorker, WorkerStats
+
+LEASE = timedelta(minutes=5)
+
+
+def _queue(count, prefix="https://a.pl/"):
+    FrontierURL.objects.all().delete()
+    FrontierURL.enqueue(f"{prefix}{idx}" for idx in range(count))
+
+
+def _article(url):
+    if url.endswith("/broken"):
+        raise RuntimeError("boom")
+    return {
+        "title": "T",
+        "content_html": "<p>x</p>",
+        "content_text": "x",
+        "source_url": url,
+        "published_at": None,
+    }
+
+
+class TestLeases(TestCase):
+
+    def setUp(self):
+        _queue(5)
+
+    def test_claimed_urls_are_not_claimed_again(self):
+        first = FrontierURL.claim("w1", 3, LEASE)
+        second = FrontierURL.claim("w2", 3, LEASE)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(FrontierURL.claim("w3", 3, LEASE), [])
+
+    def test_expired_lease_is_reclaimed_and_old_holder_cannot_finish(self):
+        [url] = FrontierURL.claim("dead", 1, LEASE)
+        FrontierURL.objects.filter(url=url).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(FrontierURL.reclaim_expired(), 1)
+        self.assertIn(url, FrontierURL.claim("alive", 5, LEASE))
+
+        FrontierURL.mark_done([url], worker="dead")
+        self.assertEqual(FrontierURL.objects.get(url=url).leased_by, "alive")
+
+        FrontierURL.mark_done([url], worker="alive")
+        entry = FrontierURL.objects.get(url=url)
+        self.assertEqual((entry.state, entry.leased_by), (FrontierURL.DONE, ""))
+
+    def test_heartbeat_extends_only_own_leases(self):
+        FrontierURL.claim("w1", 2, timedelta(seconds=1))
+        FrontierURL.claim("w2", 2, timedelta(seconds=1))
+
+        self.assertEqual(FrontierURL.extend_leases("w1", LEASE), 2)
+
+        soon = timezone.now() + timedelta(minutes=1)
+        extended = FrontierURL.objects.filter(lease_expires_at__gt=soon)
+        self.assertEqual(set(extended.values_list("leased_by", flat=True)), {"w1"})
+
+
+@patch("app.utils.worker.scrap_article", side_effect=_article)
+class TestScrapeWorker(TestCase):
+
+    def test_scrapes_until_queue_is_empty(self, _scrap):
+        _queue(4)
+        FrontierURL.enqueue(["https://a.pl/broken"])
+        reports = []
+        worker = ScrapeWorker(
+            worker_id="w1", claim_size=2, report_interval=0, report=reports.append
+        )
+
+        worker.run(exit_when_empty=True)
+
+        states = dict(FrontierURL.objects.values_list("url", "state"))
+        self.assertEqual(states.pop("https://a.pl/broken"), FrontierURL.FAILED)
+        self.assertEqual(set(states.values()), {FrontierURL.DONE})
+        self.assertEqual(Article.objects.count(), 4)
+        stats = worker.stats.snapshot()
+        self.assertEqual(
+            (stats["claimed"], stats["finished"], stats["failed"]), (5, 4, 1)
+        )
+        self.assertIn("Worker w1 zakończył: pobrane: 5", reports[-1])
+
+    def test_stop_returns_unstarted_urls_to_the_queue(self, scrap):
+        _queue(4)
+        worker = ScrapeWorker(worker_id="w1", claim_size=4)
+
+        def stop_after_first(url):
+            worker.stop()
+            return _article(url)
+
+        scrap.side_effect = stop_after_first
+        worker.run(exit_when_empty=True)
+
+        counts = {
+            state: FrontierURL.objects.filter(state=state).count()
+            for state in (FrontierURL.DONE, FrontierURL.PENDING, FrontierURL.LEASED)
+        }
+        self.assertEqual(
+            counts,
+            {FrontierURL.DONE: 1, FrontierURL.PENDING: 3, FrontierURL.LEASED: 0},
+        )
+
+    def test_max_jobs(self, _scrap):
+        _queue(5)
+
+        ScrapeWorker(worker_id="w1", claim_size=2).run(max_jobs=3)
+
+        self.assertEqual(FrontierURL.objects.filter(state=FrontierURL.DONE).count(), 3)
+
+
+@override_settings(SCRAPER_POLITENESS=False)
+@patch("app.utils.async_pipeline.AsyncBrowserPool", return_value=AsyncMock())
+class TestAsyncScrapeWorker(TransactionTestCase):
+    """`run_async` reads the queue from the pipeline's own threads."""
+
+    def test_partial_claim_starts_without_waiting_for_more(self, _pool):
+        _queue(3, prefix="https://galicjaexpress.pl/")
+        saved = []
+        worker = ScrapeWorker(
+            worker_id="w1", claim_size=10, idle_sleep=30, batch_size=1
+        )
+
+        def notify(kind, url, detail):
+            saved.append(url)
+            if len(saved) == 3:
+                worker.stop()
+
+        worker.notify = notify
+        # Fails the test rather than hanging it if the claim never starts.
+        guard = threading.Timer(10, worker.stop)
+        guard.start()
+        self.addCleanup(guard.cancel)
+
+        async def fetch(pipeline, scraper, url):
+            return {
+                "title": "T",
+                "content_html": "<p>x</p>",
+                "content_text": "x",
+                "datetime_raw": "14.10.2024",
+            }
+
+        started = time.monotonic()
+        with patch(
+            "app.utils.async_pipeline.get_scraper_for_domain",
+            return_value=GalicjaExpressScraper(),
+        ), patch("app.utils.async_pipeline.AsyncScrapePipeline._fetch_raw", fetch):
+            worker.run_async()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(len(saved), 3)
+        self.assertEqual(FrontierURL.objects.filter(state=FrontierURL.DONE).count(), 3)
+        self.assertEqual(Article.objects.count(), 3)
+
+
+class TestWorkerStats(SimpleTestCase):
+
+    def test_rates_per_minute(self):
+        now = [0.0]
+        stats = WorkerStats(clock=lambda: now[0])
+        stats.add(claimed=10, finished=8, failed=1)
+        now[0] = 30.0
+
+        snapshot = stats.snapshot()
+
+        self.assertEqual(snapshot["claimed_per_min"], 20.0)
+        self.assertEqual(snapshot["finished_per_min"], 16.0)
+        self.assertEqual(snapshot["failed_per_min"], 2.0)
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "FOR UPDATE SKIP LOCKED needs Postgres"
+)
+class TestConcurrentClaims(TransactionTestCase):
+    """Several workers, each with its own connection, on one queue."""
+
+    def test_workers_claim_disjoint_urls(self):
+        _queue(200)
+        claimed: dict[str, list[str]] = {}
+        barrier = threading.Barrier(4)
+
+        def work(name):
+            barrier.wait()
+            urls = []
+            try:
+                while batch := FrontierURL.claim(name, 7, LEASE):
+                    urls += batch
+                    FrontierURL.mark_done(batch, worker=name)
+            finally:
+                connection.close()
+            claimed[name] = urls
+
+        threads = [threading.Thread(target=work, args=(f"w{idx}",)) for idx in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        all_urls = [url for urls in claimed.values() for url in urls]
+        self.assertEqual(len(all_urls), 200)
+        self.assertEqual(len(set(all_urls)), 200)
+        self.assertEqual(
+            FrontierURL.objects.filter(state=FrontierURL.DONE).count(), 200
+        )
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from django.conf import settings
+from rest_framework.throttling import UserRateThrottle
+
+
+class ScrapeJobRateThrottle(UserRateThrottle):
+    """Scrape job submissions per user, at SCRAPE_JOB_THROTTLE_RATE ("" = no limit)."""
+
+    scope = "scrape_jobs"
+
+    def get_rate(self) -> Optional[str]:
+        return settings.SCRAPE_JOB_THROTTLE_RATE or None
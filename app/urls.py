@@ -1,10 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ArticleViewSet
+from .views import ArticleViewSet, ScrapeJobViewSet, export_articles, metrics
 
 router = DefaultRouter()
 router.register(r"articles", ArticleViewSet, basename="article")
+router.register(r"scrape-jobs", ScrapeJobViewSet, basename="scrape-job")
 
 urlpatterns = [
+    path("metrics", metrics, name="metrics"),
+    # Before the router: "export" would be taken for an article id.
+    path("articles/export/", export_articles, name="article-export"),
     path("", include(router.urls)),
 ]
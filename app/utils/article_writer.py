@@ -0,0 +1,146 @@
+from __future__ import annotations
+import logging
+import time
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import Article, ArticleBody, ArticleChangeMarker
+from .metrics import DB_WRITE_SECONDS, get_metrics
+
+
+logger = logging.getLogger(__name__)
+
+UPSERT_FIELDS = [
+    "title",
+    "body",
+    "content_text",
+    "source_domain",
+    "domain_key",
+    "published_at",
+    "http_etag",
+    "http_last_modified",
+    "page_hash",
+    "checked_at",
+    "next_check_at",
+    "unchanged_checks",
+]
+
+
+def known_source_urls(urls: Iterable[str], chunk_size: int = 1000) -> set[str]:
+    """Returns those of `urls` that are already stored, one query per chunk."""
+
+    urls = list(dict.fromkeys(urls))
+    known: set[str] = set()
+    for start in range(0, len(urls), chunk_size):
+        chunk = urls[start : start + chunk_size]
+        known.update(
+            Article.objects.filter(source_url__in=chunk).values_list(
+                "source_url", flat=True
+            )
+        )
+    return known
+
+
+class ArticleBatchWriter:
+    """
+    Collects scraped article dicts and writes them with one
+    `INSERT ... ON CONFLICT (source_url) DO UPDATE` per batch. A batch is
+    flushed when it reaches `batch_size` or when `flush_interval` seconds
+    have passed since the previous flush.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        on_saved: Optional[Callable[[Article], None]] = None,
+        on_failed: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        self.batch_size = batch_size or settings.SCRAPER_WRITE_BATCH_SIZE
+        self.flush_interval = (
+            settings.SCRAPER_WRITE_FLUSH_INTERVAL
+            if flush_interval is None
+            else flush_interval
+        )
+        self.on_saved = on_saved or (lambda article: None)
+        self.on_failed = on_failed or (lambda url, e: None)
+        # Keyed by source_url: one upsert cannot touch the same row twice.
+        self._pending: dict[str, dict] = {}
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "ArticleBatchWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+    def add(self, data: dict) -> None:
+        self._pending[data["source_url"]] = data
+        if len(self._pending) >= self.batch_size or self.flush_due():
+            self.flush()
+
+    def flush_due(self) -> bool:
+        return (
+            bool(self._pending)
+            and time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self) -> list[Article]:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return []
+
+        articles = [Article(**data) for data in self._pending.values()]
+        self._pending = {}
+        now = timezone.now()
+        for article in articles:
+            article.fill_domain()
+            if article.checked_at is None:
+                # A fresh scrape counts as a refresh check that found changes.
+                article.schedule_check(changed=True, now=now)
+
+        start = time.perf_counter()
+        try:
+            saved = self._upsert(articles)
+        except Exception as e:
+            logger.exception("Błąd zapisu partii %d artykułów: %s", len(articles), e)
+            saved = self._upsert_one_by_one(articles)
+
+        elapsed = time.perf_counter() - start
+        get_metrics().observe(DB_WRITE_SECONDS, elapsed)
+        logger.info(
+            "Zapisano partię %d/%d artykułów w %.1f ms",
+            len(saved),
+            len(articles),
+            elapsed * 1000,
+        )
+        for article in saved:
+            self.on_saved(article)
+        return saved
+
+    def _upsert(self, articles: list[Article]) -> list[Article]:
+        # Savepoint, so a failed batch can be retried inside a transaction.
+        with transaction.atomic():
+            ArticleBody.store(article.prepare_body() for article in articles)
+            saved = Article.objects.bulk_create(
+                articles,
+                update_conflicts=True,
+                unique_fields=["source_url"],
+                update_fields=UPSERT_FIELDS,
+            )
+            ArticleChangeMarker.bump(a.source_domain for a in saved)
+            return saved
+
+    def _upsert_one_by_one(self, articles: list[Article]) -> list[Article]:
+        # Isolates the rows that broke the batch; the rest still get saved.
+        saved = []
+        for article in articles:
+            try:
+                saved.extend(self._upsert([article]))
+            except Exception as e:
+                logger.exception("Błąd przy zapisie %s: %s", article.source_url, e)
+                self.on_failed(article.source_url, e)
+        return saved
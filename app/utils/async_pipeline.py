@@ -0,0 +1,243 @@
+from __future__ import annotations
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict
+from itertools import islice
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .article_writer import ArticleBatchWriter, known_source_urls
+from .browser_pool import AsyncBrowserPool
+from .metrics import PHASE_SECONDS, get_metrics
+from .politeness import get_scheduler, interleave_by_domain
+from .resilience import OTHER, CircuitOpen, ScrapeError, call_with_retries_async
+from .scraper_factory import get_scraper_for_domain
+
+
+logger = logging.getLogger(__name__)
+
+SKIPPED = "skipped"
+SAVED = "saved"
+FAILED = "failed"
+# The host's circuit breaker is open; the URL should be tried again later.
+DEFERRED = "deferred"
+
+_DONE = object()
+
+# URLs read from the input (and checked against stored articles) at a time.
+INPUT_CHUNK_SIZE = 500
+
+
+class AsyncScrapePipeline:
+    """
+    Scrapes `urls` concurrently with the async Playwright API.
+
+    fetch (plain HTTP or browser) → extract (date parsing, article dict) →
+    write (batched upserts), connected by bounded queues. At most `concurrency` pages are loaded at
+    once and at most `per_domain` of them from the same host. Failed
+    fetches are retried with backoff outside the global slot; URLs of a
+    host whose circuit breaker is open are reported as DEFERRED. Progress
+    is reported through `notify(kind, url, detail)`.
+
+    `urls` is consumed lazily, `input_chunk_size` at a time, in a worker
+    thread, so it may be a database cursor over a large frontier.
+    Alternatively `batches` gives the input chunks themselves (a frontier
+    claim each); an empty one means nothing is due yet, and `idle_wait` is
+    then run in a thread of its own, so the waiting does not hold the
+    thread shared with the writer. `checkpoint`, if given, is called (also
+    in a worker thread) after every input chunk and at the end.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        concurrency: int = 8,
+        per_domain: int = 2,
+        notify: Optional[Callable[[str, str, object], None]] = None,
+        pool: Optional[AsyncBrowserPool] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        checkpoint: Optional[Callable[[], None]] = None,
+        input_chunk_size: int = INPUT_CHUNK_SIZE,
+        batches: Optional[Iterable[list[str]]] = None,
+        idle_wait: Optional[Callable[[], None]] = None,
+    ):
+        self.urls = urls
+        self.batches = batches
+        self.idle_wait = idle_wait or (lambda: time.sleep(1))
+        self.concurrency = max(1, concurrency)
+        self.per_domain = max(1, per_domain)
+        self.notify = notify or (lambda kind, url, detail: None)
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.checkpoint = checkpoint or (lambda: None)
+        self.input_chunk_size = input_chunk_size
+
+        self._global = asyncio.Semaphore(self.concurrency)
+        self._domains: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_domain)
+        )
+        # Limits how many URLs wait for a fetch slot, so a long input
+        # does not turn into a long list of pending tasks.
+        self._admission = asyncio.Semaphore(self.concurrency * 4)
+        self._extract_q: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        self._write_q: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+    async def run(self) -> None:
+        owns_pool = self.pool is None
+        if owns_pool:
+            size = settings.SCRAPER_BROWSER_POOL_SIZE
+            self.pool = AsyncBrowserPool(
+                size=size,
+                pages_per_browser=math.ceil(self.concurrency / size),
+                max_pages_per_context=settings.SCRAPER_CONTEXT_MAX_PAGES,
+                max_rss_mb=settings.SCRAPER_CONTEXT_MAX_RSS_MB or None,
+                proxy=settings.SCRAPER_PROXY or None,
+            )
+
+        extractor = asyncio.create_task(self._extract_stage())
+        writer = asyncio.create_task(self._write_stage())
+        try:
+            fetches = await self._produce()
+            await asyncio.gather(*fetches)
+            await self._extract_q.put(_DONE)
+            await extractor
+            await self._write_q.put(_DONE)
+            await writer
+            await sync_to_async(self.checkpoint)()
+        finally:
+            extractor.cancel()
+            writer.cancel()
+            if owns_pool:
+                await self.pool.close()
+
+    async def _produce(self) -> set[asyncio.Task]:
+        if self.batches is not None:
+            batches = iter(self.batches)
+            next_chunk = sync_to_async(lambda: next(batches, None))
+        else:
+            urls = iter(self.urls)
+            next_chunk = sync_to_async(
+                lambda: list(islice(urls, self.input_chunk_size)) or None
+            )
+
+        # Finished tasks drop out, so a long input does not pile them up.
+        tasks: set[asyncio.Task] = set()
+        while (chunk := await next_chunk()) is not None:
+            if not chunk:
+                await asyncio.to_thread(self.idle_wait)
+                continue
+            known = await sync_to_async(known_source_urls)(chunk)
+            for url in interleave_by_domain(chunk):
+                if url in known:
+                    self.notify(SKIPPED, url, None)
+                    continue
+
+                await self._admission.acquire()
+                task = asyncio.create_task(self._fetch(url))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await sync_to_async(self.checkpoint)()
+        return tasks
+
+    async def _fetch(self, url: str) -> None:
+        try:
+            scraper = get_scraper_for_domain(url)
+            if scraper is None:
+                raise ValueError(f"Brak scrapera dla domeny: {url}")
+
+            host = (urlparse(url).hostname or "").lower()
+            # Domain slot first, so a busy or throttled host does not hold
+            # global slots, and its breaker is checked only when the URL's
+            # turn comes (then it may have opened).
+            async with self._domains[host]:
+                with get_metrics().span("total", url):
+                    raw = await call_with_retries_async(
+                        url, lambda: self._fetch_raw(scraper, url)
+                    )
+            await self._extract_q.put((scraper, url, raw))
+        except CircuitOpen as e:
+            logger.info("%s → %s", url, e)
+            self.notify(DEFERRED, url, e)
+        except ScrapeError as e:
+            logger.error(
+                "Błąd przy przetwarzaniu %s (%s): %s",
+                url,
+                e.kind,
+                e,
+                exc_info=e.kind == OTHER,
+            )
+            self.notify(FAILED, url, e)
+        except Exception as e:
+            logger.exception("Błąd przy przetwarzaniu %s: %s", url, e)
+            self.notify(FAILED, url, e)
+        finally:
+            self._admission.release()
+
+    async def _fetch_raw(self, scraper, url: str) -> dict:
+        # One attempt; waits for the host's politeness limits before
+        # taking a global slot.
+        await self._wait_polite(url)
+        async with self._global:
+            if scraper.use_static_first(url):
+                raw = await asyncio.to_thread(scraper.fetch_static_raw, url)
+                if raw is not None:
+                    return raw
+            started = time.perf_counter()
+            async with self.pool.page() as page:
+                get_metrics().observe(
+                    PHASE_SECONDS,
+                    time.perf_counter() - started,
+                    url=url,
+                    phase="browser",
+                )
+                return await scraper.extract_raw_async(url, page)
+
+    async def _wait_polite(self, url: str) -> None:
+        # The request itself waits in the scheduler too; this only keeps the
+        # wait outside the global slot.
+        scheduler = get_scheduler()
+        while (wait := scheduler.wait_time(url)) > 0:
+            await asyncio.sleep(wait)
+
+    async def _extract_stage(self) -> None:
+        while (item := await self._extract_q.get()) is not _DONE:
+            scraper, url, raw = item
+            try:
+                data = scraper.build_article(url, **raw)
+            except Exception as e:
+                logger.exception("Błąd przy przetwarzaniu %s: %s", url, e)
+                self.notify(FAILED, url, e)
+                continue
+            await self._write_q.put(data)
+
+    async def _write_stage(self) -> None:
+        writer = ArticleBatchWriter(
+            batch_size=self.batch_size,
+            flush_interval=self.flush_interval,
+            on_saved=lambda article: self.notify(SAVED, article.source_url, article),
+            on_failed=lambda url, e: self.notify(FAILED, url, e),
+        )
+        add = sync_to_async(writer.add)
+        flush = sync_to_async(writer.flush)
+
+        while True:
+            try:
+                data = await asyncio.wait_for(
+                    self._write_q.get(), timeout=writer.flush_interval or None
+                )
+            except asyncio.TimeoutError:
+                await flush()
+                continue
+
+            if data is _DONE:
+                break
+            await add(data)
+
+        await flush()
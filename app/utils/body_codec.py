@@ -0,0 +1,90 @@
+from __future__ import annotations
+import hashlib
+import logging
+import zlib
+from functools import lru_cache
+
+try:
+    import zstandard
+except ImportError:  # optional, `pip install zstandard`
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+NONE = "none"
+ZLIB = "zlib"
+ZSTD = "zstd"
+CODECS = (NONE, ZLIB, ZSTD)
+
+# Below this size compression rarely pays for its header.
+MIN_COMPRESS_SIZE = 256
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def body_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def compress(raw: bytes, codec: str) -> tuple[str, bytes]:
+    """
+    Compresses `raw` with `codec` and returns (codec actually used, data).
+    Small or incompressible bodies are stored as is.
+    """
+
+    if codec not in CODECS:
+        raise ValueError(f"Unknown body codec: {codec}")
+
+    if codec == ZSTD and zstandard is None:
+        _warn_no_zstd()
+        codec = ZLIB
+
+    if codec == NONE or len(raw) < MIN_COMPRESS_SIZE:
+        return NONE, raw
+
+    if codec == ZSTD:
+        data = _zstd_compressor().compress(raw)
+    else:
+        data = zlib.compress(raw, ZLIB_LEVEL)
+
+    if len(data) >= len(raw):
+        return NONE, raw
+    return codec, data
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    data = bytes(data)  # memoryview from the database driver
+    if codec == NONE:
+        return data
+    if codec == ZLIB:
+        return zlib.decompress(data)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Treść zapisana w zstd, brak pakietu zstandard")
+        return _zstd_decompressor().decompress(data)
+    raise ValueError(f"Unknown body codec: {codec}")
+
+
+def decode_body(data, codec) -> str:
+    """HTML of a stored body; articles without a body have empty HTML."""
+
+    if data is None:
+        return ""
+    return decompress(data, codec).decode()
+
+
+@lru_cache(maxsize=None)
+def _zstd_compressor():
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+
+@lru_cache(maxsize=None)
+def _zstd_decompressor():
+    return zstandard.ZstdDecompressor()
+
+
+@lru_cache(maxsize=None)
+def _warn_no_zstd() -> None:
+    logger.warning("Brak pakietu zstandard, treści będą kompresowane zlib")
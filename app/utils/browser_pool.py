@@ -0,0 +1,393 @@
+from __future__ import annotations
+import asyncio
+import atexit
+import logging
+import os
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
+
+from django.conf import settings
+from playwright.async_api import (
+    async_playwright,
+    Browser as AsyncBrowser,
+    BrowserContext as AsyncBrowserContext,
+    Page as AsyncPage,
+    Playwright as AsyncPlaywright,
+)
+from playwright.sync_api import (
+    sync_playwright,
+    Browser,
+    BrowserContext,
+    Error as PlaywrightError,
+    Page,
+    Playwright,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def chromium_rss_mb(root_pid: Optional[int] = None) -> Optional[float]:
+    """
+    Returns the summed RSS (in MB) of all processes descending from
+    `root_pid` (by default the current process), which covers the
+    Playwright driver and every Chromium it spawned.
+    Returns None where /proc is not available.
+    """
+
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    root_pid = root_pid or os.getpid()
+    children: dict[int, list[int]] = {}
+    rss: dict[int, int] = {}
+
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            statm = (entry / "statm").read_text()
+        except OSError:
+            continue
+
+        pid = int(entry.name)
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(pid)
+        rss[pid] = int(statm.split()[1]) * _PAGE_SIZE
+
+    total = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+
+    return total / (1024 * 1024)
+
+
+@dataclass
+class _Slot:
+    browser: Optional[Browser] = None
+    context: Optional[BrowserContext] = None
+    page: Optional[Page] = None
+    pages_served: int = 0
+    in_use: bool = False
+
+
+class BrowserPool:
+    """
+    Long-lived set of Chromium processes. Each browser keeps one isolated
+    context with a single page that is reset and handed out again, so the
+    cold start is paid once per browser instead of once per URL.
+
+    The pool is built on the sync Playwright API and must be used from the
+    thread that started it.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_pages_per_context: int = 50,
+        max_rss_mb: Optional[int] = None,
+        headless: bool = True,
+        proxy: Optional[str] = None,
+    ):
+        self.size = max(1, size)
+        self.max_pages_per_context = max_pages_per_context
+        self.max_rss_mb = max_rss_mb
+        self.headless = headless
+        self.proxy = proxy
+        self._playwright: Optional[Playwright] = None
+        self._slots = [_Slot() for _ in range(self.size)]
+        self._next = 0
+
+    def start(self) -> None:
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+
+    @contextmanager
+    def page(self) -> Iterator[Page]:
+        slot = self._acquire()
+        try:
+            yield slot.page
+        except PlaywrightError:
+            # Page may have crashed mid-navigation; rebuild the context
+            # so the next user gets a clean one.
+            self._recycle_context(slot)
+            raise
+        finally:
+            self._release(slot)
+
+    def close(self) -> None:
+        for slot in self._slots:
+            self._close_browser(slot)
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except PlaywrightError as e:
+                logger.warning("Błąd przy zatrzymywaniu Playwright: %s", e)
+            self._playwright = None
+
+    def _acquire(self) -> _Slot:
+        self.start()
+
+        for offset in range(self.size):
+            idx = (self._next + offset) % self.size
+            slot = self._slots[idx]
+            if not slot.in_use:
+                self._next = (idx + 1) % self.size
+                break
+        else:
+            raise RuntimeError("Brak wolnych przeglądarek w puli")
+
+        self._ensure_healthy(slot)
+        slot.in_use = True
+        return slot
+
+    def _release(self, slot: _Slot) -> None:
+        slot.in_use = False
+        if slot.context is None:
+            # Recycled by `page()` after an error; rebuilt on next acquire.
+            return
+
+        slot.pages_served += 1
+
+        if slot.pages_served >= self.max_pages_per_context:
+            self._recycle_context(slot)
+            return
+
+        if self.max_rss_mb:
+            rss = chromium_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                logger.info(
+                    "Pula przeglądarek zajmuje %.0f MB (limit %d MB), odświeżam kontekst",
+                    rss,
+                    self.max_rss_mb,
+                )
+                self._recycle_context(slot)
+                return
+
+        self._reset_page(slot)
+
+    def _ensure_healthy(self, slot: _Slot) -> None:
+        if slot.browser is None or not slot.browser.is_connected():
+            if slot.browser is not None:
+                logger.warning(
+                    "Przeglądarka w puli przestała odpowiadać, uruchamiam nową"
+                )
+            self._close_browser(slot)
+            slot.browser = self._playwright.chromium.launch(
+                headless=self.headless, proxy=_proxy(self.proxy)
+            )
+
+        if slot.context is None:
+            slot.context = slot.browser.new_context()
+            slot.pages_served = 0
+
+        if slot.page is None or slot.page.is_closed():
+            slot.page = slot.context.new_page()
+
+    def _reset_page(self, slot: _Slot) -> None:
+        try:
+            slot.page.unroute_all(behavior="ignoreErrors")
+            slot.page.goto("about:blank")
+            slot.context.clear_cookies()
+        except PlaywrightError:
+            self._recycle_context(slot)
+
+    def _recycle_context(self, slot: _Slot) -> None:
+        if slot.context is not None:
+            try:
+                slot.context.close()
+            except PlaywrightError:
+                pass
+        slot.context = None
+        slot.page = None
+        slot.pages_served = 0
+
+    def _close_browser(self, slot: _Slot) -> None:
+        self._recycle_context(slot)
+        if slot.browser is not None:
+            try:
+                slot.browser.close()
+            except PlaywrightError:
+                pass
+        slot.browser = None
+
+
+@dataclass
+class _AsyncSlot:
+    browser_idx: int
+    browser: Optional[AsyncBrowser] = None
+    context: Optional[AsyncBrowserContext] = None
+    page: Optional[AsyncPage] = None
+    pages_served: int = 0
+
+
+class AsyncBrowserPool:
+    """
+    Async Playwright variant of `BrowserPool`. `size` browsers each host
+    `pages_per_browser` slots (one context + page per slot), so up to
+    `size * pages_per_browser` pages are in flight at once; `page()` waits
+    for a free slot.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        pages_per_browser: int = 4,
+        max_pages_per_context: int = 50,
+        max_rss_mb: Optional[int] = None,
+        headless: bool = True,
+        proxy: Optional[str] = None,
+    ):
+        self.size = max(1, size)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.max_pages_per_context = max_pages_per_context
+        self.max_rss_mb = max_rss_mb
+        self.headless = headless
+        self.proxy = proxy
+        self._playwright: Optional[AsyncPlaywright] = None
+        self._browsers: list[Optional[AsyncBrowser]] = [None] * self.size
+        self._free: Optional[asyncio.Queue[_AsyncSlot]] = None
+        self._slots: list[_AsyncSlot] = []
+        self._launch_lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> None:
+        if self._playwright is not None:
+            return
+
+        self._playwright = await async_playwright().start()
+        self._launch_lock = asyncio.Lock()
+        self._free = asyncio.Queue()
+        self._slots = [
+            _AsyncSlot(browser_idx=idx % self.size)
+            for idx in range(self.size * self.pages_per_browser)
+        ]
+        for slot in self._slots:
+            self._free.put_nowait(slot)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[AsyncPage]:
+        await self.start()
+        slot = await self._free.get()
+        try:
+            await self._ensure_healthy(slot)
+            yield slot.page
+        except PlaywrightError:
+            await self._recycle_context(slot)
+            raise
+        finally:
+            await self._release(slot)
+            self._free.put_nowait(slot)
+
+    async def close(self) -> None:
+        for slot in self._slots:
+            await self._recycle_context(slot)
+        for idx, browser in enumerate(self._browsers):
+            if browser is not None:
+                try:
+                    await browser.close()
+                except PlaywrightError:
+                    pass
+            self._browsers[idx] = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except PlaywrightError as e:
+                logger.warning("Błąd przy zatrzymywaniu Playwright: %s", e)
+            self._playwright = None
+
+    async def _browser(self, idx: int) -> AsyncBrowser:
+        async with self._launch_lock:
+            browser = self._browsers[idx]
+            if browser is None or not browser.is_connected():
+                if browser is not None:
+                    logger.warning(
+                        "Przeglądarka w puli przestała odpowiadać, uruchamiam nową"
+                    )
+                browser = await self._playwright.chromium.launch(
+                    headless=self.headless, proxy=_proxy(self.proxy)
+                )
+                self._browsers[idx] = browser
+            return browser
+
+    async def _ensure_healthy(self, slot: _AsyncSlot) -> None:
+        browser = await self._browser(slot.browser_idx)
+        if slot.browser is not browser:
+            # Browser was replaced; the old context died with it.
+            slot.context = None
+            slot.page = None
+            slot.browser = browser
+
+        if slot.context is None:
+            slot.context = await browser.new_context()
+            slot.pages_served = 0
+
+        if slot.page is None or slot.page.is_closed():
+            slot.page = await slot.context.new_page()
+
+    async def _release(self, slot: _AsyncSlot) -> None:
+        if slot.context is None:
+            return
+
+        slot.pages_served += 1
+        if slot.pages_served >= self.max_pages_per_context:
+            await self._recycle_context(slot)
+            return
+
+        if self.max_rss_mb:
+            rss = chromium_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                await self._recycle_context(slot)
+                return
+
+        try:
+            await slot.page.unroute_all(behavior="ignoreErrors")
+            await slot.page.goto("about:blank")
+            await slot.context.clear_cookies()
+        except PlaywrightError:
+            await self._recycle_context(slot)
+
+    async def _recycle_context(self, slot: _AsyncSlot) -> None:
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except PlaywrightError:
+                pass
+        slot.context = None
+        slot.page = None
+        slot.pages_served = 0
+
+
+def _proxy(server: Optional[str]) -> Optional[dict]:
+    return {"server": server} if server else None
+
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(
+            size=settings.SCRAPER_BROWSER_POOL_SIZE,
+            max_pages_per_context=settings.SCRAPER_CONTEXT_MAX_PAGES,
+            max_rss_mb=settings.SCRAPER_CONTEXT_MAX_RSS_MB or None,
+            proxy=settings.SCRAPER_PROXY or None,
+        )
+        atexit.register(shutdown_browser_pool)
+    return _pool
+
+
+def shutdown_browser_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
@@ -1,8 +1,8 @@
 from __future__ import annotations
 import re
-from datetime import datetime, time
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
-import dateparser
 from zoneinfo import ZoneInfo
 
 
@@ -10,6 +10,8 @@ WARSAW = ZoneInfo("Europe/Warsaw")
 
 OUTPUT_FMT = "%d.%m.%Y %H:%M:%S"
 
+PARSE_CACHE_SIZE = 4096
+
 TIME_PATTERN = re.compile(
     r"(\b\d{1,2}:\d{2}(?::\d{2})?\b)|(\b\d{1,2}\s?(am|pm)\b)", re.IGNORECASE
 )
@@ -24,6 +26,56 @@ RELATIVE_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
+YEAR_PATTERN = re.compile(r"\b\d{4}\b")
+
+MONTHS = {
+    # Polish, genitive / nominative / abbreviated, with and without diacritics
+    "stycznia": 1, "styczeń": 1, "styczen": 1, "sty": 1,
+    "lutego": 2, "luty": 2, "lut": 2,
+    "marca": 3, "marzec": 3, "mar": 3,
+    "kwietnia": 4, "kwiecień": 4, "kwiecien": 4, "kwi": 4,
+    "maja": 5, "maj": 5,
+    "czerwca": 6, "czerwiec": 6, "cze": 6,
+    "lipca": 7, "lipiec": 7, "lip": 7,
+    "sierpnia": 8, "sierpień": 8, "sierpien": 8, "sie": 8,
+    "września": 9, "wrzesień": 9, "wrzesnia": 9, "wrzesien": 9, "wrz": 9,
+    "października": 10, "październik": 10, "pazdziernika": 10,
+    "pazdziernik": 10, "paź": 10, "paz": 10,
+    "listopada": 11, "listopad": 11, "lis": 11,
+    "grudnia": 12, "grudzień": 12, "grudzien": 12, "gru": 12,
+    # English
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3,
+    "april": 4, "apr": 4, "may": 5, "june": 6, "jun": 6, "july": 7,
+    "jul": 7, "august": 8, "aug": 8, "september": 9, "sept": 9, "sep": 9,
+    "october": 10, "oct": 10, "november": 11, "nov": 11, "december": 12,
+    "dec": 12,
+}  # fmt: skip
+
+_MONTH = "|".join(sorted(map(re.escape, MONTHS), key=len, reverse=True))
+_CLOCK = r"(?:,?\s+(?:godz\.?\s*|o\s+)?(\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+
+ISO_PATTERN = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?)?"
+    r"\s*(Z|[+-]\d{2}:?\d{2})?",
+    re.IGNORECASE,
+)
+
+# 14.10.2024, 14/10/2024 12:30, 14-10-2024, godz. 12:30
+NUMERIC_DMY_PATTERN = re.compile(r"(\d{1,2})[./-](\d{1,2})[./-](\d{4})" + _CLOCK)
+
+# 14 października 2024, 14 Oct 2024 r. 12:30
+TEXT_DMY_PATTERN = re.compile(
+    r"(\d{1,2})\.?\s+(" + _MONTH + r")\.?\s+(\d{4})(?:\s*r\b\.?)?" + _CLOCK,
+    re.IGNORECASE,
+)
+
+# October 14, 2024 12:30
+TEXT_MDY_PATTERN = re.compile(
+    r"(" + _MONTH + r")\.?\s+(\d{1,2}),?\s+(\d{4})" + _CLOCK,
+    re.IGNORECASE,
+)
+
 
 def parse_any_date(raw: str | None, default_tz=WARSAW) -> Optional[datetime]:
     """
@@ -31,19 +83,133 @@ def parse_any_date(raw: str | None, default_tz=WARSAW) -> Optional[datetime]:
     "October 14, 2024") and returns a timezone-aware datetime object.
     If no time is provided in the input, sets the time to 00:00:00
     in the given timezone.
+
+    Absolute dates in common formats are parsed by precompiled patterns and
+    memoized; everything else goes to dateparser (pl/en only).
     """
 
     if not raw:
         return None
 
-    settings = {
-        "TIMEZONE": str(default_tz),
-        "RETURN_AS_TIMEZONE_AWARE": True,
-        "PREFER_DATES_FROM": "past",
-        "DATE_ORDER": "DMY",
-    }
+    tz_key = str(default_tz)
+
+    # Relative or year-less strings depend on the current time, so their
+    # results must not be cached.
+    if (
+        YEAR_PATTERN.search(raw)
+        and not RELATIVE_PATTERN.search(raw)
+        and not YESTERDAY_PATTERN.search(raw)
+    ):
+        return _parse_absolute(raw, tz_key)
+
+    return _parse_with_dateparser(raw, tz_key)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_absolute(raw: str, tz_key: str) -> Optional[datetime]:
+    dt = parse_fast(raw, tz_key)
+    if dt is not None:
+        return dt
+    return _parse_with_dateparser(raw, tz_key)
+
+
+def parse_fast(raw: str, tz_key: str = str(WARSAW)) -> Optional[datetime]:
+    """
+    Fast path for ISO-8601 and the Polish/English day-month-year formats
+    seen on our domains. Returns None when the string is not in one of
+    those formats (or is not a valid date).
+    """
+
+    text = raw.strip()
+    try:
+        if m := ISO_PATTERN.fullmatch(text):
+            return _from_iso(m, tz_key)
+
+        if m := NUMERIC_DMY_PATTERN.fullmatch(text):
+            day, month, year, hh, mm, ss = m.groups()
+            return _local(tz_key, year, month, day, hh, mm, ss)
+
+        if m := TEXT_DMY_PATTERN.fullmatch(text):
+            day, month_name, year, hh, mm, ss = m.groups()
+            return _local(tz_key, year, MONTHS[month_name.lower()], day, hh, mm, ss)
+
+        if m := TEXT_MDY_PATTERN.fullmatch(text):
+            month_name, day, year, hh, mm, ss = m.groups()
+            return _local(tz_key, year, MONTHS[month_name.lower()], day, hh, mm, ss)
+    except ValueError:
+        return None
+
+    return None
+
+
+def _local(tz_key, year, month, day, hh, mm, ss) -> datetime:
+    dt = datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hh or 0),
+        int(mm or 0),
+        int(ss or 0),
+        tzinfo=_zone(tz_key),
+    )
+    return dt.astimezone(WARSAW)
+
+
+def _from_iso(m: re.Match, tz_key: str) -> datetime:
+    year, month, day, hh, mm, ss, frac, offset = m.groups()
+    micro = int(frac.ljust(6, "0")) if frac else 0
+
+    if offset is None:
+        tz = _zone(tz_key)
+    elif offset.upper() == "Z":
+        tz = timezone.utc
+    else:
+        sign = -1 if offset[0] == "-" else 1
+        digits = offset[1:].replace(":", "")
+        tz = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+    dt = datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hh or 0),
+        int(mm or 0),
+        int(ss or 0),
+        micro,
+        tzinfo=tz,
+    )
+    return dt.astimezone(WARSAW)
+
+
+@lru_cache(maxsize=None)
+def _zone(tz_key: str) -> ZoneInfo:
+    return ZoneInfo(tz_key)
+
+
+@lru_cache(maxsize=None)
+def _date_parser(tz_key: str):
+    # dateparser is slow to import and to build; done once per timezone.
+    from dateparser.date import DateDataParser
+
+    return DateDataParser(
+        languages=["pl", "en"],
+        settings={
+            "TIMEZONE": tz_key,
+            "RETURN_AS_TIMEZONE_AWARE": True,
+            "PREFER_DATES_FROM": "past",
+            "DATE_ORDER": "DMY",
+        },
+    )
+
+
+def warm_up_date_parser(default_tz=WARSAW) -> None:
+    """Builds the dateparser fallback ahead of the first article."""
+
+    _date_parser(str(default_tz)).get_date_data("1 stycznia 2000")
+
 
-    dt = dateparser.parse(raw, settings=settings)
+def _parse_with_dateparser(raw: str, tz_key: str) -> Optional[datetime]:
+    dt = _date_parser(tz_key).get_date_data(raw).date_obj
 
     if dt is None:
         return None
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import gzip
+import io
+import logging
+from dataclasses import dataclass
+from typing import Iterator, Optional
+from urllib.parse import urljoin
+from xml.etree import ElementTree
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+
+from .politeness import get_scheduler
+from .static_fetch import http_session
+
+
+logger = logging.getLogger(__name__)
+
+# Guards against sitemap indexes that point at each other.
+MAX_SITEMAPS = 1000
+
+
+@dataclass(frozen=True)
+class Sitemap:
+    """
+    XML sitemap or sitemap index (plain or gzipped). Nested sitemaps are
+    followed; URLs are yielded while the document is parsed.
+    """
+
+    url: str
+    priority: int = 0
+    source = "sitemap"
+
+    def discover(self) -> Iterator[str]:
+        pending, seen = [self.url], {self.url}
+        while pending and len(seen) <= MAX_SITEMAPS:
+            content = fetch(pending.pop())
+            if content is None:
+                continue
+
+            for kind, loc in _sitemap_locs(content):
+                if kind == "url":
+                    yield loc
+                elif loc not in seen:
+                    seen.add(loc)
+                    pending.append(loc)
+
+
+@dataclass(frozen=True)
+class Feed:
+    """RSS 2.0 or Atom feed; yields the links of its items."""
+
+    url: str
+    priority: int = 10
+    source = "feed"
+
+    def discover(self) -> Iterator[str]:
+        content = fetch(self.url)
+        if content is None:
+            return
+
+        try:
+            root = ElementTree.fromstring(content)
+        except ElementTree.ParseError as e:
+            logger.error("%s → niepoprawny kanał: %s", self.url, e)
+            return
+
+        for item in root.iter():
+            tag = _local(item.tag)
+            if tag == "item":
+                for child in item:
+                    if _local(child.tag) == "link" and child.text:
+                        yield child.text.strip()
+            elif tag == "entry":
+                for child in item:
+                    if _local(child.tag) == "link" and child.get("rel") in (
+                        None,
+                        "alternate",
+                    ):
+                        yield child.get("href", "").strip()
+
+
+@dataclass(frozen=True)
+class Listing:
+    """HTML listing page (category, archive); yields links matching `links`."""
+
+    url: str
+    links: str = "article a[href]"
+    priority: int = 5
+    source = "listing"
+
+    def discover(self) -> Iterator[str]:
+        content = fetch(self.url)
+        if content is None:
+            return
+
+        soup = BeautifulSoup(content, "html.parser")
+        for a in soup.select(self.links):
+            yield urljoin(self.url, a["href"])
+
+
+def fetch(url: str) -> Optional[bytes]:
+    try:
+        with get_scheduler().request(url) as request:
+            response = http_session.get(url, timeout=settings.SCRAPER_HTTP_TIMEOUT)
+            request.observe(response.status_code, response.headers)
+    except requests.RequestException as e:
+        logger.error("%s → pobieranie nieudane: %s", url, e)
+        return None
+
+    if response.status_code >= 400:
+        logger.error(f"{url} → BŁĄD HTTP {response.status_code}")
+        return None
+
+    content = response.content
+    # *.xml.gz files are served as is, not with Content-Encoding: gzip.
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+    return content
+
+
+def _sitemap_locs(content: bytes) -> Iterator[tuple[str, str]]:
+    """
+    ("url", loc) for pages and ("sitemap", loc) for nested sitemaps.
+    Parsed incrementally; finished elements are dropped right away, so a
+    50k-URL sitemap is never held as a tree.
+    """
+
+    root = None
+    try:
+        for event, elem in ElementTree.iterparse(
+            io.BytesIO(content), events=("start", "end")
+        ):
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+
+            tag = _local(elem.tag)
+            if tag == "loc" and elem.text:
+                kind = "sitemap" if _local(root.tag) == "sitemapindex" else "url"
+                yield kind, elem.text.strip()
+            elif tag in ("url", "sitemap"):
+                root.clear()
+    except ElementTree.ParseError as e:
+        logger.error("Niepoprawna mapa strony: %s", e)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
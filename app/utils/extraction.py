@@ -0,0 +1,127 @@
+from __future__ import annotations
+import json
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional
+
+from bs4 import BeautifulSoup
+
+from .html_text import html_to_text
+
+
+TEXT = "text"  # textContent
+HTML = "html"  # innerHTML
+INNER_TEXT = "inner_text"  # rendered text (innerText), derived from the HTML
+
+_JS_READERS = {
+    TEXT: "textContent",
+    HTML: "innerHTML",
+    # Converted by `html_to_text`; `innerText` would make Chromium lay out.
+    INNER_TEXT: "innerHTML",
+}
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    selector: str
+    mode: str = TEXT
+
+
+@dataclass(frozen=True)
+class ExtractionSpec:
+    """
+    Declarative field → selector mapping. Every field takes the first
+    element matching its selector. The same spec runs in the browser as a
+    single `page.evaluate` call (`script`) and on static HTML via
+    BeautifulSoup (`extract_from_html`).
+
+    INNER_TEXT fields are derived from the HTML of their element by
+    `derive_text`; when the spec reads that HTML anyway, the browser does
+    not send it twice.
+    """
+
+    fields: tuple[tuple[str, FieldSpec], ...]
+
+    @cached_property
+    def text_sources(self) -> dict[str, str]:
+        """INNER_TEXT field → the field whose HTML it is derived from."""
+
+        html_fields = {}
+        for name, f in self.fields:
+            if f.mode == HTML:
+                html_fields.setdefault(f.selector, name)
+        return {
+            name: html_fields.get(f.selector, name)
+            for name, f in self.fields
+            if f.mode == INNER_TEXT
+        }
+
+    @cached_property
+    def read_fields(self) -> tuple[tuple[str, FieldSpec], ...]:
+        """The fields read from the page; the rest is derived."""
+
+        return tuple(
+            (name, f)
+            for name, f in self.fields
+            if self.text_sources.get(name, name) == name
+        )
+
+    @cached_property
+    def script(self) -> str:
+        fields = self.read_fields
+        selectors = list(dict.fromkeys(f.selector for _, f in fields))
+        lookups = ", ".join(
+            f"e{idx} = q({json.dumps(sel)})" for idx, sel in enumerate(selectors)
+        )
+        values = ", ".join(
+            "{}: e{idx} ? e{idx}.{reader} : null".format(
+                json.dumps(name),
+                idx=selectors.index(f.selector),
+                reader=_JS_READERS[f.mode],
+            )
+            for name, f in fields
+        )
+        return (
+            "() => { const q = (s) => document.querySelector(s); "
+            f"const {lookups}; return {{{values}}}; }}"
+        )
+
+    def extract_from_soup(self, soup: BeautifulSoup) -> dict[str, Optional[str]]:
+        elements = {}
+        result = {}
+        for name, f in self.read_fields:
+            if f.selector not in elements:
+                elements[f.selector] = soup.select_one(f.selector)
+            el = elements[f.selector]
+
+            if el is None:
+                result[name] = None
+            elif f.mode in (HTML, INNER_TEXT):
+                result[name] = el.decode_contents()
+            else:
+                result[name] = el.get_text()
+        return self.derive_text(result)
+
+    def extract_from_html(self, html: str) -> dict[str, Optional[str]]:
+        return self.extract_from_soup(BeautifulSoup(html, "html.parser"))
+
+    def derive_text(self, values: dict[str, Optional[str]]) -> dict:
+        """Fills the INNER_TEXT fields of extracted `values` in place."""
+
+        for name, source in self.text_sources.items():
+            html = values.get(source)
+            values[name] = None if html is None else html_to_text(html)
+        return values
+
+
+def article_spec(title: str, content: str, published: str) -> ExtractionSpec:
+    """Spec producing the raw fields expected by `MainScraper.build_article`."""
+
+    return ExtractionSpec(
+        fields=(
+            ("title", FieldSpec(title, TEXT)),
+            ("content_html", FieldSpec(content, HTML)),
+            ("content_text", FieldSpec(content, INNER_TEXT)),
+            ("datetime_raw", FieldSpec(published, TEXT)),
+        )
+    )
@@ -0,0 +1,129 @@
+from __future__ import annotations
+import logging
+import math
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from django.utils import timezone
+
+from app.models import FrontierURL, ScrapeFailure, domain_from_url
+from .resilience import OTHER, CircuitOpen, as_scrape_error
+from .scraper_factory import SCRAPER_REGISTRY, host_matches
+
+
+logger = logging.getLogger(__name__)
+
+
+def discover(domains: Optional[Iterable[str]] = None) -> dict[str, int]:
+    """
+    Runs the discovery sources of the registered scrapers (all, or those
+    of `domains`) and enqueues the article URLs they find. Returns the
+    number of new URLs per domain.
+    """
+
+    wanted = set(domains) if domains is not None else None
+    added: dict[str, int] = {}
+    for domain, klass in SCRAPER_REGISTRY.items():
+        if wanted is not None and domain not in wanted:
+            continue
+
+        scraper = klass()
+        added[domain] = 0
+        for source in klass.discovery:
+            urls = (
+                url
+                for url in source.discover()
+                if host_matches((urlparse(url).hostname or "").lower(), domain)
+                and scraper.is_article_url(url)
+            )
+            count = FrontierURL.enqueue(
+                urls, source=source.source, priority=source.priority
+            )
+            logger.info("%s → %d nowych adresów (%s)", source.url, count, domain)
+            added[domain] += count
+    return added
+
+
+class FrontierRecorder:
+    """
+    Collects the outcome of drained URLs and writes it to the frontier in
+    bulk, failures also as ScrapeFailure rows. `done` / `failed` /
+    `deferred` only buffer, so they may be called from the event loop;
+    `flush` touches the database.
+    """
+
+    def __init__(self, batch_size: int = 100, worker: Optional[str] = None):
+        self.batch_size = batch_size
+        self.worker = worker
+        self._done: list[str] = []
+        self._failed: list[tuple[str, object]] = []
+        self._deferred: list[tuple[str, CircuitOpen]] = []
+        self._lock = threading.Lock()
+
+    def done(self, url: str) -> None:
+        with self._lock:
+            self._done.append(url)
+
+    def failed(self, url: str, error) -> None:
+        with self._lock:
+            self._failed.append((url, error))
+
+    def deferred(self, url: str, error: CircuitOpen) -> None:
+        with self._lock:
+            self._deferred.append((url, error))
+
+    def maybe_flush(self) -> None:
+        pending = len(self._done) + len(self._failed) + len(self._deferred)
+        if pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            done, self._done = self._done, []
+            failed, self._failed = self._failed, []
+            deferred, self._deferred = self._deferred, []
+
+        if done:
+            FrontierURL.mark_done(done, worker=self.worker)
+        for url, error in failed:
+            FrontierURL.mark_failed(url, error, worker=self.worker)
+        if failed:
+            ScrapeFailure.objects.bulk_create(
+                [_failure(url, error) for url, error in failed]
+            )
+        self._defer(deferred)
+
+    def _defer(self, deferred: list[tuple[str, CircuitOpen]]) -> None:
+        # One update per host and retry time rather than per URL: a host
+        # that is down may short-circuit thousands of them.
+        groups: dict[tuple[str, int], list[str]] = defaultdict(list)
+        for url, error in deferred:
+            groups[(error.host, math.ceil(error.retry_in))].append(url)
+
+        now = timezone.now()
+        for (host, retry_in), urls in groups.items():
+            FrontierURL.defer(
+                urls,
+                now + timedelta(seconds=retry_in),
+                reason=f"{host} niedostępny (obwód otwarty)",
+                worker=self.worker,
+            )
+
+
+def _failure(url: str, error) -> ScrapeFailure:
+    if isinstance(error, BaseException):
+        error = as_scrape_error(error)
+        kind, status, attempts = error.kind, error.status, error.attempts
+    else:
+        kind, status, attempts = OTHER, None, 1
+    return ScrapeFailure(
+        url=url,
+        domain=domain_from_url(url),
+        kind=kind,
+        status_code=status,
+        attempts=attempts,
+        error=str(error)[:1000],
+    )
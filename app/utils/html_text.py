@@ -0,0 +1,223 @@
+"""
+HTML → plain text with the semantics of `HTMLElement.innerText`, so the
+text of an article can be derived from its HTML without asking the
+browser to lay the page out.
+
+The rendering is approximated from the default (user agent) stylesheet:
+block elements start and end a line, `<p>` is set apart by an empty line,
+`<br>` breaks the line, table cells are separated by tabs, whitespace
+collapses outside `<pre>`, and elements that are not rendered (`<script>`,
+`<template>`, `hidden`, inline `display: none`, ...) give no text.
+Author CSS is not known here and is ignored.
+"""
+
+from __future__ import annotations
+import re
+from html import unescape
+
+
+BLOCK_ELEMENTS = frozenset(
+    (
+        "address article aside blockquote body caption center dd details "
+        "dialog dir div dl dt fieldset figcaption figure footer form h1 h2 h3 "
+        "h4 h5 h6 header hgroup hr html legend li listing main menu nav ol "
+        "optgroup option p plaintext pre search section summary table tr ul xmp"
+    ).split()
+)
+PREFORMATTED_ELEMENTS = frozenset(("pre", "listing", "xmp", "plaintext"))
+CELL_ELEMENTS = frozenset(("td", "th"))
+# Content parsed as raw text (not markup) and never rendered.
+RAW_TEXT_ELEMENTS = frozenset(
+    ("script", "style", "template", "noscript", "noembed", "noframes")
+    + ("iframe", "textarea", "title")
+)
+NOT_RENDERED_ELEMENTS = frozenset(
+    ("head", "datalist", "select", "object", "video", "audio", "canvas", "svg")
+    + ("math", "map", "rp", "area", "base", "link", "meta")
+)
+VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input link meta source track wbr".split()
+)
+
+_TAG = r"<(/?)([a-zA-Z][^\s/>]*)([^>\"']*(?:(?:\"[^\"]*\"|'[^']*')[^>\"']*)*)>"
+# Text, a tag, a comment / doctype / processing instruction, or a stray "<".
+_TOKEN = re.compile(
+    rf"([^<]+)|{_TAG}|<!--.*?(?:-->|\Z)|<[!?][^>]*>|<",
+    re.S,
+)
+_ANY_TAG = re.compile(_TAG)
+_WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+_QUOTED = re.compile(r"\"[^\"]*\"|'[^']*'")
+_HIDDEN_ATTR = re.compile(r"(?:^|\s)hidden(?=[\s=/]|$)", re.I)
+_STYLE_ATTR = re.compile(r"\bstyle\s*=\s*(\"[^\"]*\"|'[^']*')", re.I)
+_DISPLAY_NONE = re.compile(r"display\s*:\s*none", re.I)
+_RAW_TEXT_END: dict[str, re.Pattern] = {}
+
+
+def html_to_text(html: str) -> str:
+    """The `innerText` of an element whose `innerHTML` is `html`."""
+
+    if not html:
+        return ""
+    return _TextBuilder().feed(html)
+
+
+def _raw_text_end(name: str) -> re.Pattern:
+    pattern = _RAW_TEXT_END.get(name)
+    if pattern is None:
+        pattern = _RAW_TEXT_END[name] = re.compile(rf"</{name}\s*>", re.I)
+    return pattern
+
+
+def _is_hidden(attrs: str) -> bool:
+    lowered = attrs.lower()
+    if "hidden" not in lowered and "none" not in lowered:
+        return False
+    style = _STYLE_ATTR.search(attrs)
+    if style and _DISPLAY_NONE.search(style.group(1)):
+        return True
+    return _HIDDEN_ATTR.search(_QUOTED.sub("", attrs)) is not None
+
+
+class _TextBuilder:
+    """
+    Collects text items and required line break counts (ints), following
+    the "rendered text collection steps" of the HTML spec; `_join` turns
+    them into the final string.
+    """
+
+    def __init__(self):
+        self.items: list = []
+        self.pre_depth = 0
+        self.skip_first_newline = False
+        # Whitespace is emitted lazily, so none ends up at a line end.
+        self.pending_space = False
+        self.at_line_start = True
+        # Cells seen in the current table row (a tab goes before each next).
+        self.cells: list[int] = []
+
+    def feed(self, html: str) -> str:
+        pos = 0
+        length = len(html)
+        match_token = _TOKEN.match
+        while pos < length:
+            match = match_token(html, pos)
+            pos = match.end()
+            text, closing, name, attrs = match.groups()
+            if text is not None:
+                self.text(text)
+                continue
+            if name is None:
+                if match.group() == "<":
+                    self.text("<")
+                continue  # comment, doctype, processing instruction
+
+            name = name.lower()
+            if closing:
+                self.end(name)
+            elif name in RAW_TEXT_ELEMENTS:
+                end = _raw_text_end(name).search(html, pos)
+                pos = end.end() if end else length
+            elif name in NOT_RENDERED_ELEMENTS or (attrs and _is_hidden(attrs)):
+                if name not in VOID_ELEMENTS and not attrs.endswith("/"):
+                    pos = self._skip_element(html, pos, name)
+            else:
+                self.start(name)
+        return self._join()
+
+    def _skip_element(self, html: str, pos: int, name: str) -> int:
+        """Position after the end tag closing the element `name` opened."""
+
+        depth = 1
+        for match in _ANY_TAG.finditer(html, pos):
+            if match.group(2).lower() == name:
+                depth += -1 if match.group(1) else 1
+                if depth == 0:
+                    return match.end()
+        return len(html)
+
+    def start(self, name: str) -> None:
+        if name == "br":
+            self.line_break()
+        elif name in CELL_ELEMENTS:
+            if self.cells:
+                if self.cells[-1]:
+                    self.pending_space = False
+                    self.items.append("\t")
+                    # Cell content starts its own line box.
+                    self.at_line_start = True
+                self.cells[-1] += 1
+        elif name in BLOCK_ELEMENTS:
+            self.block_boundary(2 if name == "p" else 1)
+            if name == "tr":
+                self.cells.append(0)
+            if name in PREFORMATTED_ELEMENTS:
+                self.pre_depth += 1
+                self.skip_first_newline = True
+
+    def end(self, name: str) -> None:
+        if name in BLOCK_ELEMENTS:
+            self.block_boundary(2 if name == "p" else 1)
+            if name == "tr" and self.cells:
+                self.cells.pop()
+            if name in PREFORMATTED_ELEMENTS and self.pre_depth:
+                self.pre_depth -= 1
+        elif name == "br":
+            # `</br>` is parsed as `<br>`.
+            self.line_break()
+
+    def text(self, raw: str) -> None:
+        if not self.pre_depth and not raw.strip(" \t\n\r\f"):
+            self.pending_space = True
+            return
+        data = unescape(raw) if "&" in raw else raw
+        if self.pre_depth:
+            if "\r" in data:
+                # Newlines are normalized by the HTML parser.
+                data = data.replace("\r\n", "\n").replace("\r", "\n")
+            if self.skip_first_newline and data.startswith("\n"):
+                data = data[1:]
+            self.skip_first_newline = False
+            if data:
+                self._emit(data)
+                self.at_line_start = data.endswith("\n")
+            return
+
+        self.skip_first_newline = False
+        data = _WHITESPACE.sub(" ", data)
+        if data.startswith(" "):
+            self.pending_space = True
+        words = data.strip(" ")
+        if words:
+            self._emit(words)
+            self.pending_space = data.endswith(" ")
+
+    def _emit(self, text: str) -> None:
+        if self.pending_space and not self.at_line_start:
+            self.items.append(" ")
+        self.pending_space = False
+        self.items.append(text)
+        self.at_line_start = False
+
+    def line_break(self) -> None:
+        self.pending_space = False
+        self.items.append("\n")
+        self.at_line_start = True
+
+    def block_boundary(self, count: int) -> None:
+        self.pending_space = False
+        self.items.append(count)
+        self.at_line_start = True
+
+    def _join(self) -> str:
+        parts = []
+        breaks = 0
+        for item in self.items:
+            if isinstance(item, int):
+                breaks = max(breaks, item)
+            elif item:
+                if breaks and parts:
+                    parts.append("\n" * breaks)
+                breaks = 0
+                parts.append(item)
+        return "".join(parts)
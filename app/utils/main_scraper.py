@@ -1,80 +1,341 @@
 from __future__ import annotations
+import asyncio
 import logging
+import re
+import time
+from contextlib import contextmanager
 from http.client import responses
 
 from typing import Optional
-from abc import ABC, abstractmethod
+from abc import ABC
+from urllib.parse import urlparse
 
-from playwright.sync_api import sync_playwright, Page, Playwright
+from django.conf import settings
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 import nest_asyncio
+import requests
 
+from .browser_pool import get_browser_pool
 from .date_utils import parse_any_date
+from .extraction import ExtractionSpec
+from .metrics import BLOCKED, BLOCKED_BYTES, BYTES, PHASE_SECONDS, get_metrics
+from .politeness import get_scheduler
+from .resilience import (
+    CONNECT,
+    DNS,
+    SELECTOR_TIMEOUT,
+    ScrapeError,
+    classify,
+    http_error,
+)
+from .resource_blocking import (
+    BlockingSession,
+    BlockingStats,
+    DEFAULT_BLOCKED_HOSTS,
+    ResourceBlocker,
+)
+from .snapshots import get_snapshot_store
+from .static_fetch import http_session, static_fetch_stats
 
 
 logger = logging.getLogger(__name__)
 
+READY_SELECTORS = [
+    "article",
+    "div.article-content",
+    ".post-text-two-red",
+]
+
+# Statuses of the plain HTTP fetch the browser would get too: the page is
+# gone, or the server is throttling / failing.
+STATIC_FINAL_STATUSES = (404, 410, 429)
+
+
+MISSING_FIELD_WARNINGS = {
+    "title": "Błąd przy pobieraniu tytułu",
+    "content_html": "Błąd przy pobieraniu html artykułu",
+    "content_text": "Błąd przy pobieraniu plain text artykułu",
+    "datetime_raw": "Błąd przy pobieraniu daty",
+}
+
 
 class MainScraper(ABC):
+    # Field selectors of the domain, see `extraction.article_spec`.
+    spec: ExtractionSpec
+    # URL path prefixes whose articles are rendered client-side only.
+    js_only_paths: tuple[str, ...] = ()
+    # Where new article URLs are found (`discovery.Sitemap`, `Feed`,
+    # `Listing`), and which discovered paths are articles.
+    discovery: tuple = ()
+    article_path_pattern: Optional[str] = None
+    # Per-domain exceptions to the default subresource blocking.
+    allowed_resource_types: frozenset[str] = frozenset()
+    allowed_hosts: tuple[str, ...] = ()
+    last_blocking_stats: Optional[BlockingStats] = None
+
     def extract_article(self, url: str) -> Optional[dict]:
 
+        if self.use_static_first(url):
+            raw = self.fetch_static_raw(url)
+            if raw is not None:
+                return self.build_article(url, **raw)
+
+        return self.build_article(url, **self.extract_raw_with_browser(url))
+
+    def extract_raw_with_browser(self, url: str) -> dict:
+        """Renders `url` in the browser pool and returns the raw fields."""
+
         nest_asyncio.apply()
-        playwright = None
-        page = None
 
+        with self._browser_page(url) as page:
+            blocker = self.resource_blocker()
+            blocking = blocker.install(page) if blocker else None
+            try:
+                self.fetch_page(url, page)
+                if get_snapshot_store() is not None:
+                    self.save_snapshot(url, page.content())
+                with get_metrics().span("extract", url):
+                    return self.extract_fields(page)
+            finally:
+                self._finish_blocking(url, blocking)
+
+    @contextmanager
+    def _browser_page(self, url: str):
+        # The "browser" phase is the wait for a page of the pool, browser
+        # launch and context recycling included.
+        started = time.perf_counter()
+        with get_browser_pool().page() as page:
+            get_metrics().observe(
+                PHASE_SECONDS, time.perf_counter() - started, url=url, phase="browser"
+            )
+            yield page
+
+    def extract_fields(self, page: Page) -> dict:
+        raw = self.spec.derive_text(page.evaluate(self.spec.script))
+        self._warn_missing(raw)
+        return raw
+
+    def use_static_first(self, url: str) -> bool:
+        if not settings.SCRAPER_STATIC_FAST_PATH or self.needs_browser(url):
+            return False
+
+        domain = (urlparse(url).hostname or "").lower()
+        return static_fetch_stats.prefer_static(domain)
+
+    def needs_browser(self, url: str) -> bool:
+        return urlparse(url).path.startswith(self.js_only_paths)
+
+    def is_article_url(self, url: str) -> bool:
+        if self.article_path_pattern is None:
+            return True
+        return re.fullmatch(self.article_path_pattern, urlparse(url).path) is not None
+
+    def fetch_static_raw(self, url: str) -> Optional[dict]:
+        """
+        Fetches `url` with a plain HTTP request and applies the scraper's
+        selectors to the served HTML. Returns the raw fields (same shape as
+        `extract_raw_async`) or None when the page needs the browser.
+        """
+
+        domain = (urlparse(url).hostname or "").lower()
+        metrics = get_metrics()
         try:
-            playwright, page = self.fetch_page(url)
-            title = self._extract_title(page)
-            content_html = self._extract_content_html(page)
-            content_plain_text = self._extract_content_plain_text(page)
-            datetime_raw = self._extract_published(page)
-            published_at = parse_any_date(datetime_raw)
+            with get_scheduler().request(url) as request:
+                with metrics.span("static_fetch", url):
+                    response = http_session.get(
+                        url, timeout=settings.SCRAPER_HTTP_TIMEOUT
+                    )
+                request.observe(response.status_code, response.headers)
+        except requests.RequestException as e:
+            if classify(e) in (DNS, CONNECT):
+                # The browser would not get through either.
+                raise
+            logger.info("%s → pobranie bez przeglądarki nieudane: %s", url, e)
+            static_fetch_stats.record(domain, hit=False)
+            return None
+
+        status = response.status_code
+        if status >= 400:
+            logger.error(f"{url} → BŁĄD HTTP {status}")
+            if status >= 500 or status in STATIC_FINAL_STATUSES:
+                raise http_error(status)
+            static_fetch_stats.record(domain, hit=False)
+            return None
+
+        metrics.count(BYTES, len(response.content), url=url, source="http")
+        with metrics.span("extract", url):
+            raw = self.extract_static_fields(response.text)
+        static_fetch_stats.record(domain, hit=raw is not None)
+        if raw is not None:
+            # Otherwise the browser takes over and stores the rendered DOM.
+            self.save_snapshot(url, response.text)
+        return raw
+
+    def save_snapshot(self, url: str, html: str) -> None:
+        """Keeps the page for `reextract_articles` (see SCRAPER_SNAPSHOT_DIR)."""
+
+        store = get_snapshot_store()
+        if store is None:
+            return
+        try:
+            with get_metrics().span("snapshot", url):
+                store.save(url, html)
+        except OSError as e:
+            logger.error("%s → zapis zrzutu strony nieudany: %s", url, e)
+
+    def extract_static_fields(self, html: str) -> Optional[dict]:
+        """Raw fields from served HTML; None when any selector misses."""
+
+        raw = self.spec.extract_from_html(html)
+        if any(value is None for value in raw.values()):
+            return None
+        return raw
+
+    async def extract_raw_async(self, url: str, page: AsyncPage) -> dict:
+        """
+        Async counterpart of the browser part of `extract_article`:
+        navigates `page` and returns the raw fields for `build_article`.
+        """
+
+        blocker = self.resource_blocker()
+        blocking = await blocker.install_async(page) if blocker else None
+        try:
+            await self.fetch_page_async(url, page)
+            if get_snapshot_store() is not None:
+                html = await page.content()
+                await asyncio.to_thread(self.save_snapshot, url, html)
+            with get_metrics().span("extract", url):
+                raw = await page.evaluate(self.spec.script)
+                self.spec.derive_text(raw)
+            self._warn_missing(raw)
+            return raw
         finally:
-            if page:
-                page.context.browser.close()
-            if playwright:
-                playwright.stop()
+            self._finish_blocking(url, blocking)
+
+    def resource_blocker(self) -> Optional[ResourceBlocker]:
+        if not settings.SCRAPER_BLOCK_RESOURCES:
+            return None
+
+        return ResourceBlocker(
+            blocked_types=settings.SCRAPER_BLOCKED_RESOURCE_TYPES,
+            blocked_hosts=DEFAULT_BLOCKED_HOSTS + settings.SCRAPER_BLOCKED_HOSTS,
+            allowed_types=self.allowed_resource_types,
+            allowed_hosts=self.allowed_hosts,
+        )
 
+    def _finish_blocking(self, url: str, blocking: Optional[BlockingSession]) -> None:
+        if blocking is None:
+            return
+        blocking.uninstall()
+        blocking.log(url)
+        self.last_blocking_stats = stats = blocking.stats
+        metrics = get_metrics()
+        for resource_type, blocked in stats.blocked_by_type.items():
+            metrics.count(BLOCKED, blocked, url=url, resource_type=resource_type)
+            metrics.count(
+                BLOCKED_BYTES,
+                stats.saved_bytes_by_type[resource_type],
+                url=url,
+                resource_type=resource_type,
+            )
+
+    def build_article(
+        self,
+        url: str,
+        title: Optional[str],
+        content_html: Optional[str],
+        content_text: Optional[str],
+        datetime_raw: Optional[str],
+    ) -> dict:
+        with get_metrics().span("parse_date", url):
+            published_at = parse_any_date(datetime_raw)
         return {
             "title": title,
             "content_html": content_html,
-            "content_text": content_plain_text,
+            "content_text": content_text,
             "source_url": url,
             "published_at": published_at,
         }
 
-    def fetch_page(self, url: str) -> tuple[Playwright, Page]:
-        p = sync_playwright().start()
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        response = page.goto(url, timeout=40000, wait_until="domcontentloaded")
+    def fetch_page(self, url: str, page: Page) -> Page:
+        metrics = get_metrics()
+        with get_scheduler().request(url) as request:
+            with metrics.span("goto", url):
+                response = page.goto(
+                    url,
+                    timeout=settings.SCRAPER_NAVIGATION_TIMEOUT * 1000,
+                    wait_until="domcontentloaded",
+                )
+            self._observe(request, response)
 
+        self._check_response(url, response)
+        try:
+            with metrics.span("wait_selector", url):
+                page.wait_for_selector(
+                    ", ".join(READY_SELECTORS),
+                    timeout=settings.SCRAPER_SELECTOR_TIMEOUT * 1000,
+                )
+        except PlaywrightTimeoutError as e:
+            raise self._selector_timeout() from e
+        return page
+
+    async def fetch_page_async(self, url: str, page: AsyncPage) -> AsyncPage:
+        metrics = get_metrics()
+        async with get_scheduler().request_async(url) as request:
+            with metrics.span("goto", url):
+                response = await page.goto(
+                    url,
+                    timeout=settings.SCRAPER_NAVIGATION_TIMEOUT * 1000,
+                    wait_until="domcontentloaded",
+                )
+            self._observe(request, response)
+        self._check_response(url, response)
+        try:
+            with metrics.span("wait_selector", url):
+                await page.wait_for_selector(
+                    ", ".join(READY_SELECTORS),
+                    timeout=settings.SCRAPER_SELECTOR_TIMEOUT * 1000,
+                )
+        except PlaywrightTimeoutError as e:
+            raise self._selector_timeout() from e
+        return page
+
+    def _observe(self, request, response) -> None:
+        if response is None:
+            request.observe(None)
+        else:
+            request.observe(response.status, response.headers)
+
+    def _check_response(self, url: str, response) -> None:
+        # An error page has no article to wait for.
         if response is None:
             logger.error(f"{url} → brak odpowiedzi od serwera")
         else:
+            self._count_document_bytes(url, response)
             status = response.status
             if status >= 400:
                 logger.error(f"{url} → BŁĄD HTTP {status}")
+                raise http_error(status)
+
+    def _count_document_bytes(self, url: str, response) -> None:
+        # Only the document, and only when the server sends its length:
+        # reading the body back from the browser would cost a round trip.
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except (TypeError, ValueError):
+            return
+        if size:
+            get_metrics().count(BYTES, size, url=url, source="browser")
+
+    def _selector_timeout(self) -> ScrapeError:
+        return ScrapeError(
+            SELECTOR_TIMEOUT,
+            f"Brak treści artykułu po {settings.SCRAPER_SELECTOR_TIMEOUT:g} s",
+        )
 
-        selectors = [
-            "article",
-            "div.article-content",
-            ".post-text-two-red",
-        ]
-        page.wait_for_selector(", ".join(selectors), timeout=30000)
-        return (p, page)
-
-    @abstractmethod
-    def _extract_title(self, page: Page) -> Optional[str]:
-        raise NotImplementedError
-
-    @abstractmethod
-    def _extract_content_html(self, page: Page) -> Optional[str]:
-        raise NotImplementedError
-
-    @abstractmethod
-    def _extract_content_plain_text(self, page: Page) -> Optional[str]:
-        raise NotImplementedError
-
-    @abstractmethod
-    def _extract_published(self, page: Page) -> Optional[str]:
-        raise NotImplementedError
+    def _warn_missing(self, raw: dict) -> None:
+        for name, message in MISSING_FIELD_WARNINGS.items():
+            if not raw.get(name):
+                logger.warning(message)
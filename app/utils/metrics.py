@@ -0,0 +1,286 @@
+from __future__ import annotations
+import bisect
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+from app.models import ScrapeMetric
+from .resilience import OTHER, classify
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+PHASE_SECONDS = "scrape_phase_seconds"
+DB_WRITE_SECONDS = "scrape_db_write_seconds"
+PAGES = "scrape_pages_total"
+FAILURES = "scrape_failures_total"
+BYTES = "scrape_bytes_total"
+BLOCKED = "scrape_blocked_requests_total"
+BLOCKED_BYTES = "scrape_blocked_bytes_total"
+
+# name → (type, help), in exposition order.
+FAMILIES = {
+    PHASE_SECONDS: ("histogram", "Duration of one scrape phase of a page."),
+    DB_WRITE_SECONDS: ("histogram", "Duration of one batched article upsert."),
+    PAGES: ("counter", "Pages processed, by outcome."),
+    FAILURES: ("counter", "Failed pages, by error kind."),
+    BYTES: ("counter", "HTML bytes fetched, by fetch path."),
+    BLOCKED: ("counter", "Subresource requests blocked, by resource type."),
+    BLOCKED_BYTES: (
+        "counter",
+        "Estimated bytes not downloaded thanks to blocking, by resource type.",
+    ),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class _Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    total: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> float:
+        """Estimate, interpolated within the bucket (as histogram_quantile)."""
+
+        rank = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[idx - 1] if idx else 0.0
+                upper = BUCKETS[idx] if idx < len(BUCKETS) else lower
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return 0.0
+
+
+class ScrapeMetrics:
+    """
+    In-process scrape metrics: latency histograms per phase and domain,
+    and counters of pages, failures, bytes and blocked subresources.
+
+    `flush` adds what changed since the previous flush to the ScrapeMetric
+    table, so the counters of all scraper processes (and machines) sum up
+    there and `/metrics` serves them. `summary` describes the current run.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.started = self.clock()
+        self._histograms: dict[tuple[str, Labels], _Histogram] = defaultdict(_Histogram)
+        self._counters: dict[tuple[str, Labels], float] = defaultdict(float)
+        self._flushed: dict[str, float] = {}
+        self._last_flush = time.monotonic()
+
+    def begin_run(self) -> None:
+        """Flushes what is left and starts a new run for `summary`."""
+
+        self.flush()
+        with self._lock:
+            self._reset()
+
+    @contextmanager
+    def span(self, phase: str, url: str):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(PHASE_SECONDS, self.clock() - started, phase=phase, url=url)
+
+    def observe(self, name: str, seconds: float, url: Optional[str] = None, **labels):
+        key = (name, _labels(url, labels))
+        with self._lock:
+            self._histograms[key].observe(seconds)
+
+    def count(self, name: str, value: float = 1, url: Optional[str] = None, **labels):
+        key = (name, _labels(url, labels))
+        with self._lock:
+            self._counters[key] += value
+
+    def outcome(self, kind: str, url: str, detail=None) -> None:
+        """Counts a processed page; `kind` as in async_pipeline (SAVED, ...)."""
+
+        self.count(PAGES, url=url, outcome=kind)
+        if kind == "failed":
+            error_kind = (
+                classify(detail) if isinstance(detail, BaseException) else OTHER
+            )
+            self.count(FAILURES, url=url, kind=error_kind)
+
+    def series(self) -> dict[str, float]:
+        """Current values in Prometheus exposition form: series → value."""
+
+        with self._lock:
+            histograms = [
+                (name, labels, list(h.counts), h.total)
+                for (name, labels), h in self._histograms.items()
+            ]
+            counters = list(self._counters.items())
+
+        result = {}
+        for (name, labels), value in counters:
+            result[_series(name, labels)] = value
+        for name, labels, counts, total in histograms:
+            cumulative = 0
+            for bound, n in zip((*BUCKETS, math.inf), counts):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                result[_series(f"{name}_bucket", (*labels, ("le", le)))] = cumulative
+            result[_series(f"{name}_sum", labels)] = total
+            result[_series(f"{name}_count", labels)] = cumulative
+        return result
+
+    def maybe_flush(self) -> None:
+        if (
+            time.monotonic() - self._last_flush
+            >= settings.SCRAPER_METRICS_FLUSH_INTERVAL
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            current = self.series()
+            deltas = {
+                series: value - self._flushed.get(series, 0)
+                for series, value in current.items()
+                if value != self._flushed.get(series, 0)
+            }
+            if not deltas:
+                return
+            try:
+                ScrapeMetric.add(deltas)
+            except Exception as e:
+                # Metrics must not stop a run; the deltas go with the next flush.
+                logger.error("Zapis metryk nieudany: %s", e)
+                return
+            self._flushed = current
+
+    def summary(self) -> dict:
+        """JSON-ready description of the run: rates, failures and phases."""
+
+        elapsed = max(self.clock() - self.started, 1e-9)
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+
+        pages: dict[str, int] = defaultdict(int)
+        failures: dict[str, int] = defaultdict(int)
+        fetched: dict[str, int] = defaultdict(int)
+        blocked: dict[str, int] = defaultdict(int)
+        blocked_bytes: dict[str, int] = defaultdict(int)
+        domains: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for (name, labels), value in counters:
+            labels = dict(labels)
+            if name == PAGES:
+                pages[labels["outcome"]] += int(value)
+                domains[labels["domain"]][labels["outcome"]] += int(value)
+            elif name == FAILURES:
+                failures[labels["kind"]] += int(value)
+            elif name == BYTES:
+                fetched[labels["source"]] += int(value)
+            elif name == BLOCKED:
+                blocked[labels["resource_type"]] += int(value)
+            elif name == BLOCKED_BYTES:
+                blocked_bytes[labels["resource_type"]] += int(value)
+
+        phases: dict[str, _Histogram] = defaultdict(_Histogram)
+        for (name, labels), histogram in histograms:
+            phase = dict(labels).get("phase", "db_write")
+            merged = phases[phase]
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.total += histogram.total
+
+        return {
+            "duration_s": round(elapsed, 3),
+            "pages": dict(pages),
+            "pages_per_sec": round(sum(pages.values()) / elapsed, 3),
+            "saved_per_sec": round(pages.get("saved", 0) / elapsed, 3),
+            "failures": dict(failures),
+            "bytes": dict(fetched),
+            "blocked_requests": dict(blocked),
+            "blocked_bytes": dict(blocked_bytes),
+            "phases": {
+                phase: {
+                    "count": h.count,
+                    "total_s": round(h.total, 3),
+                    "mean_ms": round(h.total / h.count * 1000, 1),
+                    "p50_ms": round(h.quantile(0.5) * 1000, 1),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 1),
+                }
+                for phase, h in sorted(phases.items())
+                if h.count
+            },
+            "domains": {domain: dict(counts) for domain, counts in domains.items()},
+        }
+
+
+def render_prometheus(series: dict[str, float]) -> str:
+    """Prometheus text exposition of `series` (as stored by ScrapeMetric)."""
+
+    by_family: dict[str, list[str]] = defaultdict(list)
+    for name in sorted(series):
+        family = name.split("{", 1)[0]
+        if family not in FAMILIES:
+            family = family.rsplit("_", 1)[0]
+        by_family[family].append(f"{name} {series[name]:g}")
+
+    lines = []
+    for family, (kind, help_text) in FAMILIES.items():
+        if family in by_family:
+            lines += [f"# HELP {family} {help_text}", f"# TYPE {family} {kind}"]
+            lines += by_family[family]
+    return "\n".join(lines) + "\n"
+
+
+def _labels(url: Optional[str], labels: dict) -> Labels:
+    if url is not None:
+        labels["domain"] = (urlparse(url).hostname or "").lower()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _series(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f"{name}{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_metrics: Optional[ScrapeMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> ScrapeMetrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = ScrapeMetrics()
+        return _metrics
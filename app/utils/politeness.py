@@ -0,0 +1,331 @@
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+from django.conf import settings
+
+from .static_fetch import USER_AGENT, http_session
+
+
+logger = logging.getLogger(__name__)
+
+# How often a waiter re-checks a domain whose request slots are all busy.
+SLOT_POLL_INTERVAL = 0.05
+# Upper bound for a Retry-After pause, so one bad header cannot stall a run.
+MAX_PAUSE = 300.0
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """`rate` tokens per second, at most `burst` stored. Not thread-safe."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 when one is)."""
+
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+@dataclass
+class _Domain:
+    bucket: TokenBucket
+    limit: float
+    active: int = 0
+    paused_until: float = 0.0
+    last_decrease: float = 0.0
+    crawl_delay: Optional[float] = None
+    robots_checked: bool = False
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+
+
+@dataclass
+class PoliteRequest:
+    """Handle of one request; report the response with `observe`."""
+
+    host: str
+    started: float
+    status: Optional[int] = None
+    retry_after: Optional[float] = None
+    observed: bool = field(default=False, repr=False)
+
+    def observe(self, status: Optional[int], headers=None) -> None:
+        self.status = status
+        self.observed = True
+        if status in THROTTLE_STATUSES and headers is not None:
+            self.retry_after = _retry_after(headers.get("retry-after"))
+
+
+class PolitenessScheduler:
+    """
+    Per-host request admission shared by all scrapers, sync and async.
+
+    A request to a host starts only when
+    - the host's token bucket has a token (`rate` per second, `burst`
+      stored; slower when robots.txt asks for a Crawl-delay),
+    - fewer than the host's current limit of requests are in flight,
+    - the host is not paused after a 429/503 with Retry-After.
+
+    The in-flight limit adapts AIMD-style between 1 and `max_concurrency`:
+    every fast, successful response adds 1/limit; a 429, a 5xx, a failed
+    request or a response slower than `target_latency` halves it, at most
+    once per observed latency.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1,
+        max_concurrency: int = 2,
+        target_latency: float = 5.0,
+        respect_robots: bool = True,
+        clock=time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.target_latency = target_latency
+        self.respect_robots = respect_robots
+        self.clock = clock
+        self._domains: dict[str, _Domain] = {}
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def request(self, url: str):
+        host = _host(url)
+        self._check_robots(url, host)
+        with self._cond:
+            while (wait := self._try_start(host)) > 0:
+                self._cond.wait(wait)
+
+        request = PoliteRequest(host, self.clock())
+        try:
+            yield request
+        finally:
+            self._finish(request)
+
+    @asynccontextmanager
+    async def request_async(self, url: str):
+        host = _host(url)
+        if not self._robots_checked(host):
+            await asyncio.to_thread(self._check_robots, url, host)
+        while True:
+            with self._cond:
+                wait = self._try_start(host)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+
+        request = PoliteRequest(host, self.clock())
+        try:
+            yield request
+        finally:
+            self._finish(request)
+
+    def wait_time(self, url: str) -> float:
+        """Seconds until a request to the host of `url` could start."""
+
+        with self._cond:
+            domain = self._domain(_host(url))
+            return self._wait_time(domain, self.clock())
+
+    def stats(self) -> dict[str, dict]:
+        with self._cond:
+            return {
+                host: {
+                    "limit": round(d.limit, 2),
+                    "active": d.active,
+                    "rate": round(d.bucket.rate, 3),
+                    "crawl_delay": d.crawl_delay,
+                    "requests": d.requests,
+                    "throttled": d.throttled,
+                    "errors": d.errors,
+                }
+                for host, d in self._domains.items()
+            }
+
+    def _domain(self, host: str) -> _Domain:
+        domain = self._domains.get(host)
+        if domain is None:
+            domain = self._domains[host] = _Domain(
+                bucket=TokenBucket(self.rate, self.burst, self.clock()),
+                limit=1.0,
+            )
+        return domain
+
+    def _wait_time(self, domain: _Domain, now: float) -> float:
+        if domain.active >= int(domain.limit):
+            return SLOT_POLL_INTERVAL
+        return max(domain.paused_until - now, domain.bucket.wait_time(now), 0.0)
+
+    def _try_start(self, host: str) -> float:
+        # Caller holds the lock.
+        domain = self._domain(host)
+        wait = self._wait_time(domain, self.clock())
+        if wait <= 0:
+            domain.bucket.take()
+            domain.active += 1
+            domain.requests += 1
+        return wait
+
+    def _finish(self, request: PoliteRequest) -> None:
+        now = self.clock()
+        latency = now - request.started
+        status = request.status
+
+        with self._cond:
+            domain = self._domain(request.host)
+            domain.active -= 1
+
+            if status in THROTTLE_STATUSES:
+                domain.throttled += 1
+                pause = request.retry_after or 1 / domain.bucket.rate
+                domain.paused_until = max(domain.paused_until, now + pause)
+            elif not request.observed or status is None or status >= 500:
+                domain.errors += 1
+
+            congested = (
+                status in THROTTLE_STATUSES
+                or not request.observed
+                or status is None
+                or status >= 500
+                or latency > self.target_latency
+            )
+            if congested:
+                if now - domain.last_decrease >= latency:
+                    domain.limit = max(1.0, domain.limit / 2)
+                    domain.last_decrease = now
+            elif status < 400:
+                domain.limit = min(
+                    float(self.max_concurrency), domain.limit + 1 / domain.limit
+                )
+            self._cond.notify_all()
+
+    def _robots_checked(self, host: str) -> bool:
+        with self._cond:
+            return not self.respect_robots or self._domain(host).robots_checked
+
+    def _check_robots(self, url: str, host: str) -> None:
+        if self._robots_checked(host):
+            return
+
+        delay = _robots_delay(f"{urlparse(url).scheme or 'https'}://{host}/robots.txt")
+        with self._cond:
+            domain = self._domain(host)
+            domain.robots_checked = True
+            if delay:
+                domain.crawl_delay = delay
+                domain.bucket.rate = min(domain.bucket.rate, 1 / delay)
+                domain.bucket.burst = 1.0
+                domain.bucket.tokens = min(domain.bucket.tokens, 1.0)
+                logger.info("%s → Crawl-delay %.1f s", host, delay)
+
+
+class _Unlimited:
+    """Stand-in used when SCRAPER_POLITENESS is off."""
+
+    @contextmanager
+    def request(self, url: str):
+        yield PoliteRequest(_host(url), 0.0)
+
+    @asynccontextmanager
+    async def request_async(self, url: str):
+        yield PoliteRequest(_host(url), 0.0)
+
+    def wait_time(self, url: str) -> float:
+        return 0.0
+
+    def stats(self) -> dict[str, dict]:
+        return {}
+
+
+_scheduler: Optional[PolitenessScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if not settings.SCRAPER_POLITENESS:
+        return _Unlimited()
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PolitenessScheduler(
+                rate=settings.SCRAPER_DOMAIN_RATE,
+                burst=settings.SCRAPER_DOMAIN_BURST,
+                max_concurrency=settings.SCRAPER_PER_DOMAIN_CONCURRENCY,
+                target_latency=settings.SCRAPER_TARGET_LATENCY,
+                respect_robots=settings.SCRAPER_RESPECT_CRAWL_DELAY,
+            )
+        return _scheduler
+
+
+def interleave_by_domain(urls: Iterable[str]) -> list[str]:
+    """
+    Round-robin over the hosts of `urls`, keeping the order within a host,
+    so consecutive requests go to different hosts where possible.
+    """
+
+    queues: dict[str, deque] = defaultdict(deque)
+    for url in urls:
+        queues[_host(url)].append(url)
+
+    result = []
+    while queues:
+        for host in list(queues):
+            result.append(queues[host].popleft())
+            if not queues[host]:
+                del queues[host]
+    return result
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def _robots_delay(robots_url: str) -> Optional[float]:
+    """Crawl-delay (or Request-rate interval) for our user agent, if any."""
+
+    try:
+        response = http_session.get(robots_url, timeout=settings.SCRAPER_HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        logger.info("%s → brak robots.txt: %s", robots_url, e)
+        return None
+    if response.status_code >= 400:
+        return None
+
+    parser = RobotFileParser()
+    parser.parse(response.text.splitlines())
+    delay = parser.crawl_delay(USER_AGENT)
+    rate = parser.request_rate(USER_AGENT)
+    interval = rate.seconds / rate.requests if rate and rate.requests else None
+    delays = [float(d) for d in (delay, interval) if d]
+    return max(delays) if delays else None
+
+
+def _retry_after(value) -> Optional[float]:
+    # Only the delay-seconds form; an HTTP date falls back to the default.
+    try:
+        return min(max(float(value), 0.0), MAX_PAUSE)
+    except (TypeError, ValueError):
+        return None
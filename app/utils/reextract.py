@@ -0,0 +1,137 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
+from app.models import Article
+from .article_writer import ArticleBatchWriter
+from .refresh import COMPARED_FIELDS, REFRESH_FIELDS, content_changed
+from .scraper_factory import get_scraper_for_domain
+from .snapshots import SnapshotStore
+
+
+CHANGED = "changed"
+CREATED = "created"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+def extract_snapshots(root: str, codec: str, entries: list[dict]) -> list[tuple]:
+    """
+    Runs the domain extraction specs over stored snapshots (in a pool
+    process). Returns (url, article dict or None, error) per entry.
+    """
+
+    store = SnapshotStore(root, codec)
+    results = []
+    for entry in entries:
+        url = entry["url"]
+        scraper = get_scraper_for_domain(url)
+        if scraper is None:
+            results.append((url, None, "brak scrapera"))
+            continue
+        try:
+            raw = scraper.extract_static_fields(store.load(entry))
+        except Exception as e:
+            results.append((url, None, f"{type(e).__name__}: {e}"))
+            continue
+        if raw is None:
+            results.append((url, None, "selektory nie trafiły"))
+        else:
+            results.append((url, scraper.build_article(url, **raw), None))
+    return results
+
+
+def _init_worker() -> None:
+    # Spawned (not forked) processes start without Django.
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+class SnapshotReextractor:
+    """
+    Re-extracts articles from the snapshots of `store` in a process pool,
+    `chunk_size` snapshots per task, and writes the results through the
+    batch writer: changed articles are updated (their refresh state kept),
+    URLs without an article are inserted, identical ones are skipped.
+    """
+
+    def __init__(
+        self,
+        store: SnapshotStore,
+        writer: ArticleBatchWriter,
+        workers: Optional[int] = None,
+        chunk_size: int = 200,
+        dry_run: bool = False,
+        notify: Optional[Callable[[str, str, object], None]] = None,
+    ):
+        self.store = store
+        self.writer = writer
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.notify = notify or (lambda kind, url, detail: None)
+
+    def run(self, entries: Iterable[dict]) -> dict[str, int]:
+        counts = {CHANGED: 0, CREATED: 0, UNCHANGED: 0, FAILED: 0}
+        for results in self._extract(entries):
+            stored = _stored_articles(url for url, data, _ in results if data)
+            for url, data, error in results:
+                kind, detail = self._apply(url, data, error, stored.get(url))
+                counts[kind] += 1
+                self.notify(kind, url, detail)
+        return counts
+
+    def _extract(self, entries: Iterable[dict]) -> Iterator[list[tuple]]:
+        chunks = _chunks(entries, self.chunk_size)
+        args = (str(self.store.root), self.store.codec)
+        if self.workers == 1:
+            for chunk in chunks:
+                yield extract_snapshots(*args, chunk)
+            return
+
+        # Workers only parse; the database is used by this process alone.
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker) as pool:
+            tasks = (pool.submit(extract_snapshots, *args, chunk) for chunk in chunks)
+            # A bounded window of tasks in flight keeps memory flat.
+            window = list(islice(tasks, self.workers * 2))
+            while window:
+                results = window.pop(0).result()
+                window.extend(islice(tasks, 1))
+                yield results
+
+    def _apply(
+        self, url: str, data: Optional[dict], error, article: Optional[Article]
+    ) -> tuple[str, object]:
+        if data is None:
+            return FAILED, error
+
+        if article is None:
+            kind = CREATED
+        elif content_changed(article, data):
+            kind = CHANGED
+            # Re-extraction is not a refresh check; the refresh state stays.
+            data = {**data, **{name: getattr(article, name) for name in REFRESH_FIELDS}}
+        else:
+            return UNCHANGED, None
+
+        if not self.dry_run:
+            self.writer.add(data)
+        return kind, data
+
+
+def _stored_articles(urls: Iterable[str]) -> dict[str, Article]:
+    articles = Article.objects.filter(source_url__in=list(urls)).only(
+        *COMPARED_FIELDS, *REFRESH_FIELDS
+    )
+    return {article.source_url: article for article in articles}
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
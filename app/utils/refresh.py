@@ -0,0 +1,193 @@
+from __future__ import annotations
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from app.models import Article
+from .article_writer import ArticleBatchWriter
+from .body_codec import body_hash
+from .politeness import get_scheduler
+from .scraper_factory import get_scraper_for_domain
+from .static_fetch import http_session
+
+
+logger = logging.getLogger(__name__)
+
+UNCHANGED = "unchanged"
+CHANGED = "changed"
+FAILED = "failed"
+
+REFRESH_FIELDS = [
+    "http_etag",
+    "http_last_modified",
+    "page_hash",
+    "checked_at",
+    "next_check_at",
+    "unchanged_checks",
+]
+
+# Columns compared to decide whether re-extracted content changed.
+COMPARED_FIELDS = ("id", "source_url", "title", "content_text", "published_at", "body")
+
+
+def due_articles(limit: int, now=None):
+    """Articles whose next refresh check is due, most overdue first."""
+
+    now = now or timezone.now()
+    return (
+        Article.objects.filter(
+            Q(next_check_at__isnull=True) | Q(next_check_at__lte=now)
+        )
+        .order_by(F("next_check_at").asc(nulls_first=True), "id")
+        .only(*COMPARED_FIELDS, *REFRESH_FIELDS)[:limit]
+    )
+
+
+class ArticleRefresher:
+    """
+    Revalidates stored articles without re-scraping unchanged ones.
+
+    1. Conditional GET with the stored ETag / Last-Modified; 304 ends the
+       check.
+    2. A served page with the stored page hash ends the check too.
+    3. Otherwise the fields are extracted from the served HTML, or in the
+       browser when the selectors miss, and compared with the stored
+       article. Only a real change is written (through `writer`, as an
+       upsert).
+
+    JS-only paths skip 1. and 2.: what the server sends there is the
+    shell of the page, so they are always rendered and compared.
+
+    Unchanged articles only get their refresh columns updated, in bulk,
+    and are checked less and less often (see `Article.schedule_check`).
+    """
+
+    def __init__(
+        self,
+        writer: ArticleBatchWriter,
+        notify: Optional[Callable[[str, str, object], None]] = None,
+        batch_size: int = 100,
+    ):
+        self.writer = writer
+        self.notify = notify or (lambda kind, url, detail: None)
+        self.batch_size = batch_size
+        self._checked: list[Article] = []
+
+    def run(self, articles: Iterable[Article]) -> dict[str, int]:
+        counts = {UNCHANGED: 0, CHANGED: 0, FAILED: 0}
+        try:
+            for article in articles:
+                kind = self.refresh(article)
+                counts[kind] += 1
+        finally:
+            self.flush()
+        return counts
+
+    def refresh(self, article: Article) -> str:
+        url = article.source_url
+        try:
+            kind, detail = self._check(article)
+        except Exception as e:
+            logger.exception("Błąd odświeżania %s: %s", url, e)
+            kind, detail = FAILED, e
+
+        if kind == FAILED:
+            # Retried after the shortest interval; the backoff level is kept.
+            article.checked_at = timezone.now()
+            article.next_check_at = article.checked_at + timedelta(
+                hours=settings.SCRAPER_REFRESH_MIN_INTERVAL_HOURS
+            )
+        if kind != CHANGED:
+            self._checked.append(article)
+            if len(self._checked) >= self.batch_size:
+                self.flush()
+
+        self.notify(kind, url, detail)
+        return kind
+
+    def flush(self) -> None:
+        if self._checked:
+            Article.objects.bulk_update(self._checked, REFRESH_FIELDS)
+            self._checked = []
+
+    def _check(self, article: Article) -> tuple[str, object]:
+        url = article.source_url
+        scraper = get_scraper_for_domain(url)
+        if scraper is None:
+            return FAILED, "brak scrapera"
+
+        if scraper.needs_browser(url):
+            # The served HTML is only the shell of the page: its validators
+            # and hash say nothing about the article.
+            raw = scraper.extract_raw_with_browser(url)
+        else:
+            with get_scheduler().request(url) as request:
+                response = http_session.get(
+                    url,
+                    headers=_conditional_headers(article),
+                    timeout=settings.SCRAPER_HTTP_TIMEOUT,
+                )
+                request.observe(response.status_code, response.headers)
+            if response.status_code == 304:
+                self._store_validators(article, response)
+                article.schedule_check(changed=False)
+                return UNCHANGED, 304
+            if response.status_code >= 400:
+                return FAILED, f"HTTP {response.status_code}"
+
+            self._store_validators(article, response)
+            page_hash = hashlib.sha256(response.content).hexdigest()
+            if page_hash == article.page_hash:
+                article.schedule_check(changed=False)
+                return UNCHANGED, "hash"
+            article.page_hash = page_hash
+
+            raw = scraper.extract_static_fields(response.text)
+            if raw is not None:
+                scraper.save_snapshot(url, response.text)
+            else:
+                raw = scraper.extract_raw_with_browser(url)
+        data = scraper.build_article(url, **raw)
+
+        if not content_changed(article, data):
+            article.schedule_check(changed=False)
+            return UNCHANGED, "content"
+
+        article.schedule_check(changed=True)
+        self.writer.add(
+            {**data, **{name: getattr(article, name) for name in REFRESH_FIELDS}}
+        )
+        return CHANGED, data
+
+    def _store_validators(self, article: Article, response) -> None:
+        # A 304 may omit the validators; the stored ones stay valid then.
+        article.http_etag = response.headers.get("ETag", article.http_etag)
+        article.http_last_modified = response.headers.get(
+            "Last-Modified", article.http_last_modified
+        )
+
+
+def _conditional_headers(article: Article) -> dict[str, str]:
+    headers = {}
+    if article.http_etag:
+        headers["If-None-Match"] = article.http_etag
+    if article.http_last_modified:
+        headers["If-Modified-Since"] = article.http_last_modified
+    return headers
+
+
+def content_changed(article: Article, data: dict) -> bool:
+    """Whether re-extracted `data` differs from the stored `article`."""
+
+    html_hash = body_hash((data["content_html"] or "").encode())
+    return (
+        html_hash != article.body_id
+        or data["title"] != article.title
+        or data["content_text"] != article.content_text
+        or data["published_at"] != article.published_at
+    )
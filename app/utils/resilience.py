@@ -0,0 +1,371 @@
+from __future__ import annotations
+import asyncio
+import logging
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error kinds, as stored in ScrapeFailure.kind.
+DNS = "dns"
+CONNECT = "connect"
+TIMEOUT = "timeout"
+HTTP_CLIENT = "http_4xx"
+HTTP_SERVER = "http_5xx"
+THROTTLED = "throttled"
+SELECTOR_TIMEOUT = "selector"
+EXTRACTION = "extraction"
+CIRCUIT_OPEN = "circuit_open"
+OTHER = "other"
+
+# Worth another attempt after a backoff.
+RETRYABLE = frozenset({CONNECT, TIMEOUT, HTTP_SERVER, THROTTLED})
+# Say something about the host rather than the page; these trip its breaker.
+HOST_FAILURES = frozenset({DNS, CONNECT, TIMEOUT, HTTP_SERVER, THROTTLED})
+
+_DNS_MARKERS = (
+    "ERR_NAME_NOT_RESOLVED",
+    "NameResolutionError",
+    "Name or service not known",
+    "Temporary failure in name resolution",
+    "nodename nor servname",
+    "getaddrinfo failed",
+)
+_CONNECT_MARKERS = (
+    "ERR_CONNECTION_",
+    "ERR_ADDRESS_UNREACHABLE",
+    "ERR_INTERNET_DISCONNECTED",
+    "ERR_EMPTY_RESPONSE",
+)
+
+
+class ScrapeError(Exception):
+    """A failed scrape, with its error kind and HTTP status (if any)."""
+
+    def __init__(self, kind: str, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+        self.attempts = 1
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in RETRYABLE
+
+
+class CircuitOpen(ScrapeError):
+    """The host's breaker is open; try the URL again in `retry_in` seconds."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(
+            CIRCUIT_OPEN, f"{host} niedostępny, kolejna próba za {retry_in:.0f} s"
+        )
+        self.host = host
+        self.retry_in = retry_in
+        self.attempts = 0
+
+
+def http_error(status: int) -> ScrapeError:
+    if status == 429:
+        kind = THROTTLED
+    elif status >= 500:
+        kind = HTTP_SERVER
+    else:
+        kind = HTTP_CLIENT
+    return ScrapeError(kind, f"BŁĄD HTTP {status}", status=status)
+
+
+def classify(error: BaseException) -> str:
+    """Error kind of an exception raised while fetching a page."""
+
+    if isinstance(error, ScrapeError):
+        return error.kind
+    if isinstance(error, PlaywrightError):
+        message = str(error)
+        if _mentions(message, _DNS_MARKERS):
+            return DNS
+        if isinstance(error, PlaywrightTimeoutError) or "ERR_TIMED_OUT" in message:
+            return TIMEOUT
+        if _mentions(message, _CONNECT_MARKERS):
+            return CONNECT
+        return OTHER
+    if isinstance(error, requests.ConnectTimeout):
+        return CONNECT
+    if isinstance(error, requests.Timeout):
+        return TIMEOUT
+    if isinstance(error, requests.ConnectionError):
+        return DNS if _mentions(str(error), _DNS_MARKERS) else CONNECT
+    if isinstance(error, socket.gaierror):
+        return DNS
+    if isinstance(error, TimeoutError):
+        return TIMEOUT
+    if isinstance(error, ConnectionError):
+        return CONNECT
+    return OTHER
+
+
+def as_scrape_error(error: BaseException) -> ScrapeError:
+    if isinstance(error, ScrapeError):
+        return error
+    wrapped = ScrapeError(classify(error), str(error) or type(error).__name__)
+    wrapped.__cause__ = error
+    return wrapped
+
+
+def _mentions(message: str, markers: tuple[str, ...]) -> bool:
+    return any(marker in message for marker in markers)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    At most `max_attempts` tries of a URL. Only retryable errors (connect,
+    timeout, 5xx, 429) are tried again, after a random delay between 0 and
+    `base_delay * 2 ** (attempt - 1)` capped at `max_delay` ("full jitter",
+    so URLs failing together do not come back together).
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    @classmethod
+    def from_settings(cls) -> RetryPolicy:
+        return cls(
+            max_attempts=settings.SCRAPER_RETRY_ATTEMPTS,
+            base_delay=settings.SCRAPER_RETRY_BASE_DELAY,
+            max_delay=settings.SCRAPER_RETRY_MAX_DELAY,
+        )
+
+    def should_retry(self, error: ScrapeError, attempt: int) -> bool:
+        return error.retryable and attempt < self.max_attempts
+
+    def delay(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return self.rng.uniform(0, cap)
+
+
+@dataclass
+class _Circuit:
+    failures: int = 0
+    opened_at: Optional[float] = None
+    open_for: float = 0.0
+    probing: bool = False
+
+
+class CircuitBreakers:
+    """
+    One circuit breaker per host, shared by all scrapers.
+
+    `threshold` host failures in a row (DNS, connect, timeout, 5xx, 429)
+    open the host's circuit: its URLs fail at once with CircuitOpen for
+    `reset_timeout` seconds, without a request. After that one probe
+    request is let through; success closes the circuit, failure opens it
+    again for twice as long, up to `max_reset_timeout`. Any other outcome
+    (including a 404) shows the host is up and resets the count.
+    `threshold` 0 disables the breakers.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        reset_timeout: float = 120.0,
+        max_reset_timeout: float = 1800.0,
+        clock=time.monotonic,
+    ):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(reset_timeout, max_reset_timeout)
+        self.clock = clock
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def before(self, url: str) -> None:
+        """Raises CircuitOpen unless a request to the host of `url` may go."""
+
+        host = _host(url)
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.opened_at is None:
+                return
+
+            remaining = circuit.opened_at + circuit.open_for - self.clock()
+            if remaining > 0:
+                raise CircuitOpen(host, remaining)
+            if circuit.probing:
+                raise CircuitOpen(host, circuit.open_for)
+            circuit.probing = True
+        logger.info("%s → próba po otwarciu obwodu", host)
+
+    def record(self, url: str, error: Optional[ScrapeError]) -> None:
+        host = _host(url)
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if error is None or error.kind not in HOST_FAILURES:
+                if circuit.opened_at is not None:
+                    logger.info("%s → obwód zamknięty", host)
+                self._circuits[host] = _Circuit()
+                return
+
+            circuit.failures += 1
+            if circuit.probing:
+                circuit.probing = False
+                self._open(
+                    host, circuit, min(circuit.open_for * 2, self.max_reset_timeout)
+                )
+            elif (
+                circuit.opened_at is None
+                and self.threshold
+                and circuit.failures >= self.threshold
+            ):
+                self._open(host, circuit, self.reset_timeout)
+
+    def state(self, url: str) -> str:
+        with self._lock:
+            return self._state(self._circuits.get(_host(url)))
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                host: {"failures": circuit.failures, "state": self._state(circuit)}
+                for host, circuit in self._circuits.items()
+            }
+
+    def _state(self, circuit: Optional[_Circuit]) -> str:
+        if circuit is None or circuit.opened_at is None:
+            return "closed"
+        if circuit.opened_at + circuit.open_for > self.clock():
+            return "open"
+        return "half_open"
+
+    def _open(self, host: str, circuit: _Circuit, open_for: float) -> None:
+        # Caller holds the lock.
+        circuit.opened_at = self.clock()
+        circuit.open_for = open_for
+        logger.warning(
+            "%s → obwód otwarty na %.0f s po %d błędach hosta",
+            host,
+            open_for,
+            circuit.failures,
+        )
+
+
+_breakers: Optional[CircuitBreakers] = None
+_breakers_lock = threading.Lock()
+
+
+def get_breakers() -> CircuitBreakers:
+    global _breakers
+    with _breakers_lock:
+        if _breakers is None:
+            _breakers = CircuitBreakers(
+                threshold=settings.SCRAPER_BREAKER_THRESHOLD,
+                reset_timeout=settings.SCRAPER_BREAKER_RESET_SECONDS,
+            )
+        return _breakers
+
+
+def call_with_retries(
+    url: str,
+    attempt: Callable[[], T],
+    policy: Optional[RetryPolicy] = None,
+    breakers: Optional[CircuitBreakers] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """
+    Runs `attempt` (one scrape of `url`) under the host's breaker and the
+    retry policy. Failures come out as ScrapeError carrying the kind and
+    the number of attempts; an open breaker raises CircuitOpen at once.
+    """
+
+    policy = policy or RetryPolicy.from_settings()
+    breakers = breakers or get_breakers()
+    number = 0
+    while True:
+        number += 1
+        breakers.before(url)
+        try:
+            result = attempt()
+        except Exception as e:
+            error = _failed(url, e, number, policy, breakers)
+            if error is not None:
+                raise error
+            sleep(_backoff(url, e, number, policy))
+            continue
+        breakers.record(url, None)
+        return result
+
+
+async def call_with_retries_async(
+    url: str,
+    attempt: Callable[[], Awaitable[T]],
+    policy: Optional[RetryPolicy] = None,
+    breakers: Optional[CircuitBreakers] = None,
+) -> T:
+    """Async counterpart of `call_with_retries`; backoff does not block."""
+
+    policy = policy or RetryPolicy.from_settings()
+    breakers = breakers or get_breakers()
+    number = 0
+    while True:
+        number += 1
+        breakers.before(url)
+        try:
+            result = await attempt()
+        except Exception as e:
+            error = _failed(url, e, number, policy, breakers)
+            if error is not None:
+                raise error
+            await asyncio.sleep(_backoff(url, e, number, policy))
+            continue
+        breakers.record(url, None)
+        return result
+
+
+def _failed(
+    url: str,
+    exc: Exception,
+    number: int,
+    policy: RetryPolicy,
+    breakers: CircuitBreakers,
+) -> Optional[ScrapeError]:
+    """Records a failed attempt; returns the error to raise, or None to retry."""
+
+    error = as_scrape_error(exc)
+    error.attempts = number
+    breakers.record(url, error)
+    if policy.should_retry(error, number):
+        return None
+    return error
+
+
+def _backoff(url: str, exc: Exception, number: int, policy: RetryPolicy) -> float:
+    delay = policy.delay(number)
+    logger.warning(
+        "%s → %s (%s), ponowienie %d/%d za %.1f s",
+        url,
+        classify(exc),
+        exc,
+        number + 1,
+        policy.max_attempts,
+        delay,
+    )
+    return delay
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
@@ -0,0 +1,203 @@
+from __future__ import annotations
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable
+from urllib.parse import urlparse
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+# Ad, analytics and tracking hosts; subdomains are matched too.
+DEFAULT_BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "google-analytics.com",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "scorecardresearch.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "gemius.pl",
+    "cookiebot.com",
+    "onetrust.com",
+)
+
+# Typical transfer size (bytes) of a response of each resource type; the
+# estimate for a blocked request until responses of its type were seen.
+TYPICAL_RESPONSE_BYTES = {
+    "image": 20_000,
+    "media": 250_000,
+    "font": 30_000,
+    "stylesheet": 15_000,
+    "script": 25_000,
+}
+DEFAULT_RESPONSE_BYTES = 5_000
+
+
+@dataclass
+class BlockingStats:
+    blocked_requests: int = 0
+    blocked_by_type: Counter = field(default_factory=Counter)
+    allowed_requests: int = 0
+    loaded_bytes: int = 0
+    # Estimated: blocked requests have no response to measure.
+    saved_bytes_by_type: Counter = field(default_factory=Counter)
+
+    @property
+    def saved_bytes(self) -> int:
+        return sum(self.saved_bytes_by_type.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "allowed_requests": self.allowed_requests,
+            "loaded_bytes": self.loaded_bytes,
+            "saved_bytes": self.saved_bytes,
+            "saved_bytes_by_type": dict(self.saved_bytes_by_type),
+        }
+
+
+class ResponseSizes:
+    """
+    Mean Content-Length of the loaded responses of each resource type,
+    used to estimate the bytes a blocked request would have cost. Types
+    not seen yet (usually the blocked ones) fall back to
+    TYPICAL_RESPONSE_BYTES.
+    """
+
+    def __init__(self):
+        self._totals: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, resource_type: str, size: int) -> None:
+        with self._lock:
+            total = self._totals.setdefault(resource_type, [0, 0])
+            total[0] += size
+            total[1] += 1
+
+    def estimate(self, resource_type: str) -> int:
+        with self._lock:
+            size, count = self._totals.get(resource_type, (0, 0))
+        if count:
+            return size // count
+        return TYPICAL_RESPONSE_BYTES.get(resource_type, DEFAULT_RESPONSE_BYTES)
+
+
+response_sizes = ResponseSizes()
+
+
+class ResourceBlocker:
+    """
+    Aborts subresource requests that extraction does not need. A request
+    is blocked when its resource type or host is denied and not explicitly
+    allowed; allow-lists always win.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        blocked_hosts: Iterable[str] = DEFAULT_BLOCKED_HOSTS,
+        allowed_types: Iterable[str] = (),
+        allowed_hosts: Iterable[str] = (),
+    ):
+        self.blocked_types = frozenset(blocked_types) - frozenset(allowed_types)
+        self.blocked_hosts = tuple(h.lower() for h in blocked_hosts)
+        self.allowed_hosts = tuple(h.lower() for h in allowed_hosts)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type == "document":
+            return False
+
+        host = (urlparse(url).hostname or "").lower()
+        if _host_matches(host, self.allowed_hosts):
+            return False
+
+        return resource_type in self.blocked_types or _host_matches(
+            host, self.blocked_hosts
+        )
+
+    def install(self, page) -> "BlockingSession":
+        session = BlockingSession(self, page)
+
+        def handle(route):
+            if session.check(route.request):
+                route.abort()
+            else:
+                route.continue_()
+
+        page.route("**/*", handle)
+        page.on("response", session.on_response)
+        return session
+
+    async def install_async(self, page) -> "BlockingSession":
+        session = BlockingSession(self, page)
+
+        async def handle(route):
+            if session.check(route.request):
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", handle)
+        page.on("response", session.on_response)
+        return session
+
+
+class BlockingSession:
+    """Counters for one page load; `uninstall` detaches the blocker."""
+
+    def __init__(self, blocker: ResourceBlocker, page):
+        self.blocker = blocker
+        self.page = page
+        self.stats = BlockingStats()
+
+    def check(self, request) -> bool:
+        if self.blocker.should_block(request.resource_type, request.url):
+            self.stats.blocked_requests += 1
+            self.stats.blocked_by_type[request.resource_type] += 1
+            self.stats.saved_bytes_by_type[
+                request.resource_type
+            ] += response_sizes.estimate(request.resource_type)
+            return True
+
+        self.stats.allowed_requests += 1
+        return False
+
+    def on_response(self, response) -> None:
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.stats.loaded_bytes += int(length)
+            response_sizes.observe(response.request.resource_type, int(length))
+
+    def uninstall(self) -> None:
+        self.page.remove_listener("response", self.on_response)
+        # Routes are dropped by the browser pool when the page is reset.
+
+    def log(self, url: str) -> None:
+        logger.debug(
+            "%s → zablokowano %d zapytań %s (ok. %d B), pobrano %d B w %d "
+            "zapytaniach",
+            url,
+            self.stats.blocked_requests,
+            dict(self.stats.blocked_by_type),
+            self.stats.saved_bytes,
+            self.stats.loaded_bytes,
+            self.stats.allowed_requests,
+        )
+
+
+def _host_matches(host: str, domains: tuple[str, ...]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
@@ -0,0 +1,261 @@
+"""
+Batch scrape jobs: many article URLs submitted at once through the API.
+
+Submitting a job does a constant number of statements whatever the number
+of URLs (set-based inserts and updates, the stored articles looked up in
+one query); the URLs go into the frontier, where scrape workers claim
+them like discovered ones. The progress of a job is read from the
+frontier rows of its URLs, so workers need no knowledge of jobs.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from app.models import Article, FrontierURL, ScrapeJob, ScrapeJobItem, domain_from_url
+from .scraper_factory import SCRAPER_REGISTRY, host_matches
+
+
+JOB_SOURCE = "job"
+
+# Statuses of job items as reported by the API: the frontier state of a
+# queued URL, or what was decided on submission.
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+EXISTS = ScrapeJobItem.EXISTS
+INVALID = ScrapeJobItem.INVALID
+ITEM_STATUSES = (PENDING, IN_PROGRESS, DONE, FAILED, EXISTS, INVALID)
+
+_FRONTIER_STATUS = {
+    FrontierURL.PENDING: PENDING,
+    FrontierURL.LEASED: IN_PROGRESS,
+    FrontierURL.DONE: DONE,
+    FrontierURL.FAILED: FAILED,
+}
+_STATUS_FRONTIER = {status: state for state, status in _FRONTIER_STATUS.items()}
+
+# Rows per INSERT; keeps bulk inserts under the bind parameter limit.
+_INSERT_BATCH = 2000
+
+
+@dataclass
+class SubmittedJob:
+    job: ScrapeJob
+    queued: int
+    exists: int
+    invalid: int
+
+
+def scraper_domain(host: str) -> Optional[str]:
+    """The registry domain whose scraper handles `host`, if any."""
+
+    for domain in SCRAPER_REGISTRY:
+        if host_matches(host, domain):
+            return domain
+    return None
+
+
+def check_url(raw: str) -> tuple[Optional[str], str]:
+    """(queueable URL, "") or (None, why it is rejected)."""
+
+    url = FrontierURL.clean_url(raw)
+    if url is None:
+        return None, "invalid URL"
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return None, "invalid URL"
+    if scraper_domain(host) is None:
+        return None, "no scraper for domain"
+    return url, ""
+
+
+def submit_scrape_job(
+    urls: Iterable[str], priority: Optional[int] = None
+) -> SubmittedJob:
+    """
+    Records a job for `urls` and queues the ones without a stored article.
+    Repeated URLs count once; invalid ones and ones without a scraper are
+    kept in the job with the reason. URLs already in the frontier are
+    requeued when finished and moved up to the job's priority when pending.
+    """
+
+    if priority is None:
+        priority = settings.SCRAPE_JOB_PRIORITY
+    submitted = 0
+    valid: dict[str, None] = {}
+    invalid: dict[str, str] = {}
+    for raw in urls:
+        submitted += 1
+        url, reason = check_url(raw)
+        if url is not None:
+            valid[url] = None
+        else:
+            invalid.setdefault(raw, reason)
+
+    existing = set(
+        Article.objects.filter(source_url__in=list(valid)).values_list(
+            "source_url", flat=True
+        )
+    )
+    queued = [url for url in valid if url not in existing]
+    existing = [url for url in valid if url in existing]
+
+    with transaction.atomic():
+        job = ScrapeJob.objects.create(
+            priority=priority,
+            submitted_urls=submitted,
+            duplicate_urls=submitted - len(valid) - len(invalid),
+        )
+        items = [
+            ScrapeJobItem(job=job, url=url, status=ScrapeJobItem.QUEUED)
+            for url in queued
+        ]
+        items += [
+            ScrapeJobItem(job=job, url=url, status=ScrapeJobItem.EXISTS)
+            for url in existing
+        ]
+        items += [
+            ScrapeJobItem(job=job, url=url, status=ScrapeJobItem.INVALID, reason=why)
+            for url, why in invalid.items()
+        ]
+        ScrapeJobItem.objects.bulk_create(items, batch_size=_INSERT_BATCH)
+
+        if queued:
+            _enqueue(job, queued, priority)
+
+    return SubmittedJob(job, len(queued), len(existing), len(invalid))
+
+
+def _enqueue(job: ScrapeJob, urls: list[str], priority: int) -> None:
+    now = timezone.now()
+    FrontierURL.objects.bulk_create(
+        [
+            FrontierURL(
+                url=url,
+                domain=domain_from_url(url),
+                source=JOB_SOURCE,
+                priority=priority,
+                next_due_at=now,
+            )
+            for url in urls
+        ],
+        batch_size=_INSERT_BATCH,
+        ignore_conflicts=True,
+    )
+
+    # URLs queued before: the job's URL list is read by the database
+    # itself, so these statements do not grow with the job.
+    known = FrontierURL.objects.filter(url__in=_queued_urls(job))
+    # Finished without an article (failed, or the article was removed).
+    known.filter(state__in=(FrontierURL.DONE, FrontierURL.FAILED)).update(
+        state=FrontierURL.PENDING,
+        priority=priority,
+        next_due_at=now,
+        attempts=0,
+        last_error="",
+        finished_at=None,
+    )
+    known.filter(state=FrontierURL.PENDING, priority__lt=priority).update(
+        priority=priority
+    )
+
+
+def _queued_urls(job: ScrapeJob):
+    return job.items.filter(status=ScrapeJobItem.QUEUED).values("url")
+
+
+def job_progress(job: ScrapeJob) -> dict[str, int]:
+    """Number of the job's URLs in each of ITEM_STATUSES (two queries)."""
+
+    progress = dict.fromkeys(ITEM_STATUSES, 0)
+    counts = dict(job.items.values_list("status").annotate(n=Count("id")).order_by())
+    progress[EXISTS] = counts.get(ScrapeJobItem.EXISTS, 0)
+    progress[INVALID] = counts.get(ScrapeJobItem.INVALID, 0)
+    queued = counts.get(ScrapeJobItem.QUEUED, 0)
+    if queued:
+        states = (
+            FrontierURL.objects.filter(url__in=_queued_urls(job))
+            .values_list("state")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        for state, n in states:
+            progress[_FRONTIER_STATUS[state]] += n
+        # Frontier rows removed since submission are reported as pending.
+        progress[PENDING] += queued - sum(
+            progress[s] for s in _FRONTIER_STATUS.values()
+        )
+    return progress
+
+
+def job_finished(progress: dict[str, int]) -> bool:
+    return not (progress[PENDING] or progress[IN_PROGRESS])
+
+
+def filter_items(job: ScrapeJob, status: str):
+    """Items of `job` with the API status `status` (one of ITEM_STATUSES)."""
+
+    items = job.items.all()
+    state = _STATUS_FRONTIER.get(status)
+    if state is None:
+        return items.filter(status=status)
+    in_state = FrontierURL.objects.filter(state=state).values("url")
+    queued = items.filter(status=ScrapeJobItem.QUEUED)
+    if status == PENDING:
+        # Also the URLs without a frontier row, as in `job_progress`.
+        return queued.filter(
+            Q(url__in=in_state) | ~Q(url__in=FrontierURL.objects.values("url"))
+        )
+    return queued.filter(url__in=in_state)
+
+
+def describe_items(items: list[ScrapeJobItem]) -> list[dict]:
+    """
+    API representation of a page of items: status, and the stored article
+    or the last error. Two queries whatever the page size.
+    """
+
+    queued = [item.url for item in items if item.status == ScrapeJobItem.QUEUED]
+    frontier = {
+        url: (state, error, attempts)
+        for url, state, error, attempts in FrontierURL.objects.filter(
+            url__in=queued
+        ).values_list("url", "state", "last_error", "attempts")
+    }
+    candidates = [
+        item.url
+        for item in items
+        if item.status == ScrapeJobItem.EXISTS
+        or frontier.get(item.url, ("",))[0] == FrontierURL.DONE
+    ]
+    articles = dict(
+        Article.objects.filter(source_url__in=candidates).values_list(
+            "source_url", "id"
+        )
+    )
+
+    described = []
+    for item in items:
+        data = {"url": item.url, "status": item.status}
+        if item.status == ScrapeJobItem.QUEUED:
+            state, error, attempts = frontier.get(
+                item.url, (FrontierURL.PENDING, "", 0)
+            )
+            data["status"] = _FRONTIER_STATUS[state]
+            data["attempts"] = attempts
+            if state == FrontierURL.FAILED or (error and state == FrontierURL.PENDING):
+                data["error"] = error
+        elif item.status == ScrapeJobItem.INVALID:
+            data["error"] = item.reason
+        data["article_id"] = articles.get(item.url)
+        described.append(data)
+    return described
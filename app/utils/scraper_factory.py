@@ -3,6 +3,7 @@ from typing import Optional
 from urllib.parse import urlparse
 
 from .domain_scrapers import *
+from .resilience import call_with_retries
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +15,14 @@ SCRAPER_REGISTRY: dict[str, type[MainScraper]] = {
 }
 
 
+def host_matches(host: str, domain: str) -> bool:
+    return host == domain or host.endswith("." + domain)
+
+
 def get_scraper_for_domain(url: str) -> Optional[MainScraper]:
     host = (urlparse(url).hostname or "").lower()
     for domain, klass in SCRAPER_REGISTRY.items():
-        if host == domain or host.endswith("." + domain):
+        if host_matches(host, domain):
             return klass()
 
     logger.error(f"Brak scrapera dla domeny: {host}")
@@ -25,5 +30,10 @@ def get_scraper_for_domain(url: str) -> Optional[MainScraper]:
 
 
 def scrap_article(url: str) -> Optional[dict]:
+    """
+    Scrapes `url` under the retry policy and the host's circuit breaker;
+    raises ScrapeError (CircuitOpen for a host that is down) on failure.
+    """
+
     scraper = get_scraper_for_domain(url)
-    return scraper.extract_article(url)
+    return call_with_retries(url, lambda: scraper.extract_article(url))
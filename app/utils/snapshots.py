@@ -0,0 +1,135 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.utils import timezone
+
+from .body_codec import CODECS, body_hash, compress, decompress
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.jsonl"
+
+
+class SnapshotStore:
+    """
+    Fetched pages (the rendered DOM, or the served HTML when the static
+    fetch was enough) on local disk, so the extraction specs can be run
+    again without the network.
+
+    Pages are content-addressed: `objects/<hash[:2]>/<hash>.<codec>` holds
+    the compressed HTML once, however often it was fetched. Every fetch
+    appends one line to `index.jsonl` (URL, hash, codec, fetch time, size);
+    `latest` reads it back. Lines are appended with a single write, so
+    several scraper processes can share a directory.
+    """
+
+    def __init__(self, root, codec: str = "zlib"):
+        self.root = Path(root)
+        self.codec = codec
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / INDEX_NAME
+
+    def save(self, url: str, html: str, fetched_at: Optional[datetime] = None) -> str:
+        """Stores the page of `url` and returns its hash."""
+
+        raw = html.encode()
+        digest = body_hash(raw)
+        codec = self._stored_codec(digest)
+        if codec is None:
+            codec, data = compress(raw, self.codec)
+            self._write_object(self._object_path(digest, codec), data)
+
+        entry = {
+            "url": url,
+            "hash": digest,
+            "codec": codec,
+            "fetched_at": (fetched_at or timezone.now()).isoformat(),
+            "size": len(raw),
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode()
+        with self._lock, open(self.index_path, "ab") as index:
+            index.write(line)
+        return digest
+
+    def load(self, entry: dict) -> str:
+        data = self._object_path(entry["hash"], entry["codec"]).read_bytes()
+        return decompress(data, entry["codec"]).decode()
+
+    def entries(self) -> Iterator[dict]:
+        """Index entries in fetch order; a torn last line is skipped."""
+
+        try:
+            index = open(self.index_path, "rb")
+        except FileNotFoundError:
+            return
+        with index:
+            for line in index:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("Pominięto uszkodzony wpis indeksu zrzutów")
+
+    def latest(self, domain: Optional[str] = None) -> dict[str, dict]:
+        """The last snapshot of every URL (of `domain` and its subdomains)."""
+
+        latest: dict[str, dict] = {}
+        for entry in self.entries():
+            if not domain or _on_domain(entry["url"], domain.lower()):
+                latest[entry["url"]] = entry
+        return latest
+
+    def _stored_codec(self, digest: str) -> Optional[str]:
+        for codec in CODECS:
+            if self._object_path(digest, codec).exists():
+                return codec
+        return None
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.{codec}"
+
+    def _write_object(self, path: Path, data: bytes) -> None:
+        # Written aside and renamed, so a reader never sees half a page.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _on_domain(url: str, domain: str) -> bool:
+    host = (urlparse(url).hostname or "").lower()
+    return host == domain or host.endswith("." + domain)
+
+
+_store: Optional[SnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """The configured store, or None when SCRAPER_SNAPSHOT_DIR is empty."""
+
+    global _store
+    root = settings.SCRAPER_SNAPSHOT_DIR
+    if not root:
+        return None
+    with _store_lock:
+        if _store is None or _store.root != Path(root):
+            _store = SnapshotStore(root, settings.SCRAPER_SNAPSHOT_CODEC)
+        return _store
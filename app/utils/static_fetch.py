@@ -0,0 +1,81 @@
+from __future__ import annotations
+import threading
+from dataclasses import dataclass
+
+import requests
+from django.conf import settings
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/140.0 Safari/537.36"
+)
+
+
+class _Session(requests.Session):
+    """Sends every request through SCRAPER_PROXY when it is set."""
+
+    def request(self, method, url, **kwargs):
+        if settings.SCRAPER_PROXY and not kwargs.get("proxies"):
+            proxy = settings.SCRAPER_PROXY
+            kwargs["proxies"] = {"http": proxy, "https": proxy}
+        return super().request(method, url, **kwargs)
+
+
+# One keep-alive session shared by all scrapers.
+http_session = _Session()
+http_session.headers.update({"User-Agent": USER_AGENT})
+
+
+@dataclass
+class _DomainCounts:
+    hits: int = 0
+    misses: int = 0
+    browser_first_runs: int = 0
+
+
+class StaticFetchStats:
+    """
+    Per-domain record of how often the plain HTTP fetch produced a complete
+    article. Domains whose hit rate drops below `min_hit_rate` (after
+    `min_samples` attempts) go to the browser first; every `probe_every`-th
+    URL of such a domain still tries the static path so the domain can
+    recover when its template changes.
+    """
+
+    def __init__(
+        self, min_samples: int = 5, min_hit_rate: float = 0.5, probe_every: int = 20
+    ):
+        self.min_samples = min_samples
+        self.min_hit_rate = min_hit_rate
+        self.probe_every = probe_every
+        self._counts: dict[str, _DomainCounts] = {}
+        self._lock = threading.Lock()
+
+    def record(self, domain: str, hit: bool) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(domain, _DomainCounts())
+            if hit:
+                counts.hits += 1
+            else:
+                counts.misses += 1
+
+    def prefer_static(self, domain: str) -> bool:
+        with self._lock:
+            counts = self._counts.setdefault(domain, _DomainCounts())
+            total = counts.hits + counts.misses
+            if total < self.min_samples or counts.hits / total >= self.min_hit_rate:
+                return True
+
+            counts.browser_first_runs += 1
+            return counts.browser_first_runs % self.probe_every == 0
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                domain: {"hits": c.hits, "misses": c.misses}
+                for domain, c in self._counts.items()
+            }
+
+
+static_fetch_stats = StaticFetchStats()
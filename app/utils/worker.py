@@ -0,0 +1,286 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+from app.models import FrontierURL
+from .article_writer import ArticleBatchWriter, known_source_urls
+from .async_pipeline import AsyncScrapePipeline, DEFERRED, FAILED, SAVED, SKIPPED
+from .frontier import FrontierRecorder
+from .metrics import get_metrics
+from .politeness import interleave_by_domain
+from .resilience import EXTRACTION, CircuitOpen, ScrapeError
+from .scraper_factory import scrap_article
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class WorkerStats:
+    """Claimed / finished / failed / deferred counters of one worker, with rates."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.claimed = 0
+        self.finished = 0
+        self.failed = 0
+        self.deferred = 0
+        self._lock = threading.Lock()
+
+    def add(
+        self, claimed: int = 0, finished: int = 0, failed: int = 0, deferred: int = 0
+    ) -> None:
+        with self._lock:
+            self.claimed += claimed
+            self.finished += finished
+            self.failed += failed
+            self.deferred += deferred
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            minutes = max(self.clock() - self.started, 1e-9) / 60
+            counts = {
+                "claimed": self.claimed,
+                "finished": self.finished,
+                "failed": self.failed,
+                "deferred": self.deferred,
+            }
+        return {
+            **counts,
+            **{f"{name}_per_min": round(n / minutes, 1) for name, n in counts.items()},
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (
+            f"pobrane: {s['claimed']} ({s['claimed_per_min']}/min), "
+            f"zakończone: {s['finished']} ({s['finished_per_min']}/min), "
+            f"błędy: {s['failed']} ({s['failed_per_min']}/min), "
+            f"odłożone: {s['deferred']}"
+        )
+
+
+class ScrapeWorker:
+    """
+    Scrapes frontier URLs claimed under a lease. Any number of workers, on
+    any number of machines, can share one database with no broker:
+
+    - claims take due rows with FOR UPDATE SKIP LOCKED, so workers never
+      block each other or get the same URL,
+    - a heartbeat thread renews the leases of the claimed URLs,
+    - every claim first requeues leases that ran out (a dead worker's),
+    - the outcome is only recorded while the lease is still held.
+
+    On stop, URLs claimed but not started go back to the queue.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        claim_size: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        idle_sleep: float = 5.0,
+        report_interval: float = 60.0,
+        notify: Optional[Callable[[str, str, object], None]] = None,
+        report: Optional[Callable[[str], None]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.claim_size = claim_size or settings.SCRAPER_WORKER_CLAIM_SIZE
+        self.lease = timedelta(
+            seconds=lease_seconds or settings.SCRAPER_WORKER_LEASE_SECONDS
+        )
+        self.idle_sleep = idle_sleep
+        self.report_interval = report_interval
+        self.notify = notify or (lambda kind, url, detail: None)
+        self.report = report or (lambda text: logger.info(text))
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.stats = WorkerStats()
+        self.recorder = FrontierRecorder(worker=self.worker_id)
+        self.metrics = get_metrics()
+        self._stop = threading.Event()
+        self._last_report = time.monotonic()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_empty=False) -> None:
+        writer = ArticleBatchWriter(
+            batch_size=self.batch_size,
+            flush_interval=self.flush_interval,
+            on_saved=lambda article: self._record(SAVED, article.source_url, article),
+            on_failed=lambda url, e: self._record(FAILED, url, e),
+        )
+        with self._leases():
+            with writer:
+                for batch in self.batches(max_jobs, exit_when_empty):
+                    known = known_source_urls(batch)
+                    for url in interleave_by_domain(batch):
+                        if self._stop.is_set():
+                            break
+                        self._scrape(url, known, writer)
+                    writer.flush()
+                    self._checkpoint()
+
+    def run_async(
+        self,
+        max_jobs: Optional[int] = None,
+        exit_when_empty=False,
+        concurrency: int = 8,
+        per_domain: int = 2,
+    ) -> None:
+        pipeline = AsyncScrapePipeline(
+            (),
+            # Every claim is started as soon as it is made, however small.
+            batches=self.batches(max_jobs, exit_when_empty, wait=False),
+            idle_wait=lambda: self._stop.wait(self.idle_sleep),
+            concurrency=concurrency,
+            per_domain=per_domain,
+            notify=self._record,
+            batch_size=self.batch_size,
+            flush_interval=self.flush_interval,
+            checkpoint=self._checkpoint,
+        )
+        with self._leases():
+            asyncio.run(self._run_pipeline(pipeline))
+
+    async def _run_pipeline(self, pipeline: AsyncScrapePipeline) -> None:
+        try:
+            await pipeline.run()
+        finally:
+            # The pipeline's database thread holds connections of its own;
+            # `close_all` looks them up in that thread.
+            await sync_to_async(connections.close_all)()
+
+    def batches(
+        self, max_jobs: Optional[int] = None, exit_when_empty=False, wait=True
+    ) -> Iterator[list[str]]:
+        """
+        Claimed URLs, a claim at a time. When none are due, waits
+        `idle_sleep` before claiming again, or with `wait=False` yields an
+        empty batch and leaves the waiting to the caller.
+        """
+
+        remaining = max_jobs
+        while not self._stop.is_set() and (remaining is None or remaining > 0):
+            reclaimed = FrontierURL.reclaim_expired()
+            if reclaimed:
+                logger.warning("Przywrócono %d wygasłych dzierżaw", reclaimed)
+
+            limit = (
+                self.claim_size
+                if remaining is None
+                else min(self.claim_size, remaining)
+            )
+            batch = FrontierURL.claim(self.worker_id, limit, self.lease)
+            if not batch:
+                if exit_when_empty:
+                    return
+                if wait:
+                    self._stop.wait(self.idle_sleep)
+                else:
+                    yield []
+                continue
+
+            self.stats.add(claimed=len(batch))
+            if remaining is not None:
+                remaining -= len(batch)
+            yield batch
+
+    def _scrape(self, url: str, known: set[str], writer: ArticleBatchWriter) -> None:
+        if url in known:
+            self._record(SKIPPED, url, None)
+            return
+
+        try:
+            with self.metrics.span("total", url):
+                data = scrap_article(url)
+        except CircuitOpen as e:
+            self._record(DEFERRED, url, e)
+            return
+        except Exception as e:
+            logger.exception("Błąd przy przetwarzaniu %s: %s", url, e)
+            self._record(FAILED, url, e)
+            return
+
+        if not data:
+            self._record(FAILED, url, ScrapeError(EXTRACTION, "błąd ekstrakcji"))
+            return
+        writer.add(data)
+
+    def _record(self, kind: str, url: str, detail) -> None:
+        # Buffers only: may run on the event loop in async mode.
+        self.metrics.outcome(kind, url, detail)
+        if kind == FAILED:
+            self.recorder.failed(url, detail)
+            self.stats.add(failed=1)
+        elif kind == DEFERRED:
+            self.recorder.deferred(url, detail)
+            self.stats.add(deferred=1)
+        else:
+            self.recorder.done(url)
+            self.stats.add(finished=1)
+        self.notify(kind, url, detail)
+
+    def _checkpoint(self) -> None:
+        self.recorder.flush()
+        self.metrics.maybe_flush()
+        if time.monotonic() - self._last_report >= self.report_interval:
+            self._last_report = time.monotonic()
+            self.report(f"Worker {self.worker_id}: {self.stats.summary()}")
+
+    @contextmanager
+    def _leases(self):
+        self.metrics.begin_run()
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(stop_heartbeat,), daemon=True
+        )
+        heartbeat.start()
+        try:
+            yield
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            self.recorder.flush()
+            self.metrics.flush()
+            released = FrontierURL.release(self.worker_id)
+            if released:
+                logger.info("Zwolniono %d nierozpoczętych adresów", released)
+            self.report(
+                f"Worker {self.worker_id} zakończył: {self.stats.summary()}\n"
+                + json.dumps(self.metrics.summary(), ensure_ascii=False, indent=2)
+            )
+
+    def _heartbeat(self, stop: threading.Event) -> None:
+        interval = self.lease.total_seconds() / 3
+        try:
+            while not stop.wait(interval):
+                try:
+                    FrontierURL.extend_leases(self.worker_id, self.lease)
+                except Exception as e:
+                    # The next beat retries; the lease outlives a few misses.
+                    logger.error("Odnowienie dzierżaw nieudane: %s", e)
+                    close_old_connections()
+        finally:
+            connection.close()
@@ -1,7 +1,60 @@
-from rest_framework import viewsets, mixins
+from typing import Optional
 
-from .models import Article
-from .serializers import ArticleSerializer
+from django.conf import settings
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+from rest_framework import status, viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from .caching import cached_article_response
+from .export import (
+    CONTENT_TYPES,
+    FORMATS,
+    NDJSON,
+    ExportFilters,
+    ExportParamError,
+    export_rows,
+    gzip_members,
+    iter_export,
+    parse_fields,
+)
+from .models import Article, ScrapeJob, ScrapeMetric, domain_key_for, normalize_domain
+from .pagination import (
+    ArticleCursorPagination,
+    ArticleSearchPagination,
+    ScrapeJobItemPagination,
+)
+from .search import search_headline, search_query, search_rank, search_supported
+from .serializers import (
+    ArticleSerializer,
+    ScrapeJobSubmitSerializer,
+    article_row_to_dict,
+    dump_json,
+    iter_article_list_json,
+)
+from .throttling import ScrapeJobRateThrottle
+from .utils.metrics import render_prometheus
+from .utils.scrape_jobs import (
+    ITEM_STATUSES,
+    describe_items,
+    filter_items,
+    job_finished,
+    job_progress,
+    submit_scrape_job,
+)
+
+
+ALL_FIELDS = tuple(ArticleSerializer.Meta.fields)
+
+# Default list representation; the large body columns are left out.
+SUMMARY_FIELDS = ("id", "title", "source_url", "source_domain", "published_at")
 
 
 class ArticleViewSet(
@@ -9,14 +62,289 @@ class ArticleViewSet(
 ):
 
     serializer_class = ArticleSerializer
+    pagination_class = ArticleCursorPagination
     queryset = Article.objects.all()
 
     def get_queryset(self):
         qs = super().get_queryset()
-        source = self.request.query_params.get("source")
+        # published_at is always loaded: the pagination cursor needs it.
+        fields = self.requested_fields()
+        if "content_html" in fields:
+            # The HTML lives in ArticleBody.
+            fields = tuple(f for f in fields if f != "content_html")
+            qs = qs.select_related("body")
+            fields += ("body",)
+        qs = qs.only(*fields, "published_at")
+        source = self._source()
 
         if source:
-            source = source.strip().lower()
-            qs = qs.filter(source_domain__iexact=source)
+            # The domain itself and its subdomains: one index range scan.
+            qs = qs.filter(domain_key__startswith=domain_key_for(source))
 
         return qs
+
+    def _source(self) -> Optional[str]:
+        source = normalize_domain(self.request.query_params.get("source", ""))
+        return source or None
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, self._list, *args, domain=self._source(), **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, self._retrieve, *args, **kwargs)
+
+    def _cached(self, request, handler, *args, domain=None, **kwargs):
+        # The browsable API is per user (CSRF token), so only JSON is cached.
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return handler(request, *args, **kwargs)
+
+        def build():
+            # The cache needs the rendered body, so DRF responses are
+            # finalized here rather than at the end of dispatch().
+            response = handler(request, *args, **kwargs)
+            return self.finalize_response(request, response, *args, **kwargs)
+
+        return cached_article_response(request, build, domain=domain)
+
+    def _list(self, request, *args, **kwargs):
+        if request.query_params.get("q", "").strip():
+            return self._search(request)
+        if not self._use_fast_rendering(request):
+            return super().list(request, *args, **kwargs)
+
+        fields = self.requested_fields()
+        rows = self.paginator.paginate_queryset(
+            self._rows(self.filter_queryset(self.get_queryset())), request, view=self
+        )
+        envelope = {
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
+        }
+        return StreamingHttpResponse(
+            iter_article_list_json(rows, fields, envelope),
+            content_type=JSONRenderer.media_type,
+        )
+
+    def _search(self, request):
+        """
+        `?q=` full-text search: matches ordered by relevance, each with its
+        `rank` and a highlighted `headline` from the article text.
+        """
+
+        if not search_supported():
+            raise ValidationError({"q": "Full-text search requires PostgreSQL"})
+
+        query = search_query(request.query_params["q"].strip())
+        fields = self.requested_fields()
+        matches = (
+            self.filter_queryset(self.get_queryset())
+            .filter(search_vector=query)
+            .annotate(rank=search_rank(query))
+        )
+        rows = self._rows(matches, leading=("id", "rank"))
+        paginator = ArticleSearchPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+
+        # ts_headline re-parses the document, so it runs for this page only.
+        headlines = dict(
+            Article.objects.filter(id__in=[row.id for row in page])
+            .annotate(headline=search_headline(query))
+            .values_list("id", "headline")
+        )
+        results = [
+            {
+                **article_row_to_dict(row, fields),
+                "rank": row.rank,
+                "headline": headlines.get(row.id),
+            }
+            for row in page
+        ]
+        return paginator.get_paginated_response(results)
+
+    def _retrieve(self, request, *args, **kwargs):
+        if not self._use_fast_rendering(request):
+            return super().retrieve(request, *args, **kwargs)
+
+        row = get_object_or_404(
+            self._rows(self.filter_queryset(self.get_queryset())),
+            pk=kwargs[self.lookup_url_kwarg or self.lookup_field],
+        )
+        body = dump_json(article_row_to_dict(row, self.requested_fields()))
+        return StreamingHttpResponse(
+            [body.encode()], content_type=JSONRenderer.media_type
+        )
+
+    def _rows(self, queryset, leading=("id", "published_at")):
+        # The leading columns are needed by the pagination cursor.
+        columns = dict.fromkeys((*leading, *self.requested_fields()))
+        if "content_html" in columns:
+            # Compressed body; article_row_to_dict decodes it.
+            queryset = queryset.annotate(
+                content_html=F("body__data"), content_html_codec=F("body__codec")
+            )
+            columns["content_html_codec"] = None
+        return queryset.values_list(*columns, named=True)
+
+    def _use_fast_rendering(self, request) -> bool:
+        """
+        Plain JSON responses skip ArticleSerializer; the browsable API and
+        indented JSON still go through DRF.
+        """
+
+        if not settings.ARTICLES_FAST_RENDERING:
+            return False
+        renderer = getattr(request, "accepted_renderer", None)
+        return isinstance(renderer, JSONRenderer) and "indent" not in (
+            request.accepted_media_type or ""
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def requested_fields(self) -> tuple[str, ...]:
+        """Fields selected by `?fields=` / `?omit=` for this request."""
+
+        if hasattr(self, "_requested_fields"):
+            return self._requested_fields
+
+        params = self.request.query_params
+        fields = self._parse_fields(params.get("fields"))
+        if not fields:
+            fields = SUMMARY_FIELDS if self.action == "list" else ALL_FIELDS
+
+        omit = self._parse_fields(params.get("omit"))
+        self._requested_fields = tuple(
+            f for f in ALL_FIELDS if f in fields and f not in omit
+        )
+        return self._requested_fields
+
+    def _parse_fields(self, raw) -> set[str]:
+        if not raw:
+            return set()
+
+        names = {name.strip() for name in raw.split(",") if name.strip()}
+        unknown = names - set(ALL_FIELDS)
+        if unknown:
+            raise ValidationError(
+                {"fields": f"Unknown fields: {', '.join(sorted(unknown))}"}
+            )
+        return names
+
+
+class ScrapeJobViewSet(viewsets.GenericViewSet):
+    """
+    Batch scraping: `POST` a list of article URLs, then follow the job.
+    The URLs are queued for the scrape workers (see app/utils/scrape_jobs.py);
+    the job is only a record of what was submitted. Authenticated users
+    only, with submissions throttled per user.
+    """
+
+    queryset = ScrapeJob.objects.all()
+    serializer_class = ScrapeJobSubmitSerializer
+    pagination_class = ScrapeJobItemPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_throttles(self):
+        if self.action == "create":
+            return [ScrapeJobRateThrottle()]
+        return super().get_throttles()
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        priority = serializer.validated_data.get("priority")
+        if priority is not None and not request.user.is_staff:
+            # Only staff may put their URLs ahead of other jobs.
+            priority = min(priority, settings.SCRAPE_JOB_PRIORITY)
+        submitted = submit_scrape_job(serializer.validated_data["urls"], priority)
+        job = submitted.job
+        return Response(
+            {
+                "id": job.id,
+                "status_url": reverse(
+                    "scrape-job-detail", args=[job.id], request=request
+                ),
+                "submitted": job.submitted_urls,
+                "duplicates": job.duplicate_urls,
+                "queued": submitted.queued,
+                "exists": submitted.exists,
+                "invalid": submitted.invalid,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        progress = job_progress(job)
+        return Response(
+            {
+                "id": job.id,
+                "created_at": job.created_at,
+                "priority": job.priority,
+                "submitted": job.submitted_urls,
+                "duplicates": job.duplicate_urls,
+                "total": sum(progress.values()),
+                "progress": progress,
+                "finished": job_finished(progress),
+                "items_url": reverse(
+                    "scrape-job-items", args=[job.id], request=request
+                ),
+            }
+        )
+
+    @action(detail=True)
+    def items(self, request, *args, **kwargs):
+        """Per-URL status, `?status=` to select one (pending, done, ...)."""
+
+        job = self.get_object()
+        wanted = request.query_params.get("status")
+        if wanted and wanted not in ITEM_STATUSES:
+            raise ValidationError({"status": f"Unknown status: {wanted}"})
+        items = filter_items(job, wanted) if wanted else job.items.all()
+        page = self.paginate_queryset(items.only("id", "url", "status", "reason"))
+        return self.get_paginated_response(describe_items(page))
+
+
+@require_GET
+def export_articles(request):
+    """
+    Streams all articles (or those matching `source`, `published_from`,
+    `published_to`, `after_id`) in `id` order as NDJSON (`?format=ndjson`,
+    default) or CSV (`?format=csv`); `?gzip=1` compresses the stream.
+    """
+
+    params = request.GET
+    fmt = params.get("format", NDJSON)
+    try:
+        if fmt not in FORMATS:
+            raise ExportParamError("format", f"Unknown format: {fmt}")
+        filters = ExportFilters.from_params(params)
+        fields = parse_fields(params.get("fields"))
+    except ExportParamError as e:
+        return JsonResponse({e.param: e.message}, status=400)
+
+    chunk_size = settings.ARTICLES_EXPORT_CHUNK_SIZE
+    chunks = iter_export(
+        export_rows(filters, fields, chunk_size), fields, fmt, chunk_size
+    )
+    filename = f"articles.{fmt}"
+    content_type = CONTENT_TYPES[fmt]
+    if params.get("gzip") == "1":
+        chunks = gzip_members(chunks)
+        filename += ".gz"
+        content_type = "application/gzip"
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def metrics(request):
+    """Scrape metrics of all scraper processes, in Prometheus text format."""
+
+    series = dict(ScrapeMetric.objects.values_list("series", "value"))
+    return HttpResponse(
+        render_prometheus(series),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
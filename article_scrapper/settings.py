@@ -109,5 +109,104 @@ LOGGING = {
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
 STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# API
+ARTICLES_PAGE_SIZE = int(os.getenv("ARTICLES_PAGE_SIZE", "50"))
+ARTICLES_MAX_PAGE_SIZE = int(os.getenv("ARTICLES_MAX_PAGE_SIZE", "500"))
+ARTICLES_FAST_RENDERING = os.getenv("ARTICLES_FAST_RENDERING", "1") == "1"
+ARTICLES_CACHE_TIMEOUT = int(os.getenv("ARTICLES_CACHE_TIMEOUT", "300"))  # 0 = bez cache
+ARTICLES_EXPORT_CHUNK_SIZE = int(
+    os.getenv("ARTICLES_EXPORT_CHUNK_SIZE", "1000")
+)  # wiersze na porcję eksportu
+SCRAPE_JOB_MAX_URLS = int(os.getenv("SCRAPE_JOB_MAX_URLS", "10000"))  # na jedno zlecenie
+SCRAPE_JOB_PRIORITY = int(
+    os.getenv("SCRAPE_JOB_PRIORITY", "20")
+)  # wyżej niż URL-e z odkrywania (0-10)
+SCRAPE_JOB_THROTTLE_RATE = os.getenv(
+    "SCRAPE_JOB_THROTTLE_RATE", "30/hour"
+)  # zlecenia na użytkownika, "" = bez limitu
+ARTICLE_BODY_CODEC = os.getenv("ARTICLE_BODY_CODEC", "zlib")  # none / zlib / zstd
+
+# Scraper
+SCRAPER_BROWSER_POOL_SIZE = int(os.getenv("SCRAPER_BROWSER_POOL_SIZE", "2"))
+SCRAPER_CONTEXT_MAX_PAGES = int(os.getenv("SCRAPER_CONTEXT_MAX_PAGES", "50"))
+SCRAPER_CONTEXT_MAX_RSS_MB = int(
+    os.getenv("SCRAPER_CONTEXT_MAX_RSS_MB", "0")
+)  # 0 = bez limitu
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))
+SCRAPER_PER_DOMAIN_CONCURRENCY = int(
+    os.getenv("SCRAPER_PER_DOMAIN_CONCURRENCY", "2")
+)
+SCRAPER_STATIC_FAST_PATH = os.getenv("SCRAPER_STATIC_FAST_PATH", "1") == "1"
+SCRAPER_HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "10"))
+SCRAPER_BLOCK_RESOURCES = os.getenv("SCRAPER_BLOCK_RESOURCES", "1") == "1"
+SCRAPER_BLOCKED_RESOURCE_TYPES = tuple(
+    t.strip()
+    for t in os.getenv(
+        "SCRAPER_BLOCKED_RESOURCE_TYPES", "image,media,font,stylesheet"
+    ).split(",")
+    if t.strip()
+)
+SCRAPER_BLOCKED_HOSTS = tuple(
+    h.strip() for h in os.getenv("SCRAPER_BLOCKED_HOSTS", "").split(",") if h.strip()
+)  # dodatkowe hosty do blokowania, poza domyślną listą
+SCRAPER_WRITE_BATCH_SIZE = int(os.getenv("SCRAPER_WRITE_BATCH_SIZE", "100"))
+SCRAPER_WRITE_FLUSH_INTERVAL = float(
+    os.getenv("SCRAPER_WRITE_FLUSH_INTERVAL", "5")
+)  # sekundy
+SCRAPER_REFRESH_MIN_INTERVAL_HOURS = float(
+    os.getenv("SCRAPER_REFRESH_MIN_INTERVAL_HOURS", "6")
+)
+SCRAPER_REFRESH_MAX_INTERVAL_HOURS = float(
+    os.getenv("SCRAPER_REFRESH_MAX_INTERVAL_HOURS", "720")
+)
+SCRAPER_REFRESH_LIMIT = int(os.getenv("SCRAPER_REFRESH_LIMIT", "500"))
+SCRAPER_POLITENESS = os.getenv("SCRAPER_POLITENESS", "1") == "1"
+SCRAPER_DOMAIN_RATE = float(
+    os.getenv("SCRAPER_DOMAIN_RATE", "1")
+)  # zapytania na sekundę do jednego hosta
+SCRAPER_DOMAIN_BURST = float(os.getenv("SCRAPER_DOMAIN_BURST", "2"))
+SCRAPER_TARGET_LATENCY = float(
+    os.getenv("SCRAPER_TARGET_LATENCY", "5")
+)  # sekundy; wolniejsze odpowiedzi zmniejszają współbieżność hosta
+SCRAPER_RESPECT_CRAWL_DELAY = os.getenv("SCRAPER_RESPECT_CRAWL_DELAY", "1") == "1"
+SCRAPER_WORKER_CLAIM_SIZE = int(os.getenv("SCRAPER_WORKER_CLAIM_SIZE", "10"))
+SCRAPER_WORKER_LEASE_SECONDS = float(
+    os.getenv("SCRAPER_WORKER_LEASE_SECONDS", "300")
+)  # sekundy bez odnowienia, po których adres wraca do kolejki
+SCRAPER_NAVIGATION_TIMEOUT = float(
+    os.getenv("SCRAPER_NAVIGATION_TIMEOUT", "20")
+)  # sekundy na page.goto
+SCRAPER_SELECTOR_TIMEOUT = float(
+    os.getenv("SCRAPER_SELECTOR_TIMEOUT", "10")
+)  # sekundy na pojawienie się treści artykułu
+SCRAPER_RETRY_ATTEMPTS = int(os.getenv("SCRAPER_RETRY_ATTEMPTS", "3"))
+SCRAPER_RETRY_BASE_DELAY = float(os.getenv("SCRAPER_RETRY_BASE_DELAY", "2"))
+SCRAPER_RETRY_MAX_DELAY = float(os.getenv("SCRAPER_RETRY_MAX_DELAY", "60"))
+SCRAPER_BREAKER_THRESHOLD = int(
+    os.getenv("SCRAPER_BREAKER_THRESHOLD", "5")
+)  # błędy hosta z rzędu otwierające obwód; 0 = wyłączone
+SCRAPER_BREAKER_RESET_SECONDS = float(
+    os.getenv("SCRAPER_BREAKER_RESET_SECONDS", "120")
+)
+SCRAPER_METRICS_FLUSH_INTERVAL = float(
+    os.getenv("SCRAPER_METRICS_FLUSH_INTERVAL", "15")
+)  # sekundy między zapisami metryk do bazy
+SCRAPER_PROXY = os.getenv("SCRAPER_PROXY", "")  # np. http://127.0.0.1:8765
+SCRAPER_SNAPSHOT_DIR = os.getenv(
+    "SCRAPER_SNAPSHOT_DIR", ""
+)  # katalog zrzutów stron, pusty = bez zrzutów
+SCRAPER_SNAPSHOT_CODEC = os.getenv(
+    "SCRAPER_SNAPSHOT_CODEC", "zlib"
+)  # none / zlib / zstd